@@ -0,0 +1,41 @@
+"""added_branch_wait_time_stats_table
+
+Revision ID: 0f4dfd76d48b
+Revises: 1f2fadf2bb55
+Create Date: 2026-10-17 18:03:44.216583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f4dfd76d48b'
+down_revision: Union[str, Sequence[str], None] = '1f2fadf2bb55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('branch_wait_time_stats',
+    sa.Column('BranchId', sa.String(), nullable=False),
+    sa.Column('SampleCount', sa.BigInteger(), nullable=False),
+    sa.Column('WaitTimeSum', sa.Float(), nullable=False),
+    sa.Column('WaitTimeSquaresSum', sa.Float(), nullable=False),
+    sa.Column('DecayedWaitTimeSum', sa.Float(), nullable=False),
+    sa.Column('DecayedWeight', sa.Float(), nullable=False),
+    sa.Column('DecayedAt', sa.DateTime(), nullable=True),
+    sa.Column('Sketch', sa.LargeBinary(), nullable=False),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint('BranchId')
+    )
+    # Populate the table from existing rows with `python manage.py rebuild-wait-time-stats`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('branch_wait_time_stats')
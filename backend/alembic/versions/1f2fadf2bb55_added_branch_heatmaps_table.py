@@ -0,0 +1,37 @@
+"""added_branch_heatmaps_table
+
+Revision ID: 1f2fadf2bb55
+Revises: 79815c2e15d0
+Create Date: 2026-10-17 17:21:08.504937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f2fadf2bb55'
+down_revision: Union[str, Sequence[str], None] = '79815c2e15d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('branch_heatmaps',
+    sa.Column('BranchId', sa.String(), nullable=False),
+    sa.Column('ComputedAt', sa.DateTime(), nullable=False),
+    sa.Column('ExpectedWaitTimes', sa.LargeBinary(), nullable=False),
+    sa.Column('ExpectedCrowdCounts', sa.LargeBinary(), nullable=False),
+    sa.Column('SampleCounts', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint('BranchId')
+    )
+    # Populate the table with `python manage.py compute-heatmaps`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('branch_heatmaps')
@@ -0,0 +1,46 @@
+"""added_time_series_indexes
+
+Revision ID: 5387bd5e4f9b
+Revises: d8c8745b4c65
+Create Date: 2025-09-07 09:48:15.602711
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5387bd5e4f9b'
+down_revision: Union[str, Sequence[str], None] = 'd8c8745b4c65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Time-series lookups: filter by branch/visitor, order by time
+    op.create_index('ix_crowd_data_BranchId_Timestamp', 'crowd_data', ['BranchId', sa.text('"Timestamp" DESC')], unique=False)
+    op.create_index('ix_visitor_logs_BranchId_CheckInTime', 'visitor_logs', ['BranchId', sa.text('"CheckInTime" DESC')], unique=False)
+    op.create_index('ix_wait_time_predictions_BranchId_PredictedAt', 'wait_time_predictions', ['BranchId', 'PredictedAt'], unique=False)
+    op.create_index('ix_wait_time_predictions_VisitorId_PredictedAt', 'wait_time_predictions', ['VisitorId', 'PredictedAt'], unique=False)
+    # Foreign key lookups
+    op.create_index('ix_favorite_institutions_VisitorId', 'favorite_institutions', ['VisitorId'], unique=False)
+    op.create_index('ix_favorite_institutions_BranchId', 'favorite_institutions', ['BranchId'], unique=False)
+    op.create_index('ix_alert_preferences_VisitorId', 'alert_preferences', ['VisitorId'], unique=False)
+    op.create_index('ix_alert_preferences_BranchId', 'alert_preferences', ['BranchId'], unique=False)
+    op.create_index('ix_operators_BranchId', 'operators', ['BranchId'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_operators_BranchId', table_name='operators')
+    op.drop_index('ix_alert_preferences_BranchId', table_name='alert_preferences')
+    op.drop_index('ix_alert_preferences_VisitorId', table_name='alert_preferences')
+    op.drop_index('ix_favorite_institutions_BranchId', table_name='favorite_institutions')
+    op.drop_index('ix_favorite_institutions_VisitorId', table_name='favorite_institutions')
+    op.drop_index('ix_wait_time_predictions_VisitorId_PredictedAt', table_name='wait_time_predictions')
+    op.drop_index('ix_wait_time_predictions_BranchId_PredictedAt', table_name='wait_time_predictions')
+    op.drop_index('ix_visitor_logs_BranchId_CheckInTime', table_name='visitor_logs')
+    op.drop_index('ix_crowd_data_BranchId_Timestamp', table_name='crowd_data')
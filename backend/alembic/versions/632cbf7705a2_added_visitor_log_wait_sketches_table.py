@@ -0,0 +1,37 @@
+"""added_visitor_log_wait_sketches_table
+
+Revision ID: 632cbf7705a2
+Revises: 0f4dfd76d48b
+Create Date: 2026-10-17 18:47:20.931406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '632cbf7705a2'
+down_revision: Union[str, Sequence[str], None] = '0f4dfd76d48b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('visitor_log_wait_sketches',
+    sa.Column('BranchId', sa.String(), nullable=False),
+    sa.Column('Granularity', sa.String(), nullable=False),
+    sa.Column('BucketStart', sa.DateTime(), nullable=False),
+    sa.Column('SampleCount', sa.Integer(), nullable=False),
+    sa.Column('Sketch', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint('BranchId', 'Granularity', 'BucketStart')
+    )
+    # Populate the table from existing rows with `python manage.py rebuild-wait-time-stats`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('visitor_log_wait_sketches')
@@ -0,0 +1,145 @@
+"""partition_time_series_tables_by_month
+
+Revision ID: 79815c2e15d0
+Revises: a0674953b41d
+Create Date: 2026-10-17 16:42:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '79815c2e15d0'
+down_revision: Union[str, Sequence[str], None] = 'a0674953b41d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created ahead of the current month; afterwards
+# `python manage.py create-partitions` (run daily) keeps them coming
+MONTHS_AHEAD = 3
+
+CROWD_DATA_COLUMNS = '"CrowdDataId", "BranchId", "Timestamp", "CurrentCrowdCount"'
+VISITOR_LOG_COLUMNS = '"VisitorLogId", "VisitorName", "BranchId", "CheckInTime", "ServiceStartTime", "WaitTimeInMinutes"'
+
+
+def _crowd_data_table(partitioned):
+    op.create_table('crowd_data',
+    sa.Column('CrowdDataId', sa.String(), nullable=False),
+    sa.Column('BranchId', sa.String(), nullable=True),
+    sa.Column('Timestamp', sa.DateTime(), nullable=not partitioned),
+    sa.Column('CurrentCrowdCount', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint(*(['CrowdDataId', 'Timestamp'] if partitioned else ['CrowdDataId'])),
+    **({'postgresql_partition_by': 'RANGE ("Timestamp")'} if partitioned else {})
+    )
+
+
+def _visitor_logs_table(partitioned):
+    op.create_table('visitor_logs',
+    sa.Column('VisitorLogId', sa.String(), nullable=False),
+    sa.Column('VisitorName', sa.String(), nullable=True),
+    sa.Column('BranchId', sa.String(), nullable=True),
+    sa.Column('CheckInTime', sa.DateTime(), nullable=not partitioned),
+    sa.Column('ServiceStartTime', sa.DateTime(), nullable=True),
+    sa.Column('WaitTimeInMinutes', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint(*(['VisitorLogId', 'CheckInTime'] if partitioned else ['VisitorLogId'])),
+    **({'postgresql_partition_by': 'RANGE ("CheckInTime")'} if partitioned else {})
+    )
+
+
+def _create_indexes():
+    op.create_index('ix_crowd_data_BranchId_Timestamp', 'crowd_data', ['BranchId', sa.text('"Timestamp" DESC')], unique=False)
+    op.create_index('ix_crowd_data_Timestamp_CrowdDataId', 'crowd_data', ['Timestamp', 'CrowdDataId'], unique=False)
+    op.create_index('ix_visitor_logs_BranchId_CheckInTime', 'visitor_logs', ['BranchId', sa.text('"CheckInTime" DESC')], unique=False)
+    op.create_index('ix_visitor_logs_CheckInTime_VisitorLogId', 'visitor_logs', ['CheckInTime', 'VisitorLogId'], unique=False)
+
+
+def _drop_indexes(crowd_data, visitor_logs):
+    op.drop_index('ix_crowd_data_BranchId_Timestamp', table_name=crowd_data)
+    op.drop_index('ix_crowd_data_Timestamp_CrowdDataId', table_name=crowd_data)
+    op.drop_index('ix_visitor_logs_BranchId_CheckInTime', table_name=visitor_logs)
+    op.drop_index('ix_visitor_logs_CheckInTime_VisitorLogId', table_name=visitor_logs)
+
+
+def _create_partitions(table, column, source):
+    """Default partition plus one per month from the oldest row in `source`"""
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    op.execute(f"""
+    DO $$
+    DECLARE month timestamp;
+    BEGIN
+        FOR month IN SELECT generate_series(
+            date_trunc('month', LEAST((SELECT min("{column}") FROM {source}), now()::timestamp)),
+            date_trunc('month', now()::timestamp) + interval '{MONTHS_AHEAD} months',
+            interval '1 month'
+        ) LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                '{table}_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+            );
+        END LOOP;
+    END $$
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only PostgreSQL partitions the tables; other databases keep them as they were
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # The partition key joins the primary key, so it can no longer be NULL
+    op.execute('UPDATE visitor_logs SET "CheckInTime" = "ServiceStartTime" WHERE "CheckInTime" IS NULL')
+    op.execute("""
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM crowd_data WHERE "Timestamp" IS NULL)
+            OR EXISTS (SELECT 1 FROM visitor_logs WHERE "CheckInTime" IS NULL) THEN
+            RAISE EXCEPTION 'crowd_data rows without a Timestamp or visitor_logs rows without '
+                'a CheckInTime or ServiceStartTime must be fixed or deleted before partitioning';
+        END IF;
+    END $$
+    """)
+
+    _drop_indexes('crowd_data', 'visitor_logs')
+    op.rename_table('crowd_data', 'crowd_data_unpartitioned')
+    op.execute('ALTER INDEX crowd_data_pkey RENAME TO crowd_data_unpartitioned_pkey')
+    op.rename_table('visitor_logs', 'visitor_logs_unpartitioned')
+    op.execute('ALTER INDEX visitor_logs_pkey RENAME TO visitor_logs_unpartitioned_pkey')
+
+    _crowd_data_table(partitioned=True)
+    _visitor_logs_table(partitioned=True)
+    _create_indexes()
+    _create_partitions('crowd_data', 'Timestamp', 'crowd_data_unpartitioned')
+    _create_partitions('visitor_logs', 'CheckInTime', 'visitor_logs_unpartitioned')
+
+    op.execute(f'INSERT INTO crowd_data ({CROWD_DATA_COLUMNS}) SELECT {CROWD_DATA_COLUMNS} FROM crowd_data_unpartitioned')
+    op.execute(f'INSERT INTO visitor_logs ({VISITOR_LOG_COLUMNS}) SELECT {VISITOR_LOG_COLUMNS} FROM visitor_logs_unpartitioned')
+    op.drop_table('crowd_data_unpartitioned')
+    op.drop_table('visitor_logs_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Only PostgreSQL partitions the tables; other databases keep them as they were
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    _drop_indexes('crowd_data', 'visitor_logs')
+    op.rename_table('crowd_data', 'crowd_data_partitioned')
+    op.execute('ALTER INDEX crowd_data_pkey RENAME TO crowd_data_partitioned_pkey')
+    op.rename_table('visitor_logs', 'visitor_logs_partitioned')
+    op.execute('ALTER INDEX visitor_logs_pkey RENAME TO visitor_logs_partitioned_pkey')
+
+    _crowd_data_table(partitioned=False)
+    _visitor_logs_table(partitioned=False)
+    _create_indexes()
+
+    # Rows of detached partitions are not copied back
+    op.execute(f'INSERT INTO crowd_data ({CROWD_DATA_COLUMNS}) SELECT {CROWD_DATA_COLUMNS} FROM crowd_data_partitioned')
+    op.execute(f'INSERT INTO visitor_logs ({VISITOR_LOG_COLUMNS}) SELECT {VISITOR_LOG_COLUMNS} FROM visitor_logs_partitioned')
+    # Dropping a partitioned table drops its partitions
+    op.drop_table('crowd_data_partitioned')
+    op.drop_table('visitor_logs_partitioned')
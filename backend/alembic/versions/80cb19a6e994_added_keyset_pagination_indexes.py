@@ -0,0 +1,33 @@
+"""added_keyset_pagination_indexes
+
+Revision ID: 80cb19a6e994
+Revises: 5387bd5e4f9b
+Create Date: 2026-10-17 10:21:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80cb19a6e994'
+down_revision: Union[str, Sequence[str], None] = '5387bd5e4f9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (time, id) order of the unfiltered listings, scanned backwards for cursors
+    op.create_index('ix_crowd_data_Timestamp_CrowdDataId', 'crowd_data', ['Timestamp', 'CrowdDataId'], unique=False)
+    op.create_index('ix_visitor_logs_CheckInTime_VisitorLogId', 'visitor_logs', ['CheckInTime', 'VisitorLogId'], unique=False)
+    op.create_index('ix_wait_time_predictions_PredictedAt_WaitTimePredictionId', 'wait_time_predictions', ['PredictedAt', 'WaitTimePredictionId'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_wait_time_predictions_PredictedAt_WaitTimePredictionId', table_name='wait_time_predictions')
+    op.drop_index('ix_visitor_logs_CheckInTime_VisitorLogId', table_name='visitor_logs')
+    op.drop_index('ix_crowd_data_Timestamp_CrowdDataId', table_name='crowd_data')
@@ -0,0 +1,39 @@
+"""added_crowd_data_rollups_table
+
+Revision ID: a0674953b41d
+Revises: 80cb19a6e994
+Create Date: 2026-10-17 14:05:12.730418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0674953b41d'
+down_revision: Union[str, Sequence[str], None] = '80cb19a6e994'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('crowd_data_rollups',
+    sa.Column('BranchId', sa.String(), nullable=False),
+    sa.Column('Granularity', sa.String(), nullable=False),
+    sa.Column('BucketStart', sa.DateTime(), nullable=False),
+    sa.Column('MinCrowdCount', sa.Integer(), nullable=False),
+    sa.Column('MaxCrowdCount', sa.Integer(), nullable=False),
+    sa.Column('SumCrowdCount', sa.BigInteger(), nullable=False),
+    sa.Column('SampleCount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint('BranchId', 'Granularity', 'BucketStart')
+    )
+    # Populate the table from existing rows with `python manage.py backfill-crowd-rollups`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('crowd_data_rollups')
@@ -0,0 +1,33 @@
+"""added_catalog_version_table
+
+Revision ID: b3e91d0c7a52
+Revises: 632cbf7705a2
+Create Date: 2026-10-17 21:12:08.473519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e91d0c7a52'
+down_revision: Union[str, Sequence[str], None] = '632cbf7705a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    catalog_version = op.create_table('catalog_version',
+    sa.Column('CatalogVersionId', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('CatalogVersionId')
+    )
+    op.bulk_insert(catalog_version, [{'CatalogVersionId': 1, 'Version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_version')
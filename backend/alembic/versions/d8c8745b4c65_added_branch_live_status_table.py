@@ -0,0 +1,39 @@
+"""added_branch_live_status_table
+
+Revision ID: d8c8745b4c65
+Revises: 733b433087ef
+Create Date: 2025-09-06 11:12:40.318522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8c8745b4c65'
+down_revision: Union[str, Sequence[str], None] = '733b433087ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('branch_live_status',
+    sa.Column('BranchId', sa.String(), nullable=False),
+    sa.Column('LatestCrowdDataId', sa.String(), nullable=True),
+    sa.Column('LatestCrowdCount', sa.Integer(), nullable=False),
+    sa.Column('LatestTimestamp', sa.DateTime(), nullable=False),
+    sa.Column('RollingAverageCrowdCount', sa.Float(), nullable=True),
+    sa.Column('OccupancyRatio', sa.Float(), nullable=True),
+    sa.Column('UpdatedAt', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['BranchId'], ['branches.BranchId'], ),
+    sa.PrimaryKeyConstraint('BranchId')
+    )
+    # Populate the table from existing rows with `python manage.py backfill-live-status`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('branch_live_status')
@@ -0,0 +1,139 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.schemas.crowd_data_schema import (
+    CrowdDataCreate,
+    CrowdDataResponse,
+    CrowdDataWithBranchResponse,
+)
+from app.services.async_crowd_data_service import async_crowd_data_service
+from app.services.crowd_events import live_status_response
+
+# Registered ahead of crowd_data_router when DB_ASYNC is enabled. The routes
+# mirror documented sync routes, so they are left out of the OpenAPI schema.
+async_crowd_data_router = APIRouter()
+
+
+@async_crowd_data_router.post(
+    "/crowd-data",
+    status_code=status.HTTP_201_CREATED,
+    include_in_schema=False,
+)
+async def create_crowd_data_async(
+    crowd_data: CrowdDataCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new crowd data entry"""
+    try:
+        created_crowd_data = await async_crowd_data_service.create_crowd_data(
+            db=db, crowd_data=crowd_data, crowd_data_id=str(uuid.uuid4())
+        )
+
+        response_data = CrowdDataResponse(
+            crowdDataId=created_crowd_data.CrowdDataId,
+            branchId=created_crowd_data.BranchId,
+            timestamp=created_crowd_data.Timestamp,
+            currentCrowdCount=created_crowd_data.CurrentCrowdCount,
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(response_data),
+            status_code=status.HTTP_201_CREATED,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@async_crowd_data_router.get(
+    "/crowd-data/branch/{branch_id}/latest",
+    include_in_schema=False,
+)
+async def get_latest_crowd_data_by_branch_async(
+    branch_id: str, db: AsyncSession = Depends(get_async_db)
+):
+    """Get the latest crowd data for a specific branch"""
+    try:
+        crowd_data = await async_crowd_data_service.get_latest_crowd_data_by_branch(
+            db=db, branch_id=branch_id
+        )
+
+        if not crowd_data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No crowd data found for this branch",
+            )
+
+        response_data = CrowdDataWithBranchResponse(
+            crowdDataId=crowd_data.CrowdDataId,
+            branchId=crowd_data.BranchId,
+            timestamp=crowd_data.Timestamp,
+            currentCrowdCount=crowd_data.CurrentCrowdCount,
+            branch=(
+                {
+                    "branchId": crowd_data.branch.BranchId,
+                    "name": crowd_data.branch.Name,
+                    "address": crowd_data.branch.Address,
+                    "serviceHours": crowd_data.branch.ServiceHours,
+                    "serviceDescription": crowd_data.branch.ServiceDescription,
+                    "latitude": crowd_data.branch.Latitude,
+                    "longitude": crowd_data.branch.Longitude,
+                }
+                if crowd_data.branch
+                else None
+            ),
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(response_data),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@async_crowd_data_router.get(
+    "/crowd-data/branch/{branch_id}/live-status",
+    include_in_schema=False,
+)
+async def get_branch_live_status_async(
+    branch_id: str, db: AsyncSession = Depends(get_async_db)
+):
+    """Get the latest crowd count, 15-minute average and occupancy of a branch"""
+    try:
+        live_status = await async_crowd_data_service.get_live_status(
+            db=db, branch_id=branch_id
+        )
+
+        if not live_status:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No crowd data found for this branch",
+            )
+
+        response_data = live_status_response(live_status)
+
+        return JSONResponse(
+            content=jsonable_encoder(response_data),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
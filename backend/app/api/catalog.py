@@ -0,0 +1,46 @@
+from typing import Any, Callable, Optional
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.orm import Session
+
+from app.services.catalog_cache import catalog_cache, catalog_etag
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def catalog_response(
+    request: Request,
+    db: Session,
+    key: str,
+    build: Callable[[], Any],
+    attach: Optional[Callable[[Any], Any]] = None,
+) -> Response:
+    """Serve a catalog listing from the catalog cache, with ETag support.
+
+    `build` runs only on a cache miss and must not embed live values.
+    `attach`, when given, adds them to a copy of the cached data on every
+    request; the ETag then covers the final body. A matching If-None-Match
+    gets an empty 304.
+    """
+    version = catalog_cache.current_version(db)
+    entry = catalog_cache.get(key, version)
+    if entry is None:
+        entry = catalog_cache.set(key, version, build())
+
+    body, etag = entry.body, entry.etag
+    if attach is not None:
+        body = JSONResponse(content=attach(entry.data)).body
+        etag = catalog_etag(body)
+
+    # no-cache: clients may store the response but must revalidate it
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
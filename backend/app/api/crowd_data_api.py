@@ -1,22 +1,67 @@
+import asyncio
+import json
+from contextlib import suppress
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import uuid
 
+from app.api.export import EXPORT_FORMAT_PATTERN, export_response
+from app.api.pagination import cursor_query, paginated_response
+from app.db.pagination import Cursor, next_cursor
 from app.db.session import get_db
 from app.schemas.crowd_data_schema import (
     CrowdDataCreate,
     CrowdDataUpdate,
     CrowdDataResponse,
     CrowdDataWithBranchResponse,
+    BranchLiveStatusResponse,
+    CrowdDataBulkResponse,
+    CrowdSeriesResponse,
+)
+from app.services.crowd_data_service import EXPORT_FIELDS, crowd_data_service
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.bulk_payload import read_bulk_body
+from app.services.crowd_events import (
+    crowd_event_broker,
+    live_status_event,
+    live_status_response,
 )
-from app.services.crowd_data_service import crowd_data_service
+from core.config import settings
 
 crowd_data_router = APIRouter()
 
+# Comment lines sent on idle SSE streams so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _live_status_events(db: Session, branch_ids: List[str]) -> List[str]:
+    """Current live status of the branches, releasing the connection afterwards.
+
+    Push connections stay open for a long time, so they must not keep a
+    pooled database connection checked out.
+    """
+    try:
+        return [
+            live_status_event(live_status)
+            for live_status in branch_live_status_service.get_live_statuses(db, branch_ids)
+        ]
+    finally:
+        db.close()
+
 
 @crowd_data_router.post(
     "/crowd-data",
@@ -56,6 +101,35 @@ def create_crowd_data(crowd_data: CrowdDataCreate, db: Session = Depends(get_db)
         )
 
 
+@crowd_data_router.post(
+    "/crowd-data/bulk",
+    response_model=CrowdDataBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["crowd-data"],
+)
+async def bulk_create_crowd_data(request: Request, db: Session = Depends(get_db)):
+    """Create many crowd data entries from a JSON array or an NDJSON body"""
+    try:
+        items = await read_bulk_body(request, settings.CROWD_DATA_BULK_MAX_ITEMS)
+
+        # Database work is synchronous, keep it off the event loop
+        result = await run_in_threadpool(
+            crowd_data_service.bulk_create_crowd_data, db=db, items=items
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(result),
+            status_code=status.HTTP_201_CREATED,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
 @crowd_data_router.get(
     "/crowd-data/{crowd_data_id}",
     response_model=CrowdDataWithBranchResponse,
@@ -108,12 +182,13 @@ def get_crowd_data(crowd_data_id: str, db: Session = Depends(get_db)):
 def get_all_crowd_data(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get all crowd data entries with pagination"""
     try:
         crowd_data_list = crowd_data_service.get_all_crowd_data(
-            db=db, skip=skip, limit=limit
+            db=db, skip=skip, limit=limit, cursor=cursor
         )
 
         # Transform to response format
@@ -140,9 +215,8 @@ def get_all_crowd_data(
             )
             response_data.append(response_item)
 
-        return JSONResponse(
-            content=jsonable_encoder(response_data),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            response_data, next_cursor(response_data, limit, "timestamp", "crowdDataId")
         )
     except Exception as e:
         raise HTTPException(
@@ -160,12 +234,13 @@ def get_crowd_data_by_branch(
     branch_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get crowd data for a specific branch"""
     try:
         crowd_data_list = crowd_data_service.get_crowd_data_by_branch(
-            db=db, branch_id=branch_id, skip=skip, limit=limit
+            db=db, branch_id=branch_id, skip=skip, limit=limit, cursor=cursor
         )
 
         # Transform to response format
@@ -192,9 +267,8 @@ def get_crowd_data_by_branch(
             )
             response_data.append(response_item)
 
-        return JSONResponse(
-            content=jsonable_encoder(response_data),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            response_data, next_cursor(response_data, limit, "timestamp", "crowdDataId")
         )
     except Exception as e:
         raise HTTPException(
@@ -255,6 +329,150 @@ def get_latest_crowd_data_by_branch(branch_id: str, db: Session = Depends(get_db
         )
 
 
+@crowd_data_router.get(
+    "/crowd-data/branch/{branch_id}/live-status",
+    response_model=BranchLiveStatusResponse,
+    tags=["crowd-data"],
+)
+def get_branch_live_status(branch_id: str, db: Session = Depends(get_db)):
+    """Get the latest crowd count, 15-minute average and occupancy of a branch"""
+    try:
+        live_status = branch_live_status_service.get_live_status(
+            db=db, branch_id=branch_id
+        )
+
+        if not live_status:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No crowd data found for this branch",
+            )
+
+        response_data = live_status_response(live_status)
+
+        return JSONResponse(
+            content=jsonable_encoder(response_data),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@crowd_data_router.get(
+    "/crowd-data/live-status/stream",
+    tags=["crowd-data"],
+)
+async def stream_live_status(
+    branch_ids: List[str] = Query(..., alias="branchId", description="Branches to follow"),
+    db: Session = Depends(get_db),
+):
+    """Server-Sent Events stream of live status updates for the given branches.
+
+    The current status of each branch is sent first, then one event per
+    update as crowd data arrives.
+    """
+    subscription = crowd_event_broker.subscribe(branch_ids)
+    try:
+        snapshot = await run_in_threadpool(_live_status_events, db, branch_ids)
+    except Exception as e:
+        crowd_event_broker.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+    async def events():
+        try:
+            for event in snapshot:
+                yield f"event: live-status\ndata: {event}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), SSE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: live-status\ndata: {event}\n\n"
+        finally:
+            crowd_event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@crowd_data_router.websocket("/crowd-data/live-status/ws")
+async def live_status_websocket(websocket: WebSocket, db: Session = Depends(get_db)):
+    """WebSocket of live status updates.
+
+    Branches can be given as `branchId` query parameters and changed later
+    with {"action": "subscribe" | "unsubscribe", "branchIds": [...]}
+    messages. The current status is sent for every newly followed branch.
+    """
+    await websocket.accept()
+    subscription = crowd_event_broker.subscribe()
+
+    async def follow(branch_ids: List[str]):
+        crowd_event_broker.add_branches(subscription, branch_ids)
+        for event in await run_in_threadpool(_live_status_events, db, branch_ids):
+            await websocket.send_text(event)
+
+    async def forward_events():
+        while True:
+            await websocket.send_text(await subscription.queue.get())
+
+    async def receive_messages():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                await websocket.send_json({"error": "Invalid JSON"})
+                continue
+            if not isinstance(message, dict):
+                message = {}
+            branch_ids = message.get("branchIds", [])
+            if not isinstance(branch_ids, list):
+                await websocket.send_json({"error": "branchIds must be a list"})
+                continue
+            branch_ids = [str(branch_id) for branch_id in branch_ids]
+            if message.get("action") == "subscribe":
+                await follow(branch_ids)
+            elif message.get("action") == "unsubscribe":
+                crowd_event_broker.remove_branches(subscription, branch_ids)
+            else:
+                await websocket.send_json({"error": "Unknown action"})
+
+    tasks = [asyncio.create_task(forward_events())]
+    try:
+        await follow(websocket.query_params.getlist("branchId"))
+        tasks.append(asyncio.create_task(receive_messages()))
+        # Until the client disconnects or events can no longer be sent
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        crowd_event_broker.unsubscribe(subscription)
+        failed = False
+        for task in tasks:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, WebSocketDisconnect):
+                pass
+            except Exception:
+                failed = True
+        if failed:
+            with suppress(Exception):
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+
+
 @crowd_data_router.get(
     "/crowd-data/branch/{branch_id}/date-range",
     response_model=List[CrowdDataWithBranchResponse],
@@ -307,6 +525,65 @@ def get_crowd_data_by_date_range(
         )
 
 
+@crowd_data_router.get(
+    "/crowd-data/branch/{branch_id}/series",
+    response_model=CrowdSeriesResponse,
+    tags=["crowd-data"],
+)
+def get_crowd_series(
+    branch_id: str,
+    start_date: datetime = Query(..., description="Start date (ISO format)"),
+    end_date: datetime = Query(..., description="End date (ISO format)"),
+    bucket: str = Query("1h", pattern="^(5m|1h|1d)$", description="Bucket size: 5m, 1h or 1d"),
+    agg: str = Query("avg", pattern="^(avg|max|p95)$", description="Aggregate: avg, max or p95"),
+    db: Session = Depends(get_db),
+):
+    """Get crowd counts of a branch within a date range, aggregated per time bucket"""
+    try:
+        series = crowd_data_service.get_crowd_series(
+            db=db,
+            branch_id=branch_id,
+            start_date=start_date,
+            end_date=end_date,
+            bucket=bucket,
+            agg=agg,
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(series),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@crowd_data_router.get(
+    "/crowd-data/branch/{branch_id}/export",
+    tags=["crowd-data"],
+)
+def export_crowd_data(
+    branch_id: str,
+    start_date: datetime = Query(..., description="Start date (ISO format)"),
+    end_date: datetime = Query(..., description="End date (ISO format)"),
+    export_format: str = Query(
+        "ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Stream the crowd data of a branch within a date range as NDJSON or CSV"""
+    rows = crowd_data_service.iter_crowd_data_by_date_range(
+        db=db, branch_id=branch_id, start_date=start_date, end_date=end_date
+    )
+    return export_response(
+        db, rows, EXPORT_FIELDS, export_format, f"crowd-data-{branch_id}"
+    )
+
+
 @crowd_data_router.put(
     "/crowd-data/{crowd_data_id}", response_model=CrowdDataResponse, tags=["crowd-data"]
 )
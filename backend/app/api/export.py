@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+# Rows encoded per chunk handed to the server
+EXPORT_CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunk(rows: List[Sequence], fields: Sequence[str]) -> str:
+    return "".join(
+        json.dumps(dict(zip(fields, map(_encode_value, row)))) + "\n" for row in rows
+    )
+
+
+def _csv_chunk(rows: List[Sequence]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [_encode_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def export_response(
+    db: Session,
+    rows: Iterable[Sequence],
+    fields: Sequence[str],
+    export_format: str,
+    filename: str,
+) -> StreamingResponse:
+    """Stream rows as NDJSON or CSV, a chunk of rows at a time.
+
+    `rows` must be lazy (a generator running a streaming query) so the
+    query runs while the body is sent, in constant memory. The session is
+    closed once the stream ends, since the request dependency has already
+    released it by then.
+    """
+
+    def chunks() -> Iterator[str]:
+        try:
+            if export_format == "csv":
+                yield _csv_chunk([fields])
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == EXPORT_CHUNK_ROWS:
+                    yield _csv_chunk(batch) if export_format == "csv" else _ndjson_chunk(batch, fields)
+                    batch = []
+            if batch:
+                yield _csv_chunk(batch) if export_format == "csv" else _ndjson_chunk(batch, fields)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -1,9 +1,8 @@
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Callable, List
 
 from app.models import Branch
+from app.api.catalog import catalog_response
 from app.db.session import get_db
 from sqlalchemy.orm import Session
 
@@ -14,6 +13,8 @@ from app.schemas.institution_schema import (
     BranchResponse,
     BranchCreate,
     BranchUpdate,
+    NearbyBranchResponse,
+    BranchCrowdCountResponse,
     InstitutionTypeResponse,
     InstitutionTypeCreate,
     InstitutionTypeUpdate,
@@ -21,6 +22,7 @@ from app.schemas.institution_schema import (
     InstitutionResponseLegacy,
     BranchResponseLegacy,
 )
+from app.services.crowd_data_service import crowd_data_service
 from app.services.institution_service import institution_service
 
 institution_router = APIRouter()
@@ -127,11 +129,16 @@ def delete_institution_type(institution_type_id: str, db: Session = Depends(get_
 @institution_router.get(
     "/institutions", response_model=List[InstitutionResponse], tags=["institution"]
 )
-def get_all_institutions(db: Session = Depends(get_db)):
+def get_all_institutions(request: Request, db: Session = Depends(get_db)):
     """Get all institutions"""
     try:
-        institutions = institution_service.get_all_institutions(db=db)
-        return institutions
+        return catalog_response(
+            request,
+            db,
+            "institutions",
+            lambda: institution_service.get_all_institutions(db=db, with_crowd_counts=False),
+            attach=_institution_crowd_counts(db),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,6 +146,96 @@ def get_all_institutions(db: Session = Depends(get_db)):
         )
 
 
+# Legacy endpoint for backward compatibility; registered before
+# /institutions/{institution_id}, which would otherwise capture "all"
+@institution_router.get(
+    "/institutions/all", response_model=List[InstitutionResponseLegacy], tags=["user"]
+)
+def get_institutions_legacy(request: Request, db: Session = Depends(get_db)):
+    """Legacy endpoint to get all institutions with old response format"""
+    try:
+        return catalog_response(
+            request,
+            db,
+            "institutions-legacy",
+            lambda: _build_legacy_institutions(db),
+            attach=_institution_crowd_counts(db),
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error",
+        )
+
+
+def _branch_crowd_counts(db: Session) -> Callable[[list], list]:
+    """Fill the live crowd counts into cached branches, one query per request"""
+    def attach(branches: list) -> list:
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(db)
+        return [
+            {**branch, "totalCrowdCount": crowd_counts.get(branch["branchId"], 0)}
+            for branch in branches
+        ]
+    return attach
+
+
+def _institution_crowd_counts(db: Session) -> Callable[[list], list]:
+    """Fill the live crowd counts into the branches of cached institutions"""
+    def attach(institutions: list) -> list:
+        attach_branches = _branch_crowd_counts(db)
+        return [
+            {**institution, "branches": attach_branches(institution["branches"])}
+            for institution in institutions
+        ]
+    return attach
+
+
+def _build_legacy_institutions(db: Session) -> List[InstitutionResponseLegacy]:
+    """All institutions transformed to the legacy schema, crowd counts left at 0"""
+    institutions = institution_service.get_all_institutions(db=db, with_crowd_counts=False)
+    response_data = []
+    for institution in institutions:
+        # Transform branches
+        branches = [
+            BranchResponseLegacy(
+                name=branch.name,
+                branchId=branch.branchId,
+                address=branch.address,
+                serviceHours=branch.serviceHours,
+                serviceDescription=branch.serviceDescription,
+                latitude=branch.latitude,
+                longitude=branch.longitude,
+                totalCrowdCount=branch.totalCrowdCount,
+            )
+            for branch in institution.branches
+        ]
+
+        # Transform institution type
+        institution_type = InstitutionTypeResponse(
+            institutionTypeId=institution.institutionType.institutionTypeId,
+            institutionType=institution.institutionType.institutionType,
+        ) if institution.institutionType else None
+
+        # Transform administrator
+        administrator = AdministratorResponse(
+            userId=institution.administrator.userId,
+            name=institution.administrator.name,
+            email=institution.administrator.email,
+        ) if institution.administrator else None
+
+        # Create institution response
+        institution_response = InstitutionResponseLegacy(
+            name=institution.name,
+            institutionId=institution.institutionId,
+            institutionType=institution_type,
+            administrator=administrator,
+            branches=branches,
+        )
+        response_data.append(institution_response)
+    return response_data
+
+
 @institution_router.get(
     "/institutions/{institution_id}", response_model=InstitutionResponse, tags=["institution"]
 )
@@ -224,11 +321,53 @@ def delete_institution(institution_id: str, db: Session = Depends(get_db)):
 @institution_router.get(
     "/branches", response_model=List[BranchResponse], tags=["institution"]
 )
-def get_all_branches(db: Session = Depends(get_db)):
+def get_all_branches(request: Request, db: Session = Depends(get_db)):
     """Get all branches"""
     try:
-        branches = institution_service.get_all_branches(db=db)
-        return branches
+        return catalog_response(
+            request,
+            db,
+            "branches",
+            lambda: institution_service.get_all_branches(db=db, with_crowd_counts=False),
+            attach=_branch_crowd_counts(db),
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+# Registered before /branches/{branch_id}, which would otherwise capture it
+@institution_router.get(
+    "/branches/crowd-counts", response_model=List[BranchCrowdCountResponse], tags=["institution"]
+)
+def get_branch_crowd_counts(db: Session = Depends(get_db)):
+    """Get the live crowd count of every branch with crowd data"""
+    try:
+        return institution_service.get_branch_crowd_counts(db=db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@institution_router.get(
+    "/branches/nearby", response_model=List[NearbyBranchResponse], tags=["institution"]
+)
+def get_nearby_branches(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the search centre"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the search centre"),
+    radius: float = Query(5.0, gt=0, le=20000, description="Search radius in kilometres"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Get the least crowded branches within a radius, nearest first on ties"""
+    try:
+        return institution_service.get_nearby_branches(
+            db=db, latitude=lat, longitude=lon, radius_km=radius, limit=limit
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -332,70 +471,3 @@ def delete_branch(branch_id: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
         )
-
-
-# Legacy endpoint for backward compatibility
-@institution_router.get(
-    "/institutions/all", response_model=List[InstitutionResponseLegacy], tags=["user"]
-)
-def get_institutions_legacy(db: Session = Depends(get_db)):
-    """Legacy endpoint to get all institutions with old response format"""
-    try:
-        institutions = institution_service.get_all_institutions(db=db)
-        if institutions:
-            # Transform the data to match our legacy schema
-            response_data = []
-            for institution in institutions:
-                # Transform branches
-                branches = [
-                    BranchResponseLegacy(
-                        name=branch.name,
-                        branchId=branch.branchId,
-                        address=branch.address,
-                        serviceHours=branch.serviceHours,
-                        serviceDescription=branch.serviceDescription,
-                        latitude=branch.latitude,
-                        longitude=branch.longitude,
-                        totalCrowdCount=branch.totalCrowdCount,
-                    )
-                    for branch in institution.branches
-                ]
-
-                # Transform institution type
-                institution_type = InstitutionTypeResponse(
-                    institutionTypeId=institution.institutionType.institutionTypeId,
-                    institutionType=institution.institutionType.institutionType,
-                ) if institution.institutionType else None
-
-                # Transform administrator
-                administrator = AdministratorResponse(
-                    userId=institution.administrator.userId,
-                    name=institution.administrator.name,
-                    email=institution.administrator.email,
-                ) if institution.administrator else None
-
-                # Create institution response
-                institution_response = InstitutionResponseLegacy(
-                    name=institution.name,
-                    institutionId=institution.institutionId,
-                    institutionType=institution_type,
-                    administrator=administrator,
-                    branches=branches,
-                )
-                response_data.append(institution_response)
-
-            return JSONResponse(
-                content=jsonable_encoder(response_data),
-                status_code=status.HTTP_200_OK,
-            )
-        else:
-            return JSONResponse(
-                content=jsonable_encoder([]),
-                status_code=status.HTTP_200_OK,
-            )
-    except Exception as e:
-        print(f"Error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error",
-        )
@@ -0,0 +1,39 @@
+from typing import Any, Optional
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.db.pagination import Cursor, decode_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def cursor_query(
+    cursor: Optional[str] = Query(
+        None,
+        description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page; takes precedence over skip",
+    ),
+) -> Optional[Cursor]:
+    """Dependency parsing the keyset cursor of listing routes"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def paginated_response(content: Any, next_cursor: Optional[str]) -> JSONResponse:
+    """List response carrying the cursor of the next page in a header, if any.
+
+    The body stays a plain list so skip/limit clients keep working.
+    """
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(
+        content=jsonable_encoder(content),
+        status_code=status.HTTP_200_OK,
+        headers=headers,
+    )
@@ -1,17 +1,27 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.api.export import EXPORT_FORMAT_PATTERN, export_response
+from app.api.pagination import cursor_query, paginated_response
+from app.db.pagination import Cursor, next_cursor
 from app.db.session import get_db
+from app.db.visitor_log_crud import EXPORT_FIELDS
 from app.schemas.visitor_log_schema import (
     VisitorLogCreate,
     VisitorLogUpdate,
     VisitorLogResponse,
+    VisitorLogBulkResponse,
+    VisitorLogWaitTimeStatsResponse,
+    VisitorLogPercentilesResponse,
 )
+from app.services.bulk_payload import read_bulk_body
 from app.services.visitor_log_service import visitor_log_service
+from core.config import settings
 
 visitor_log_router = APIRouter()
 
@@ -43,6 +53,35 @@ def create_visitor_log(visitor_log: VisitorLogCreate, db: Session = Depends(get_
         )
 
 
+@visitor_log_router.post(
+    "/visitor-logs/bulk",
+    response_model=VisitorLogBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["visitor-logs"],
+)
+async def bulk_create_visitor_logs(request: Request, db: Session = Depends(get_db)):
+    """Create many visitor log entries from a JSON array or an NDJSON body"""
+    try:
+        items = await read_bulk_body(request, settings.VISITOR_LOG_BULK_MAX_ITEMS)
+
+        # Database work is synchronous, keep it off the event loop
+        result = await run_in_threadpool(
+            visitor_log_service.bulk_create_visitor_logs, db=db, items=items
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(result),
+            status_code=status.HTTP_201_CREATED,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
 @visitor_log_router.get(
     "/visitor-logs/{visitor_log_id}",
     response_model=VisitorLogResponse,
@@ -76,17 +115,17 @@ def get_visitor_log(visitor_log_id: str, db: Session = Depends(get_db)):
 def get_all_visitor_logs(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get all visitor log entries with pagination"""
     try:
         visitor_logs = visitor_log_service.get_all_visitor_logs(
-            db=db, skip=skip, limit=limit
+            db=db, skip=skip, limit=limit, cursor=cursor
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(visitor_logs),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            visitor_logs, next_cursor(visitor_logs, limit, "checkInTime", "visitorLogId")
         )
     except HTTPException:
         raise
@@ -106,17 +145,17 @@ def get_visitor_logs_by_branch(
     branch_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get visitor logs for a specific branch"""
     try:
         visitor_logs = visitor_log_service.get_visitor_logs_by_branch(
-            db=db, branch_id=branch_id, skip=skip, limit=limit
+            db=db, branch_id=branch_id, skip=skip, limit=limit, cursor=cursor
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(visitor_logs),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            visitor_logs, next_cursor(visitor_logs, limit, "checkInTime", "visitorLogId")
         )
     except HTTPException:
         raise
@@ -127,6 +166,28 @@ def get_visitor_logs_by_branch(
         )
 
 
+@visitor_log_router.get(
+    "/visitor-logs/branch/{branch_id}/export",
+    tags=["visitor-logs"],
+)
+def export_visitor_logs(
+    branch_id: str,
+    start_date: datetime = Query(..., description="Start of the check-in range (ISO format)"),
+    end_date: datetime = Query(..., description="End of the check-in range (ISO format)"),
+    export_format: str = Query(
+        "ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Stream the visitor logs of a branch within a date range as NDJSON or CSV"""
+    rows = visitor_log_service.iter_visitor_logs_by_branch(
+        db=db, branch_id=branch_id, start_date=start_date, end_date=end_date
+    )
+    return export_response(
+        db, rows, EXPORT_FIELDS, export_format, f"visitor-logs-{branch_id}"
+    )
+
+
 @visitor_log_router.get(
     "/visitor-logs/branch/{branch_id}/last-30-days",
     response_model=List[VisitorLogResponse],
@@ -154,6 +215,66 @@ def get_visitor_logs_by_branch_last_30_days(
         )
 
 
+@visitor_log_router.get(
+    "/visitor-logs/branch/{branch_id}/wait-time-stats",
+    response_model=VisitorLogWaitTimeStatsResponse,
+    tags=["visitor-logs"],
+)
+def get_wait_time_stats_by_branch(branch_id: str, db: Session = Depends(get_db)):
+    """Get running wait time statistics and percentiles of a branch"""
+    try:
+        stats = visitor_log_service.get_wait_time_stats_by_branch(db=db, branch_id=branch_id)
+
+        return JSONResponse(
+            content=jsonable_encoder(stats),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@visitor_log_router.get(
+    "/visitor-logs/branch/{branch_id}/percentiles",
+    response_model=VisitorLogPercentilesResponse,
+    tags=["visitor-logs"],
+)
+def get_wait_time_percentiles(
+    branch_id: str,
+    start_date: Optional[datetime] = Query(
+        None, alias="from", description="Start date (ISO format), default 30 days before to"
+    ),
+    end_date: Optional[datetime] = Query(None, alias="to", description="End date (ISO format), default now"),
+    hourly: bool = Query(False, description="Add percentiles per hour of the day"),
+    db: Session = Depends(get_db),
+):
+    """Get p50/p90/p99 wait times of a branch's check-ins within a date range"""
+    try:
+        percentiles = visitor_log_service.get_wait_time_percentiles(
+            db=db,
+            branch_id=branch_id,
+            start_date=start_date,
+            end_date=end_date,
+            hourly=hourly,
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(percentiles),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
 @visitor_log_router.get(
     "/visitor-logs/branch/{branch_id}/average-wait-time",
     tags=["visitor-logs"],
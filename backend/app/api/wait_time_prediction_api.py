@@ -1,16 +1,24 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
+from app.api.pagination import cursor_query, paginated_response
+from app.db.pagination import Cursor, next_cursor
 from app.db.session import get_db
 from app.schemas.wait_time_prediction_schema import (
     WaitTimePredictionUpdate,
     WaitTimePredictionResponse,
     WaitTimePredictionRequest,
+    WaitTimePredictionBatchRequest,
+    PredictionCacheStatsResponse,
+    BranchHeatmapResponse,
+    BestTimeSlot,
 )
+from app.services.branch_heatmap_service import branch_heatmap_service
+from app.services.prediction_cache import prediction_cache
 from app.services.wait_time_prediction_service import wait_time_prediction_service
 
 wait_time_prediction_router = APIRouter()
@@ -22,13 +30,13 @@ wait_time_prediction_router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     tags=["wait-time-predictions"],
 )
-def create_wait_time_prediction(
+async def create_wait_time_prediction(
     prediction_request: WaitTimePredictionRequest, db: Session = Depends(get_db)
 ):
-    """Create a new wait time prediction using OpenAI"""
+    """Create a new wait time prediction with the configured prediction engine"""
     try:
         # Create the wait time prediction
-        created_prediction = wait_time_prediction_service.create_wait_time_prediction(
+        created_prediction = await wait_time_prediction_service.create_wait_time_prediction(
             db=db, prediction_request=prediction_request
         )
 
@@ -45,6 +53,34 @@ def create_wait_time_prediction(
         )
 
 
+@wait_time_prediction_router.post(
+    "/wait-time-predictions/batch",
+    response_model=List[WaitTimePredictionResponse],
+    status_code=status.HTTP_201_CREATED,
+    tags=["wait-time-predictions"],
+)
+def create_wait_time_predictions(
+    batch_request: WaitTimePredictionBatchRequest, db: Session = Depends(get_db)
+):
+    """Create wait time predictions for many branches or visit times with the local model"""
+    try:
+        created_predictions = wait_time_prediction_service.create_wait_time_predictions(
+            db=db, batch_request=batch_request
+        )
+
+        return JSONResponse(
+            content=jsonable_encoder(created_predictions),
+            status_code=status.HTTP_201_CREATED,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
 @wait_time_prediction_router.get(
     "/wait-time-predictions/{wait_time_prediction_id}",
     response_model=WaitTimePredictionResponse,
@@ -80,17 +116,17 @@ def get_wait_time_prediction(
 def get_all_wait_time_predictions(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get all wait time prediction entries with pagination"""
     try:
         predictions = wait_time_prediction_service.get_all_wait_time_predictions(
-            db=db, skip=skip, limit=limit
+            db=db, skip=skip, limit=limit, cursor=cursor
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(predictions),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            predictions, next_cursor(predictions, limit, "predictedAt", "waitTimePredictionId")
         )
     except HTTPException:
         raise
@@ -110,17 +146,17 @@ def get_wait_time_predictions_by_visitor(
     visitor_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get wait time predictions for a specific visitor"""
     try:
         predictions = wait_time_prediction_service.get_wait_time_predictions_by_visitor(
-            db=db, visitor_id=visitor_id, skip=skip, limit=limit
+            db=db, visitor_id=visitor_id, skip=skip, limit=limit, cursor=cursor
         )
 
-        return JSONResponse(
-            content=jsonable_encoder(predictions),
-            status_code=status.HTTP_200_OK,
+        return paginated_response(
+            predictions, next_cursor(predictions, limit, "predictedAt", "waitTimePredictionId")
         )
     except HTTPException:
         raise
@@ -140,16 +176,89 @@ def get_wait_time_predictions_by_branch(
     branch_id: str,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[Cursor] = Depends(cursor_query),
     db: Session = Depends(get_db),
 ):
     """Get wait time predictions for a specific branch"""
     try:
         predictions = wait_time_prediction_service.get_wait_time_predictions_by_branch(
-            db=db, branch_id=branch_id, skip=skip, limit=limit
+            db=db, branch_id=branch_id, skip=skip, limit=limit, cursor=cursor
+        )
+
+        return paginated_response(
+            predictions, next_cursor(predictions, limit, "predictedAt", "waitTimePredictionId")
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@wait_time_prediction_router.get(
+    "/wait-time-predictions/cache/stats",
+    response_model=PredictionCacheStatsResponse,
+    tags=["wait-time-predictions"],
+)
+def get_prediction_cache_stats():
+    """Get hit/miss counters of the prediction cache"""
+    return JSONResponse(
+        content=prediction_cache.stats(),
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@wait_time_prediction_router.get(
+    "/branches/{branch_id}/heatmap",
+    response_model=BranchHeatmapResponse,
+    tags=["wait-time-predictions"],
+)
+def get_branch_heatmap(branch_id: str, db: Session = Depends(get_db)):
+    """Get a branch's expected wait and crowd for every day of the week and hour"""
+    try:
+        heatmap = branch_heatmap_service.get_heatmap(db=db, branch_id=branch_id)
+
+        return JSONResponse(
+            content=jsonable_encoder(heatmap),
+            status_code=status.HTTP_200_OK,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+@wait_time_prediction_router.get(
+    "/branches/{branch_id}/best-times",
+    response_model=List[BestTimeSlot],
+    tags=["wait-time-predictions"],
+)
+def get_branch_best_times(
+    branch_id: str,
+    limit: int = Query(5, ge=1, le=168, description="Number of time slots to return"),
+    day: Optional[int] = Query(None, ge=0, le=6, description="Day of the week, 0 = Monday"),
+    start_hour: int = Query(0, ge=0, le=23, alias="startHour", description="First hour to consider"),
+    end_hour: int = Query(24, ge=1, le=24, alias="endHour", description="Hour to stop before"),
+    db: Session = Depends(get_db),
+):
+    """Get the hours with the shortest expected wait at a branch"""
+    try:
+        best_times = branch_heatmap_service.get_best_times(
+            db=db,
+            branch_id=branch_id,
+            limit=limit,
+            day_of_week=day,
+            start_hour=start_hour,
+            end_hour=end_hour,
         )
 
         return JSONResponse(
-            content=jsonable_encoder(predictions),
+            content=jsonable_encoder(best_times),
             status_code=status.HTTP_200_OK,
         )
     except HTTPException:
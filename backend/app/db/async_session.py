@@ -0,0 +1,48 @@
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from core.config import settings
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_engine: Optional[AsyncEngine] = None
+_async_session_local: Optional[async_sessionmaker] = None
+
+
+def async_database_uri(database_uri: str) -> str:
+    """Swap the driver of a database URL for its asyncio driver"""
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Create the AsyncEngine on first use, so the async drivers stay optional"""
+    global _engine, _async_session_local
+    if _engine is None:
+        database_uri = settings.ASYNC_SQLALCHEMY_DATABASE_URI or async_database_uri(
+            settings.SQLALCHEMY_DATABASE_URI
+        )
+        _engine = create_async_engine(
+            database_uri, pool_size=32, max_overflow=20, pool_pre_ping=True
+        )
+        # Nothing can lazy-load on an AsyncSession, keep attributes after commit
+        _async_session_local = async_sessionmaker(
+            bind=_engine, autoflush=False, expire_on_commit=False
+        )
+    return _engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_session_local() as db:
+        yield db
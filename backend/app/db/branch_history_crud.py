@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db.time_buckets import hour_of_week
+from app.models import CrowdData, VisitorLog
+
+WAIT_TIMES = "wait_times"
+CROWD_COUNTS = "crowd_counts"
+
+
+class BranchHistoryCRUD:
+    def get_history_aggregates(
+        self, db: Session, branch_id: str, since: datetime
+    ) -> List:
+        """Get hour-of-week histograms of a branch's wait times and crowd counts.
+
+        Runs one query over both tables, grouped by (source, hour-of-week,
+        value), so the result size depends on the number of distinct values
+        rather than on how many rows were recorded. Each row has `source`
+        (WAIT_TIMES or CROWD_COUNTS), `bucket`, `value` and `count`.
+        """
+        dialect = db.get_bind().dialect.name
+
+        log_bucket = hour_of_week(VisitorLog.CheckInTime, dialect).label("bucket")
+        wait_times = (
+            select(
+                literal(WAIT_TIMES).label("source"),
+                log_bucket,
+                VisitorLog.WaitTimeInMinutes.label("value"),
+                func.count().label("count"),
+            )
+            .where(
+                VisitorLog.BranchId == branch_id,
+                VisitorLog.CheckInTime >= since,
+                VisitorLog.WaitTimeInMinutes.isnot(None),
+            )
+            .group_by(log_bucket, VisitorLog.WaitTimeInMinutes)
+        )
+
+        crowd_bucket = hour_of_week(CrowdData.Timestamp, dialect).label("bucket")
+        crowd_counts = (
+            select(
+                literal(CROWD_COUNTS).label("source"),
+                crowd_bucket,
+                CrowdData.CurrentCrowdCount.label("value"),
+                func.count().label("count"),
+            )
+            .where(
+                CrowdData.BranchId == branch_id,
+                CrowdData.Timestamp >= since,
+                CrowdData.CurrentCrowdCount.isnot(None),
+            )
+            .group_by(crowd_bucket, CrowdData.CurrentCrowdCount)
+        )
+
+        return db.execute(union_all(wait_times, crowd_counts)).all()
+
+    def get_bucket_totals(
+        self, db: Session, since: datetime, branch_ids: Optional[Sequence[str]] = None
+    ) -> List:
+        """Get per-branch hour-of-week totals of wait times and crowd counts.
+
+        One query over both tables grouped by (source, branch, hour-of-week),
+        so every branch is covered in a single pass. Each row has `source`,
+        `branch_id`, `bucket`, `total` and `count`. Limited to `branch_ids`
+        when given.
+        """
+        dialect = db.get_bind().dialect.name
+
+        log_bucket = hour_of_week(VisitorLog.CheckInTime, dialect).label("bucket")
+        wait_times = (
+            select(
+                literal(WAIT_TIMES).label("source"),
+                VisitorLog.BranchId.label("branch_id"),
+                log_bucket,
+                func.sum(VisitorLog.WaitTimeInMinutes).label("total"),
+                func.count().label("count"),
+            )
+            .where(VisitorLog.CheckInTime >= since, VisitorLog.WaitTimeInMinutes.isnot(None))
+            .group_by(VisitorLog.BranchId, log_bucket)
+        )
+
+        crowd_bucket = hour_of_week(CrowdData.Timestamp, dialect).label("bucket")
+        crowd_counts = (
+            select(
+                literal(CROWD_COUNTS).label("source"),
+                CrowdData.BranchId.label("branch_id"),
+                crowd_bucket,
+                func.sum(CrowdData.CurrentCrowdCount).label("total"),
+                func.count().label("count"),
+            )
+            .where(CrowdData.Timestamp >= since, CrowdData.CurrentCrowdCount.isnot(None))
+            .group_by(CrowdData.BranchId, crowd_bucket)
+        )
+
+        if branch_ids is not None:
+            wait_times = wait_times.where(VisitorLog.BranchId.in_(branch_ids))
+            crowd_counts = crowd_counts.where(CrowdData.BranchId.in_(branch_ids))
+
+        return db.execute(union_all(wait_times, crowd_counts)).all()
+
+
+branch_history_crud = BranchHistoryCRUD()
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.time_buckets import EPOCH, epoch_bucket
+from app.models import CrowdData, CrowdDataRollup
+
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# (BranchId, Timestamp, CurrentCrowdCount)
+Reading = Tuple[str, datetime, int]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the hour or day a timestamp falls in"""
+    hour = timestamp.replace(minute=0, second=0, microsecond=0)
+    return hour if granularity == HOUR else hour.replace(hour=0)
+
+
+class CrowdRollupCRUD:
+    def _upsert(self, db: Session, rows: List[Dict]) -> None:
+        """Merge partial aggregates into the stored ones with one INSERT ... ON CONFLICT"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(CrowdDataRollup).values(rows)
+            least, greatest = func.least, func.greatest
+        else:
+            # SQLite's scalar min()/max() take several arguments
+            stmt = sqlite.insert(CrowdDataRollup).values(rows)
+            least, greatest = func.min, func.max
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["BranchId", "Granularity", "BucketStart"],
+            set_={
+                "MinCrowdCount": least(CrowdDataRollup.MinCrowdCount, stmt.excluded.MinCrowdCount),
+                "MaxCrowdCount": greatest(CrowdDataRollup.MaxCrowdCount, stmt.excluded.MaxCrowdCount),
+                "SumCrowdCount": CrowdDataRollup.SumCrowdCount + stmt.excluded.SumCrowdCount,
+                "SampleCount": CrowdDataRollup.SampleCount + stmt.excluded.SampleCount,
+            },
+        )
+        db.execute(stmt)
+
+    def add_readings(self, db: Session, readings: Iterable[Reading]) -> None:
+        """Fold new crowd readings into their hourly and daily rollups.
+
+        Readings are aggregated per bucket first, so a bulk insert costs one
+        statement for all the buckets it touched. Does not commit.
+        """
+        buckets: Dict[Tuple[str, str, datetime], List[int]] = {}
+        for branch_id, timestamp, count in readings:
+            if branch_id is None or timestamp is None or count is None:
+                continue
+            for granularity in GRANULARITIES:
+                key = (branch_id, granularity, bucket_start(timestamp, granularity))
+                aggregate = buckets.get(key)
+                if aggregate is None:
+                    buckets[key] = [count, count, count, 1]
+                else:
+                    aggregate[0] = min(aggregate[0], count)
+                    aggregate[1] = max(aggregate[1], count)
+                    aggregate[2] += count
+                    aggregate[3] += 1
+        if not buckets:
+            return
+
+        self._upsert(db, [
+            {
+                "BranchId": branch_id,
+                "Granularity": granularity,
+                "BucketStart": start,
+                "MinCrowdCount": minimum,
+                "MaxCrowdCount": maximum,
+                "SumCrowdCount": total,
+                "SampleCount": samples,
+            }
+            for (branch_id, granularity, start), (minimum, maximum, total, samples) in buckets.items()
+        ])
+
+    def rebuild(
+        self,
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        branch_ids: Optional[List[str]] = None,
+    ) -> int:
+        """Recompute the rollups of whole days from the raw crowd data.
+
+        Used after raw rows are edited or deleted (min/max cannot be
+        decremented) and to backfill. `start`/`end` are rounded out to day
+        boundaries; None means unbounded. Returns the number of buckets
+        written. Does not commit.
+        """
+        if start is not None:
+            start = bucket_start(start, DAY)
+        if end is not None and end != bucket_start(end, DAY):
+            end = bucket_start(end, DAY) + GRANULARITIES[DAY]
+
+        stale = delete(CrowdDataRollup)
+        raw_filters = [
+            CrowdData.BranchId.isnot(None),
+            CrowdData.Timestamp.isnot(None),
+            CrowdData.CurrentCrowdCount.isnot(None),
+        ]
+        if start is not None:
+            stale = stale.where(CrowdDataRollup.BucketStart >= start)
+            raw_filters.append(CrowdData.Timestamp >= start)
+        if end is not None:
+            stale = stale.where(CrowdDataRollup.BucketStart < end)
+            raw_filters.append(CrowdData.Timestamp < end)
+        if branch_ids is not None:
+            stale = stale.where(CrowdDataRollup.BranchId.in_(branch_ids))
+            raw_filters.append(CrowdData.BranchId.in_(branch_ids))
+        db.execute(stale)
+
+        dialect = db.get_bind().dialect.name
+        written = 0
+        for granularity, size in GRANULARITIES.items():
+            bucket = epoch_bucket(CrowdData.Timestamp, int(size.total_seconds()), dialect).label("bucket")
+            aggregates = db.execute(
+                select(
+                    CrowdData.BranchId,
+                    bucket,
+                    func.min(CrowdData.CurrentCrowdCount),
+                    func.max(CrowdData.CurrentCrowdCount),
+                    func.sum(CrowdData.CurrentCrowdCount),
+                    func.count(),
+                )
+                .where(*raw_filters)
+                .group_by(CrowdData.BranchId, bucket)
+            ).all()
+            if aggregates:
+                db.execute(CrowdDataRollup.__table__.insert(), [
+                    {
+                        "BranchId": branch_id,
+                        "Granularity": granularity,
+                        "BucketStart": EPOCH + timedelta(seconds=int(epoch)),
+                        "MinCrowdCount": minimum,
+                        "MaxCrowdCount": maximum,
+                        "SumCrowdCount": total,
+                        "SampleCount": samples,
+                    }
+                    for branch_id, epoch, minimum, maximum, total, samples in aggregates
+                ])
+                written += len(aggregates)
+        return written
+
+    def rebuild_day(self, db: Session, branch_id: Optional[str], timestamp: Optional[datetime]) -> None:
+        """Recompute a branch's rollups for the day of a changed or deleted row"""
+        if branch_id is None or timestamp is None:
+            return
+        db.flush()
+        start = bucket_start(timestamp, DAY)
+        self.rebuild(db, start, start + GRANULARITIES[DAY], [branch_id])
+
+    def is_expired_day(self, db: Session, branch_id: str, timestamp: datetime) -> bool:
+        """Whether retention deleted raw rows of a branch's day that its rollup still counts.
+
+        Such a day cannot be rebuilt from the raw rows without losing them.
+        """
+        start = bucket_start(timestamp, DAY)
+        rolled_up = db.query(CrowdDataRollup.SampleCount).filter(
+            CrowdDataRollup.BranchId == branch_id,
+            CrowdDataRollup.Granularity == DAY,
+            CrowdDataRollup.BucketStart == start,
+        ).scalar()
+        if not rolled_up:
+            return False
+        raw = db.query(func.count()).select_from(CrowdData).filter(
+            CrowdData.BranchId == branch_id,
+            CrowdData.Timestamp >= start,
+            CrowdData.Timestamp < start + GRANULARITIES[DAY],
+            CrowdData.CurrentCrowdCount.isnot(None),
+        ).scalar()
+        return raw < rolled_up
+
+    def get_rollups(
+        self,
+        db: Session,
+        branch_id: str,
+        granularity: str,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> List[CrowdDataRollup]:
+        """Get the rollups of a branch with start_date <= BucketStart < end_date"""
+        return (
+            db.query(CrowdDataRollup)
+            .filter(
+                CrowdDataRollup.BranchId == branch_id,
+                CrowdDataRollup.Granularity == granularity,
+                CrowdDataRollup.BucketStart >= start_date,
+                CrowdDataRollup.BucketStart < end_date,
+            )
+            .order_by(CrowdDataRollup.BucketStart)
+            .all()
+        )
+
+
+crowd_rollup_crud = CrowdRollupCRUD()
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.time_buckets import epoch_bucket
+from app.models import CrowdData
+
+AVG = "avg"
+MAX = "max"
+P95 = "p95"
+
+
+class CrowdSeriesCRUD:
+    def get_series(
+        self,
+        db: Session,
+        branch_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        bucket_seconds: int,
+        agg: str,
+    ) -> List:
+        """Downsample a branch's crowd counts into fixed-size time buckets.
+
+        Aggregation runs in the database, so the result has one row per
+        non-empty bucket, with `bucket` (epoch seconds of its start),
+        `value` and `samples`. p95 is the nearest-rank 95th percentile.
+        """
+        dialect = db.get_bind().dialect.name
+        bucket = epoch_bucket(CrowdData.Timestamp, bucket_seconds, dialect).label("bucket")
+        in_range = (
+            CrowdData.BranchId == branch_id,
+            CrowdData.Timestamp >= start_date,
+            CrowdData.Timestamp <= end_date,
+            CrowdData.CurrentCrowdCount.isnot(None),
+        )
+
+        if agg != P95 or dialect == "postgresql":
+            if agg == AVG:
+                value = func.avg(CrowdData.CurrentCrowdCount)
+            elif agg == MAX:
+                value = func.max(CrowdData.CurrentCrowdCount)
+            else:
+                value = func.percentile_disc(0.95).within_group(CrowdData.CurrentCrowdCount)
+            query = (
+                select(bucket, value.label("value"), func.count().label("samples"))
+                .where(*in_range)
+                .group_by(bucket)
+                .order_by(bucket)
+            )
+            return db.execute(query).all()
+
+        # No percentile aggregate elsewhere: keep the row ranked ceil(0.95 * n) in each bucket
+        ranked = (
+            select(
+                bucket,
+                CrowdData.CurrentCrowdCount.label("value"),
+                func.row_number()
+                .over(partition_by=bucket, order_by=CrowdData.CurrentCrowdCount)
+                .label("rn"),
+                func.count().over(partition_by=bucket).label("samples"),
+            )
+            .where(*in_range)
+            .subquery()
+        )
+        query = (
+            select(ranked.c.bucket, ranked.c.value, ranked.c.samples)
+            .where(ranked.c.rn == (ranked.c.samples * 95 + 99) // 100)
+            .order_by(ranked.c.bucket)
+        )
+        return db.execute(query).all()
+
+
+crowd_series_crud = CrowdSeriesCRUD()
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 
+from app.db.pagination import Cursor, paginate
 from app.models import Base
 
 ModelType = TypeVar("ModelType", bound=Base)  # type: ignore
@@ -42,9 +43,22 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.query(self.model).filter(getattr(self.model, field) == value).all()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        sort_field: Optional[str] = None,
+        cursor: Optional[Cursor] = None,
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        """Get a page of rows; with `sort_field`, newest first with keyset cursor support"""
+        query = db.query(self.model)
+        if sort_field is None:
+            return query.offset(skip).limit(limit).all()
+        id_column = self.model.__mapper__.primary_key[0]
+        return paginate(
+            query, getattr(self.model, sort_field), id_column, skip, limit, cursor
+        ).all()
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
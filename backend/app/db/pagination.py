@@ -0,0 +1,76 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page, in (sort value, id) order"""
+
+    sort_value: Optional[datetime]
+    id: str
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: str) -> str:
+    payload = [sort_value.isoformat() if sort_value is not None else None, row_id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Parse an opaque cursor, raising ValueError if it was not issued by us"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(row_id, str):
+            raise ValueError("Invalid cursor")
+        return Cursor(
+            datetime.fromisoformat(sort_value) if sort_value is not None else None, row_id
+        )
+    except (binascii.Error, json.JSONDecodeError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def next_cursor(
+    items: Sequence[Any], limit: int, sort_attr: str, id_attr: str
+) -> Optional[str]:
+    """Cursor of the page after `items`, or None when the page was not full"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+
+
+def paginate(
+    query: Query,
+    sort_column,
+    id_column,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = None,
+) -> Query:
+    """Order newest first and select one page, by keyset when a cursor is given.
+
+    The order is (sort_column DESC NULLS FIRST, id_column DESC), PostgreSQL's
+    default for descending indexes. With a cursor the page starts right after
+    it through an indexable row-value comparison, so deep pages cost the same
+    as the first one; `skip` is ignored then.
+    """
+    query = query.order_by(sort_column.desc().nulls_first(), id_column.desc())
+    if cursor is None:
+        return query.offset(skip).limit(limit)
+
+    if cursor.sort_value is None:
+        # Still inside the leading rows without a sort value
+        query = query.filter(
+            or_(
+                and_(sort_column.is_(None), id_column < cursor.id),
+                sort_column.isnot(None),
+            )
+        )
+    else:
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(cursor.sort_value, cursor.id))
+    return query.limit(limit)
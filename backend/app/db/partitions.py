@@ -0,0 +1,152 @@
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Tables range-partitioned by month on PostgreSQL, and their partition key
+PARTITIONED_TABLES = {
+    "crowd_data": "Timestamp",
+    "visitor_logs": "CheckInTime",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(timestamp: datetime) -> datetime:
+    """Start of the month a timestamp falls in"""
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Start of the month `months` after the month starting at `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of a table's partition for a month, e.g. crowd_data_p202501"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of a table's catch-all partition for rows outside every month"""
+    return f"{table}_default"
+
+
+class PartitionCRUD:
+    """Monthly range partitions of the time-series tables (PostgreSQL only).
+
+    On other databases, or before the partitioning migration has run, the
+    tables are plain tables and every method is a no-op.
+    """
+
+    def is_partitioned(self, db: Session, table: str) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        return db.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table},
+        ).first() is not None
+
+    def get_partitions(self, db: Session, table: str) -> List[Tuple[str, datetime]]:
+        """(name, month start) of a table's monthly partitions, oldest first"""
+        if not self.is_partitioned(db, table):
+            return []
+        names = db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(:table)"
+            ),
+            {"table": table},
+        ).scalars()
+        partitions = []
+        for name in names:
+            match = _PARTITION_SUFFIX.search(name)
+            if match:
+                partitions.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def create_partition(self, db: Session, table: str, month: datetime) -> bool:
+        """Create a table's partition for a month unless it exists.
+
+        Rows of that month already routed to the default partition are moved
+        into the new partition before it is attached, since PostgreSQL
+        refuses to attach a partition whose rows the default one holds.
+        Returns whether a partition was created. Does not commit.
+        """
+        name = partition_name(table, month)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return False
+
+        column = PARTITIONED_TABLES[table]
+        start, end = month_start(month), add_months(month_start(month), 1)
+        db.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS)'))
+        db.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+                f'WHERE "{column}" >= :start AND "{column}" < :end RETURNING *) '
+                f'INSERT INTO "{name}" SELECT * FROM moved'
+            ),
+            {"start": start, "end": end},
+        )
+        db.execute(text(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        return True
+
+    def ensure_partitions(
+        self, db: Session, months_ahead: int, now: Optional[datetime] = None
+    ) -> List[str]:
+        """Create the partitions of the current and next `months_ahead` months.
+
+        Also creates the partitions of any month with rows in a default
+        partition, e.g. back-dated imports. Returns the names of the
+        partitions created. Does not commit.
+        """
+        current = month_start(now or datetime.now())
+        created = []
+        for table, column in PARTITIONED_TABLES.items():
+            if not self.is_partitioned(db, table):
+                continue
+            months = {add_months(current, i) for i in range(months_ahead + 1)}
+            months.update(
+                month_start(month)
+                for month in db.execute(text(
+                    f"SELECT DISTINCT date_trunc('month', \"{column}\") "
+                    f'FROM "{default_partition_name(table)}"'
+                )).scalars()
+            )
+            for month in sorted(months):
+                if self.create_partition(db, table, month):
+                    created.append(partition_name(table, month))
+        return created
+
+    def detach_partition(self, db: Session, table: str, month: datetime, drop: bool = False) -> None:
+        """Detach a month's partition from its table, and drop it if `drop`.
+
+        A detached partition keeps its rows as a standalone table, to be
+        archived or dropped later without touching the live table.
+        Does not commit.
+        """
+        name = partition_name(table, month)
+        db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        if drop:
+            db.execute(text(f'DROP TABLE "{name}"'))
+
+    def detach_partitions_before(
+        self, db: Session, table: str, before: datetime, drop: bool = False
+    ) -> List[str]:
+        """Detach the partitions of the months ending on or before `before`"""
+        detached = []
+        for name, month in self.get_partitions(db, table):
+            if add_months(month, 1) <= before:
+                self.detach_partition(db, table, month, drop=drop)
+                detached.append(name)
+        return detached
+
+
+partition_crud = PartitionCRUD()
@@ -1,5 +1,10 @@
-from sqlalchemy import create_engine
+import random
+from typing import Optional, Sequence
+
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from starlette.requests import HTTPConnection
 
 from core.config import settings
 
@@ -7,11 +12,78 @@ engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI, pool_size=32, max_overflow=20, pool_pre_ping=True
 )
 
+replica_engines = [
+    create_engine(uri.strip(), pool_size=32, max_overflow=20, pool_pre_ping=True)
+    for uri in (settings.SQLALCHEMY_REPLICA_DATABASE_URIS or "").split(",")
+    if uri.strip()
+]
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica until it is pinned to the primary.
+
+    One replica is picked per session (i.e. per request), so reads within a
+    request are monotonic. `use_primary()` pins the session; write requests
+    are pinned from the start by get_db, and services pin before reading
+    what they are about to change. A flush or INSERT/UPDATE/DELETE statement
+    pins it as a last resort, so everything read after writing sees its own
+    writes.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica: Optional[Engine] = random.choice(replicas) if replicas else None
+        self.pinned = self.replica is None
+
+    def use_primary(self) -> None:
+        """Send every remaining statement of the session to the primary"""
+        self.pinned = True
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if isinstance(clause, (Insert, Update, Delete)):
+            self.pinned = True
+        if self.pinned:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return self.replica
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _pin_before_flush(session: RoutingSession, flush_context, instances) -> None:
+    session.use_primary()
+
+
+def use_primary(db: Session) -> None:
+    """Pin a request session to the primary before a read-then-write path.
+
+    Reads that decide a write (previous values, rows about to be changed,
+    SELECT ... FOR UPDATE) must not see a lagging replica. Sessions that
+    always use the primary are left as they are.
+    """
+    if isinstance(db, RoutingSession):
+        db.use_primary()
+
+
+# Always the primary: maintenance jobs and CLI commands that read then write
 session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Request sessions: reads go to a replica when SQLALCHEMY_REPLICA_DATABASE_URIS is set
+routing_session_local = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replicas=replica_engines,
+)
+
+
+# Requests that may write; they use the primary for all of their statements
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
 
-def get_db() -> Session:
-    db = session_local()
+def get_db(connection: HTTPConnection) -> Session:
+    db = routing_session_local()
+    if connection.scope.get("method") in WRITE_METHODS:
+        db.use_primary()
     try:
         yield db
     finally:
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, cast, extract, func
+from sqlalchemy.sql.elements import ColumnElement
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def hour_of_week(column, dialect_name: str) -> ColumnElement:
+    """SQL expression mapping a timestamp to its hour-of-week bucket.
+
+    Monday 00:00 is bucket 0 and Sunday 23:00 is bucket 167, matching
+    app.services.wait_time_predictor.hour_of_week.
+    """
+    if dialect_name == "postgresql":
+        # ISODOW: Monday = 1 ... Sunday = 7
+        return cast(
+            (extract("isodow", column) - 1) * 24 + extract("hour", column), Integer
+        )
+    # SQLite: %w is Sunday = 0 ... Saturday = 6
+    weekday = (cast(func.strftime("%w", column), Integer) + 6) % 7
+    return weekday * 24 + cast(func.strftime("%H", column), Integer)
+
+
+def epoch_bucket(column, bucket_seconds: int, dialect_name: str) -> ColumnElement:
+    """SQL expression flooring a timestamp to a bucket, as epoch seconds.
+
+    Naive timestamps are treated as UTC, so hour and day buckets start on
+    the hour and at midnight.
+    """
+    if dialect_name == "postgresql":
+        epoch = cast(func.floor(extract("epoch", column) / bucket_seconds), BigInteger)
+        return epoch * bucket_seconds
+    # SQLite: integer division of %s floors non-negative epochs
+    return cast(func.strftime("%s", column), Integer) // bucket_seconds * bucket_seconds
@@ -1,12 +1,25 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Row
 from fastapi import HTTPException, status
 
+from app.db.pagination import Cursor, paginate
 from app.models import VisitorLog, Branch
 from app.schemas.visitor_log_schema import VisitorLogCreate, VisitorLogUpdate
 
+EXPORT_FIELDS = (
+    "visitorLogId",
+    "visitorName",
+    "branchId",
+    "checkInTime",
+    "serviceStartTime",
+    "waitTimeInMinutes",
+)
+# Rows fetched per round trip by the export's server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
 
 class VisitorLogCRUD:
     def create_visitor_log(
@@ -34,6 +47,18 @@ class VisitorLogCRUD:
                 detail=f"Failed to create visitor log: {str(e)}",
             )
 
+    def bulk_create_visitor_logs(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """Insert many visitor log rows with a single multi-row INSERT and commit"""
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(VisitorLog), rows)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+
     def get_visitor_log(self, db: Session, visitor_log_id: str) -> Optional[VisitorLog]:
         """Get a single visitor log entry by ID"""
         visitor_log = (
@@ -49,32 +74,68 @@ class VisitorLogCRUD:
         return visitor_log
 
     def get_all_visitor_logs(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
     ) -> List[VisitorLog]:
         """Get all visitor log entries with pagination"""
-        visitor_logs = (
-            db.query(VisitorLog)
-            .order_by(VisitorLog.CheckInTime.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        visitor_logs = paginate(
+            db.query(VisitorLog),
+            VisitorLog.CheckInTime,
+            VisitorLog.VisitorLogId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return visitor_logs
 
     def get_visitor_logs_by_branch(
-        self, db: Session, branch_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        branch_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[VisitorLog]:
         """Get visitor logs for a specific branch"""
-        visitor_logs = (
-            db.query(VisitorLog)
-            .filter(VisitorLog.BranchId == branch_id)
-            .order_by(VisitorLog.CheckInTime.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        visitor_logs = paginate(
+            db.query(VisitorLog).filter(VisitorLog.BranchId == branch_id),
+            VisitorLog.CheckInTime,
+            VisitorLog.VisitorLogId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return visitor_logs
 
+    def iter_visitor_logs_by_branch(
+        self, db: Session, branch_id: str, start_date: datetime, end_date: datetime
+    ) -> Iterator[Row]:
+        """Stream visitor logs of a branch checked in within a date range.
+
+        Rows come oldest first in EXPORT_FIELDS order from a server-side
+        cursor; nothing runs until the first row is requested.
+        """
+        result = db.execute(
+            select(
+                VisitorLog.VisitorLogId,
+                VisitorLog.VisitorName,
+                VisitorLog.BranchId,
+                VisitorLog.CheckInTime,
+                VisitorLog.ServiceStartTime,
+                VisitorLog.WaitTimeInMinutes,
+            )
+            .where(
+                VisitorLog.BranchId == branch_id,
+                VisitorLog.CheckInTime >= start_date,
+                VisitorLog.CheckInTime <= end_date,
+            )
+            .order_by(VisitorLog.CheckInTime.asc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        try:
+            yield from result
+        finally:
+            result.close()
+
     def get_visitor_logs_by_branch_last_30_days(
         self, db: Session, branch_id: str
     ) -> List[VisitorLog]:
@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.db.pagination import Cursor, paginate
 from app.models import WaitTimePrediction, Branch
 from app.schemas.wait_time_prediction_schema import WaitTimePredictionCreate, WaitTimePredictionUpdate
 
@@ -35,6 +37,18 @@ class WaitTimePredictionCRUD:
                 detail=f"Failed to create wait time prediction: {str(e)}",
             )
 
+    def bulk_create_wait_time_predictions(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """Insert many wait time prediction rows with a single multi-row INSERT and commit"""
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(WaitTimePrediction), rows)
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+
     def get_wait_time_prediction(
         self, db: Session, wait_time_prediction_id: str
     ) -> Optional[WaitTimePrediction]:
@@ -53,44 +67,55 @@ class WaitTimePredictionCRUD:
         return wait_time_prediction
 
     def get_all_wait_time_predictions(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
     ) -> List[WaitTimePrediction]:
         """Get all wait time prediction entries with pagination"""
-        wait_time_predictions = (
-            db.query(WaitTimePrediction)
-            .order_by(WaitTimePrediction.PredictedAt.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        wait_time_predictions = paginate(
+            db.query(WaitTimePrediction),
+            WaitTimePrediction.PredictedAt,
+            WaitTimePrediction.WaitTimePredictionId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return wait_time_predictions
 
     def get_wait_time_predictions_by_visitor(
-        self, db: Session, visitor_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        visitor_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[WaitTimePrediction]:
         """Get wait time predictions for a specific visitor"""
-        wait_time_predictions = (
-            db.query(WaitTimePrediction)
-            .filter(WaitTimePrediction.VisitorId == visitor_id)
-            .order_by(WaitTimePrediction.PredictedAt.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        wait_time_predictions = paginate(
+            db.query(WaitTimePrediction).filter(WaitTimePrediction.VisitorId == visitor_id),
+            WaitTimePrediction.PredictedAt,
+            WaitTimePrediction.WaitTimePredictionId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return wait_time_predictions
 
     def get_wait_time_predictions_by_branch(
-        self, db: Session, branch_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        branch_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[WaitTimePrediction]:
         """Get wait time predictions for a specific branch"""
-        wait_time_predictions = (
-            db.query(WaitTimePrediction)
-            .filter(WaitTimePrediction.BranchId == branch_id)
-            .order_by(WaitTimePrediction.PredictedAt.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        wait_time_predictions = paginate(
+            db.query(WaitTimePrediction).filter(WaitTimePrediction.BranchId == branch_id),
+            WaitTimePrediction.PredictedAt,
+            WaitTimePrediction.WaitTimePredictionId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return wait_time_predictions
 
     def update_wait_time_prediction(
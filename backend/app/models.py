@@ -1,9 +1,19 @@
 from sqlalchemy.orm import relationship, declarative_base
-from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey, Float
+from sqlalchemy import Column, DDL, String, Integer, BigInteger, DateTime, Enum, ForeignKey, Float, Index, LargeBinary, event
 
 Base = declarative_base()
 
 
+def _unpartitioned(ddl, target, bind, **kw):
+    """Whether the time-series tables are left unpartitioned on this database.
+
+    A unique index on a partitioned PostgreSQL table has to include the
+    partition key, so there the ids are kept unique by generating them as
+    uuid4 instead.
+    """
+    return kw["dialect"].name != "postgresql"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -49,6 +59,8 @@ class Operator(Base):
     user = relationship("User", back_populates="operator")
     branch = relationship("Branch", back_populates="operators")
 
+    __table_args__ = (Index("ix_operators_BranchId", BranchId),)
+
 
 class InstitutionType(Base):
     __tablename__ = "institution_types"
@@ -97,6 +109,21 @@ class Branch(Base):
     alert_preferences = relationship("AlertPreference", back_populates="branch")
     crowd_data = relationship("CrowdData", back_populates="branch")
     wait_predictions = relationship("WaitTimePrediction", back_populates="branch")
+    live_status = relationship(
+        "BranchLiveStatus", uselist=False, back_populates="branch", cascade="all, delete-orphan"
+    )
+    heatmap = relationship(
+        "BranchHeatmap", uselist=False, back_populates="branch", cascade="all, delete-orphan"
+    )
+    wait_time_stats = relationship(
+        "BranchWaitTimeStats", uselist=False, back_populates="branch", cascade="all, delete-orphan"
+    )
+    wait_sketches = relationship(
+        "VisitorLogWaitSketch", back_populates="branch", cascade="all, delete-orphan"
+    )
+    crowd_rollups = relationship(
+        "CrowdDataRollup", back_populates="branch", cascade="all, delete-orphan"
+    )
 
 
 class FavoriteInstitution(Base):
@@ -110,6 +137,11 @@ class FavoriteInstitution(Base):
     visitor = relationship("Visitor", back_populates="favorites")
     branch = relationship("Branch", back_populates="favorites")
 
+    __table_args__ = (
+        Index("ix_favorite_institutions_VisitorId", VisitorId),
+        Index("ix_favorite_institutions_BranchId", BranchId),
+    )
+
 
 class VisitorLog(Base):
     __tablename__ = "visitor_logs"
@@ -117,12 +149,22 @@ class VisitorLog(Base):
     VisitorLogId = Column(String, primary_key=True)
     VisitorName = Column(String)
     BranchId = Column(String, ForeignKey("branches.BranchId"))
-    CheckInTime = Column(DateTime)
+    # Partition key, so part of the table's primary key; rows are still
+    # identified by VisitorLogId alone
+    CheckInTime = Column(DateTime, primary_key=True, nullable=False)
     ServiceStartTime = Column(DateTime)
     WaitTimeInMinutes = Column(Integer)
 
     branch = relationship("Branch", back_populates="logs")
 
+    __table_args__ = (
+        Index("ix_visitor_logs_BranchId_CheckInTime", BranchId, CheckInTime.desc()),
+        Index("ix_visitor_logs_CheckInTime_VisitorLogId", CheckInTime, VisitorLogId),
+        Index("ux_visitor_logs_VisitorLogId", VisitorLogId, unique=True).ddl_if(callable_=_unpartitioned),
+        {"postgresql_partition_by": 'RANGE ("CheckInTime")'},
+    )
+    __mapper_args__ = {"primary_key": [VisitorLogId]}
+
 
 class AlertPreference(Base):
     __tablename__ = "alert_preferences"
@@ -136,17 +178,126 @@ class AlertPreference(Base):
     visitor = relationship("Visitor", back_populates="alert_preferences")
     branch = relationship("Branch", back_populates="alert_preferences")
 
+    __table_args__ = (
+        Index("ix_alert_preferences_VisitorId", VisitorId),
+        Index("ix_alert_preferences_BranchId", BranchId),
+    )
+
 
 class CrowdData(Base):
     __tablename__ = "crowd_data"
 
     CrowdDataId = Column(String, primary_key=True)
     BranchId = Column(String, ForeignKey("branches.BranchId"))
-    Timestamp = Column(DateTime)
+    # Partition key, so part of the table's primary key; rows are still
+    # identified by CrowdDataId alone
+    Timestamp = Column(DateTime, primary_key=True)
     CurrentCrowdCount = Column(Integer)
 
     branch = relationship("Branch", back_populates="crowd_data")
 
+    __table_args__ = (
+        Index("ix_crowd_data_BranchId_Timestamp", BranchId, Timestamp.desc()),
+        Index("ix_crowd_data_Timestamp_CrowdDataId", Timestamp, CrowdDataId),
+        Index("ux_crowd_data_CrowdDataId", CrowdDataId, unique=True).ddl_if(callable_=_unpartitioned),
+        {"postgresql_partition_by": 'RANGE ("Timestamp")'},
+    )
+    __mapper_args__ = {"primary_key": [CrowdDataId]}
+
+
+class BranchLiveStatus(Base):
+    """Latest crowd state of a branch, kept current on every crowd data write"""
+
+    __tablename__ = "branch_live_status"
+
+    BranchId = Column(String, ForeignKey("branches.BranchId"), primary_key=True)
+    LatestCrowdDataId = Column(String)
+    LatestCrowdCount = Column(Integer, nullable=False)
+    LatestTimestamp = Column(DateTime, nullable=False)
+    RollingAverageCrowdCount = Column(Float)  # average over the last 15 minutes
+    OccupancyRatio = Column(Float)  # LatestCrowdCount / Branch.Capacity
+    UpdatedAt = Column(DateTime, nullable=False)
+
+    branch = relationship("Branch", back_populates="live_status")
+
+
+class CrowdDataRollup(Base):
+    """Crowd count aggregates of a branch per hour and per day.
+
+    Kept current on every crowd data write and outlives the raw rows, which
+    are deleted after CROWD_DATA_RETENTION_DAYS.
+    """
+
+    __tablename__ = "crowd_data_rollups"
+
+    BranchId = Column(String, ForeignKey("branches.BranchId"), primary_key=True)
+    Granularity = Column(String, primary_key=True)  # "hour" or "day"
+    BucketStart = Column(DateTime, primary_key=True)
+    MinCrowdCount = Column(Integer, nullable=False)
+    MaxCrowdCount = Column(Integer, nullable=False)
+    SumCrowdCount = Column(BigInteger, nullable=False)
+    SampleCount = Column(Integer, nullable=False)
+
+    branch = relationship("Branch", back_populates="crowd_rollups")
+
+
+class BranchHeatmap(Base):
+    """Precomputed day-of-week x hour expected waits and crowds of a branch.
+
+    Each matrix is 168 little-endian values, Monday 00:00 first. Rewritten
+    by the `compute-heatmaps` job.
+    """
+
+    __tablename__ = "branch_heatmaps"
+
+    BranchId = Column(String, ForeignKey("branches.BranchId"), primary_key=True)
+    ComputedAt = Column(DateTime, nullable=False)
+    ExpectedWaitTimes = Column(LargeBinary, nullable=False)  # float32 minutes
+    ExpectedCrowdCounts = Column(LargeBinary, nullable=False)  # float32, NaN without readings
+    SampleCounts = Column(LargeBinary, nullable=False)  # uint32 visitor logs + crowd readings
+
+    branch = relationship("Branch", back_populates="heatmap")
+
+
+class BranchWaitTimeStats(Base):
+    """Running wait time statistics of a branch's visitor logs.
+
+    Merged from per-process buffers by WaitTimeStatsRecorder, so averages
+    and percentiles are single row reads.
+    """
+
+    __tablename__ = "branch_wait_time_stats"
+
+    BranchId = Column(String, ForeignKey("branches.BranchId"), primary_key=True)
+    SampleCount = Column(BigInteger, nullable=False)
+    WaitTimeSum = Column(Float, nullable=False)
+    WaitTimeSquaresSum = Column(Float, nullable=False)
+    DecayedWaitTimeSum = Column(Float, nullable=False)
+    DecayedWeight = Column(Float, nullable=False)
+    DecayedAt = Column(DateTime)  # reference time of the decayed sums
+    Sketch = Column(LargeBinary, nullable=False)  # QuantileSketch.to_bytes()
+    UpdatedAt = Column(DateTime, nullable=False)
+
+    branch = relationship("Branch", back_populates="wait_time_stats")
+
+
+class VisitorLogWaitSketch(Base):
+    """Quantile sketch of a branch's wait times per hour and per day of check-in.
+
+    Sketches merge exactly, so percentiles of any range come from merging
+    the day sketches it covers and the hour sketches at its edges.
+    """
+
+    __tablename__ = "visitor_log_wait_sketches"
+
+    BranchId = Column(String, ForeignKey("branches.BranchId"), primary_key=True)
+    Granularity = Column(String, primary_key=True)  # "hour" or "day"
+    BucketStart = Column(DateTime, primary_key=True)
+    SampleCount = Column(Integer, nullable=False)
+    Sketch = Column(LargeBinary, nullable=False)  # QuantileSketch.to_bytes()
+
+    branch = relationship("Branch", back_populates="wait_sketches")
+
 
 class WaitTimePrediction(Base):
     __tablename__ = "wait_time_predictions"
@@ -162,3 +313,38 @@ class WaitTimePrediction(Base):
 
     visitor = relationship("Visitor", back_populates="wait_predictions")
     branch = relationship("Branch", back_populates="wait_predictions")
+
+    __table_args__ = (
+        Index("ix_wait_time_predictions_BranchId_PredictedAt", BranchId, PredictedAt),
+        Index("ix_wait_time_predictions_VisitorId_PredictedAt", VisitorId, PredictedAt),
+        Index(
+            "ix_wait_time_predictions_PredictedAt_WaitTimePredictionId",
+            PredictedAt,
+            WaitTimePredictionId,
+        ),
+    )
+
+
+class CatalogVersion(Base):
+    """Version of the institution and branch catalog, shared by every worker.
+
+    Bumped in the transaction of each catalog write, so cached catalog
+    responses built at an older version are not served by any process.
+    """
+
+    __tablename__ = "catalog_version"
+
+    CatalogVersionId = Column(Integer, primary_key=True, autoincrement=False)  # always 1
+    Version = Column(BigInteger, nullable=False)
+
+
+# Partitioned tables created by create_all on PostgreSQL (tests, benchmarks)
+# get a catch-all partition so they accept rows before monthly partitions exist
+for _table in (VisitorLog.__table__, CrowdData.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(f"CREATE TABLE {_table.name}_default PARTITION OF {_table.name} DEFAULT").execute_if(
+            dialect="postgresql"
+        ),
+    )
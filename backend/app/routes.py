@@ -1,8 +1,13 @@
 from fastapi import APIRouter
 
 from app.api import user_api, institutions_api, crowd_data_api, visitor_log_api, wait_time_prediction_api
+from app.api import async_crowd_data_api
+from core.config import settings
 
 router = APIRouter(prefix="/api/v1")
+if settings.DB_ASYNC:
+    # First match wins, so these shadow the sync crowd data routes
+    router.include_router(async_crowd_data_api.async_crowd_data_router)
 router.include_router(user_api.user_router)
 router.include_router(crowd_data_api.crowd_data_router)
 router.include_router(institutions_api.institution_router)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -28,3 +28,48 @@ class CrowdDataResponse(CrowdDataBase):
 
 class CrowdDataWithBranchResponse(CrowdDataResponse):
     branch: dict  # Will contain branch information
+
+
+class BranchLiveStatusResponse(BaseModel):
+    branchId: str
+    latestCrowdDataId: Optional[str] = None
+    latestCrowdCount: int
+    latestTimestamp: datetime
+    rollingAverageCrowdCount: Optional[float] = None
+    occupancyRatio: Optional[float] = None
+    updatedAt: datetime
+
+
+class CrowdDataBulkItemResult(BaseModel):
+    index: int
+    status: str  # "created" or "error"
+    crowdDataId: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class CrowdDataBulkChunkResult(BaseModel):
+    index: int
+    status: str  # "committed" or "rolled_back"
+    itemIndexes: List[int]
+    detail: Optional[str] = None
+
+
+class CrowdDataBulkResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    items: List[CrowdDataBulkItemResult]
+    chunks: List[CrowdDataBulkChunkResult]
+
+
+class CrowdSeriesPoint(BaseModel):
+    bucketStart: datetime
+    value: float
+    samples: int
+
+
+class CrowdSeriesResponse(BaseModel):
+    branchId: str
+    bucket: str  # "5m", "1h" or "1d"
+    agg: str  # "avg", "max" or "p95"
+    points: List[CrowdSeriesPoint]
@@ -39,6 +39,15 @@ class BranchResponse(BaseModel):
     totalCrowdCount: int = 0
 
 
+class NearbyBranchResponse(BranchResponse):
+    distanceKm: float
+
+
+class BranchCrowdCountResponse(BaseModel):
+    branchId: str
+    totalCrowdCount: int
+
+
 class BranchCreate(BaseModel):
     institutionId: str
     name: str
@@ -93,6 +93,17 @@ class AlertPreferenceUpdate(BaseModel):
     crowdThreshold: Optional[int] = None
 
 
+class AlertNotification(BaseModel):
+    alertId: str
+    visitorId: str
+    branchId: str
+    crowdThreshold: int
+    previousCrowdCount: int
+    crowdCount: int
+    direction: str  # "above" or "below"
+    triggeredAt: datetime
+
+
 # Administrator Schemas
 class AdministratorResponse(BaseModel):
     userId: str
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, model_validator
 
 
 class VisitorLogBase(BaseModel):
@@ -18,6 +18,13 @@ class VisitorLogCreate(BaseModel):
     serviceStartTime: datetime
     waitTimeInMinutes: Optional[int] = None
 
+    @model_validator(mode="after")
+    def check_timezones(self):
+        # The wait time is their difference, undefined between a local and a UTC time
+        if (self.checkInTime.tzinfo is None) != (self.serviceStartTime.tzinfo is None):
+            raise ValueError("checkInTime and serviceStartTime must both include a timezone or neither")
+        return self
+
 
 class VisitorLogUpdate(BaseModel):
     visitorName: Optional[str] = None
@@ -32,3 +39,51 @@ class VisitorLogResponse(VisitorLogBase):
 
     class Config:
         from_attributes = True
+
+
+class VisitorLogBulkItemResult(BaseModel):
+    index: int
+    status: str  # "created" or "error"
+    visitorLogId: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class VisitorLogBulkResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    elapsedSeconds: float
+    rowsPerSecond: float
+    items: List[VisitorLogBulkItemResult]
+
+
+class VisitorLogWaitTimeStatsResponse(BaseModel):
+    branchId: str
+    sampleCount: int
+    averageWaitTime: Optional[float] = None
+    standardDeviation: Optional[float] = None
+    # Exponentially decayed average, weighting recent check-ins most
+    recentAverageWaitTime: Optional[float] = None
+    # Percentiles within 1% relative error
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class WaitTimePercentiles(BaseModel):
+    sampleCount: int
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+
+class HourOfDayWaitTimePercentiles(WaitTimePercentiles):
+    hour: int
+
+
+class VisitorLogPercentilesResponse(WaitTimePercentiles):
+    branchId: str
+    rangeStart: datetime
+    rangeEnd: datetime
+    # Per hour of the day across the range, when requested
+    hourly: Optional[List[HourOfDayWaitTimePercentiles]] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -44,3 +44,39 @@ class WaitTimePredictionRequest(BaseModel):
     visitorId: str
     branchId: str
     visitDate: datetime
+
+
+class WaitTimePredictionBatchItem(BaseModel):
+    branchId: str
+    visitDate: datetime
+
+
+class WaitTimePredictionBatchRequest(BaseModel):
+    visitorId: str
+    predictions: List[WaitTimePredictionBatchItem]
+
+
+class PredictionCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hitRatio: float
+    size: int
+
+
+class BranchHeatmapResponse(BaseModel):
+    branchId: str
+    computedAt: datetime
+    days: List[str]
+    # Indexed [day][hour], Monday first
+    expectedWaitTime: List[List[float]]
+    expectedCrowdCount: List[List[Optional[float]]]  # null without crowd readings
+    sampleCount: List[List[int]]
+
+
+class BestTimeSlot(BaseModel):
+    dayOfWeek: int  # 0 = Monday
+    day: str
+    hour: int
+    expectedWaitTime: float
+    expectedCrowdCount: Optional[float] = None
+    sampleCount: int
@@ -0,0 +1,212 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right, insort
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import AlertPreference
+from app.schemas.user_schema import AlertNotification
+from core.config import settings
+
+RECENT_NOTIFICATIONS = 1000
+
+# (CrowdThreshold, AlertId, VisitorId), kept sorted per branch
+ThresholdEntry = Tuple[int, str, str]
+
+
+class AlertNotifier(ABC):
+    """Delivery channel for alert notifications.
+
+    A push/email implementation can be plugged in with
+    AlertEvaluationEngine.set_notifier.
+    """
+
+    @abstractmethod
+    def notify(self, notifications: List[AlertNotification]) -> None:
+        ...
+
+
+class InMemoryAlertNotifier(AlertNotifier):
+    """Keeps the most recent notifications of this process"""
+
+    def __init__(self, max_notifications: int = RECENT_NOTIFICATIONS):
+        self._notifications: Deque[AlertNotification] = deque(maxlen=max_notifications)
+        self._lock = threading.Lock()
+
+    def notify(self, notifications: List[AlertNotification]) -> None:
+        with self._lock:
+            self._notifications.extend(notifications)
+
+    def recent(self, visitor_id: Optional[str] = None) -> List[AlertNotification]:
+        with self._lock:
+            notifications = list(self._notifications)
+        if visitor_id is not None:
+            notifications = [n for n in notifications if n.visitorId == visitor_id]
+        return notifications
+
+    def clear(self) -> None:
+        with self._lock:
+            self._notifications.clear()
+
+
+class AlertEvaluationEngine:
+    """Evaluates alert preferences against new crowd counts.
+
+    Preferences are indexed per branch in a list sorted by threshold, so the
+    preferences crossed by a count change from `previous` to `current` are
+    one contiguous slice found with two binary searches. A branch's
+    preferences are loaded on its first evaluation and kept in sync by the
+    alert preference CRUD in UserService. The index is per process, so a
+    branch is reloaded when it was loaded more than `refresh_interval`
+    seconds ago to pick up changes made through other workers. Preferences
+    without a threshold never notify and are not indexed.
+    """
+
+    def __init__(
+        self, notifier: Optional[AlertNotifier] = None, refresh_interval: Optional[float] = None
+    ):
+        self.notifier = notifier or InMemoryAlertNotifier()
+        self.refresh_interval = (
+            settings.ALERT_INDEX_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self._thresholds: Dict[str, List[ThresholdEntry]] = {}
+        self._entries_by_alert: Dict[str, Tuple[str, ThresholdEntry]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def set_notifier(self, notifier: AlertNotifier) -> None:
+        self.notifier = notifier
+
+    def _insert(self, branch_id: str, entry: ThresholdEntry) -> None:
+        insort(self._thresholds[branch_id], entry)
+        self._entries_by_alert[entry[1]] = (branch_id, entry)
+
+    def _remove(self, alert_id: str) -> None:
+        indexed = self._entries_by_alert.pop(alert_id, None)
+        if indexed is None:
+            return
+        branch_id, entry = indexed
+        entries = self._thresholds.get(branch_id)
+        if entries is not None:
+            index = bisect_right(entries, entry) - 1
+            if index >= 0 and entries[index] == entry:
+                del entries[index]
+
+    def _is_current(self, branch_id: str, now: float) -> bool:
+        loaded_at = self._loaded_at.get(branch_id)
+        return loaded_at is not None and now - loaded_at < self.refresh_interval
+
+    def _ensure_loaded(self, db: Session, branch_ids: Iterable[str]) -> None:
+        """(Re)load the preferences of branches not indexed or stale, with a single query"""
+        started = time.monotonic()
+        with self._lock:
+            missing = [
+                branch_id for branch_id in branch_ids if not self._is_current(branch_id, started)
+            ]
+        if not missing:
+            return
+
+        rows = (
+            db.query(
+                AlertPreference.BranchId,
+                AlertPreference.CrowdThreshold,
+                AlertPreference.AlertId,
+                AlertPreference.VisitorId,
+            )
+            .filter(
+                AlertPreference.BranchId.in_(missing), AlertPreference.CrowdThreshold.isnot(None)
+            )
+            .all()
+        )
+        loaded: Dict[str, List[ThresholdEntry]] = {branch_id: [] for branch_id in missing}
+        for branch_id, threshold, alert_id, visitor_id in rows:
+            loaded[branch_id].append((threshold, alert_id, visitor_id))
+
+        with self._lock:
+            for branch_id, entries in loaded.items():
+                # A concurrent load may have got there first
+                if self._loaded_at.get(branch_id, float("-inf")) >= started:
+                    continue
+                for _, alert_id, _ in self._thresholds.get(branch_id, []):
+                    self._entries_by_alert.pop(alert_id, None)
+                self._thresholds[branch_id] = []
+                for entry in entries:
+                    self._remove(entry[1])
+                    self._insert(branch_id, entry)
+                self._loaded_at[branch_id] = started
+
+    def upsert_preference(
+        self, alert_id: str, visitor_id: str, branch_id: str, crowd_threshold: Optional[int]
+    ) -> None:
+        """Index a created or updated preference"""
+        with self._lock:
+            self._remove(alert_id)
+            # Unloaded branches pick the preference up when they are loaded
+            if branch_id in self._thresholds and crowd_threshold is not None:
+                self._insert(branch_id, (crowd_threshold, alert_id, visitor_id))
+
+    def remove_preference(self, alert_id: str) -> None:
+        """Drop a deleted preference from the index"""
+        with self._lock:
+            self._remove(alert_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._thresholds.clear()
+            self._entries_by_alert.clear()
+            self._loaded_at.clear()
+
+    def evaluate(
+        self, db: Session, changes: Dict[str, Tuple[Optional[int], Optional[int]]]
+    ) -> List[AlertNotification]:
+        """Find the preferences whose threshold the crowd count crossed.
+
+        `changes` maps BranchId -> (previous count, current count); a missing
+        count is treated as an empty branch. Counts at or above a threshold
+        are "above" it, so only moves across the threshold notify.
+        """
+        changes = {
+            branch_id: (previous or 0, current or 0)
+            for branch_id, (previous, current) in changes.items()
+            if (previous or 0) != (current or 0)
+        }
+        if not changes:
+            return []
+        self._ensure_loaded(db, changes)
+
+        triggered_at = datetime.now()
+        notifications = []
+        with self._lock:
+            for branch_id, (previous, current) in changes.items():
+                entries = self._thresholds.get(branch_id)
+                if not entries:
+                    continue
+                # Thresholds t with low < t <= high were crossed
+                low, high = sorted((previous, current))
+                start = bisect_right(entries, low, key=lambda entry: entry[0])
+                end = bisect_right(entries, high, key=lambda entry: entry[0])
+                direction = "above" if current > previous else "below"
+                for threshold, alert_id, visitor_id in entries[start:end]:
+                    notifications.append(AlertNotification(
+                        alertId=alert_id,
+                        visitorId=visitor_id,
+                        branchId=branch_id,
+                        crowdThreshold=threshold,
+                        previousCrowdCount=previous,
+                        crowdCount=current,
+                        direction=direction,
+                        triggeredAt=triggered_at,
+                    ))
+        return notifications
+
+    def dispatch(self, notifications: List[AlertNotification]) -> None:
+        """Hand notifications to the notifier, once their data is committed"""
+        if notifications:
+            self.notifier.notify(notifications)
+
+
+alert_engine = AlertEvaluationEngine()
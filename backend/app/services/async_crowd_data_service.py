@@ -0,0 +1,67 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.models import BranchLiveStatus, CrowdData
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.services.crowd_data_service import crowd_data_service
+
+
+class AsyncCrowdDataService:
+    """AsyncSession variants of the hot CrowdDataService paths.
+
+    Only the create, latest reading and live status routes have async
+    variants. Reads are native async queries; a create runs the sync
+    CrowdDataService staging (rollups, live status, alerts) through
+    AsyncSession.run_sync and the same post-commit step, so the two stacks
+    cannot drift apart. Every other crowd data route stays sync.
+    """
+
+    async def create_crowd_data(
+        self, db: AsyncSession, crowd_data: CrowdDataCreate, crowd_data_id: str
+    ) -> CrowdData:
+        """Create a new crowd data entry"""
+        try:
+            db_crowd_data, event, notifications = await db.run_sync(
+                crowd_data_service.stage_crowd_data, crowd_data, crowd_data_id
+            )
+            await db.commit()
+            crowd_data_service.publish_crowd_data(crowd_data.branchId, event, notifications)
+            return db_crowd_data
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create crowd data: {str(e)}",
+            )
+
+    async def get_live_status(
+        self, db: AsyncSession, branch_id: str
+    ) -> Optional[BranchLiveStatus]:
+        """Get the live status of a branch by primary key"""
+        return await db.get(BranchLiveStatus, branch_id)
+
+    async def get_latest_crowd_data_by_branch(
+        self, db: AsyncSession, branch_id: str
+    ) -> Optional[CrowdData]:
+        """Get the latest crowd data for a specific branch"""
+        live_status = await self.get_live_status(db, branch_id)
+        if not live_status:
+            return None
+
+        # The timestamp lets PostgreSQL prune to the one partition holding it
+        result = await db.execute(
+            select(CrowdData)
+            .options(joinedload(CrowdData.branch))
+            .where(
+                CrowdData.CrowdDataId == live_status.LatestCrowdDataId,
+                CrowdData.Timestamp == live_status.LatestTimestamp,
+            )
+        )
+        return result.scalars().first()
+
+
+async_crowd_data_service = AsyncCrowdDataService()
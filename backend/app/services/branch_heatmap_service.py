@@ -0,0 +1,191 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.branch_history_crud import CROWD_COUNTS, branch_history_crud
+from app.db.session import use_primary
+from app.models import Branch, BranchHeatmap
+from app.schemas.wait_time_prediction_schema import BestTimeSlot, BranchHeatmapResponse
+from app.services.institution_service import institution_service
+from app.services.wait_time_prediction_service import HISTORY_WINDOW
+from app.services.wait_time_predictor import (
+    HOURS_PER_WEEK,
+    BucketHistogram,
+    local_wait_time_predictor,
+)
+from core.config import settings
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Storage formats of the heatmap matrices
+WAIT_DTYPE = np.dtype("<f4")
+CROWD_DTYPE = np.dtype("<f4")
+SAMPLES_DTYPE = np.dtype("<u4")
+
+
+def _histogram(totals: np.ndarray, counts: np.ndarray) -> BucketHistogram:
+    """Histogram with one row per observed bucket, holding the bucket mean"""
+    observed = np.flatnonzero(counts)
+    return BucketHistogram(observed, totals[observed] / counts[observed], counts[observed])
+
+
+class BranchHeatmapService:
+    """Day-of-week x hour expected wait and crowd matrices per branch.
+
+    Expected waits use the same model as the local wait time predictor over
+    the same 30 day window, so a heatmap cell matches the prediction for a
+    visit in that hour. Matrices are computed for every branch from one
+    grouped query by `manage.py compute-heatmaps` and read back as a single
+    row; a branch without a heatmap (or with one older than
+    HEATMAP_MAX_AGE_HOURS) is computed on first read.
+    """
+
+    def _compute(
+        self, db: Session, branches: Sequence[Branch], now: datetime
+    ) -> List[BranchHeatmap]:
+        index = {branch.BranchId: i for i, branch in enumerate(branches)}
+        rows = branch_history_crud.get_bucket_totals(
+            db,
+            now - HISTORY_WINDOW,
+            # Filtering is only worth it for a few branches
+            list(index) if len(branches) <= 100 else None,
+        )
+        rows = [row for row in rows if row.branch_id in index]
+
+        # [source][branch * 168 + bucket]; 0 = wait times, 1 = crowd counts
+        totals = np.zeros((2, len(branches) * HOURS_PER_WEEK))
+        counts = np.zeros((2, len(branches) * HOURS_PER_WEEK))
+        if rows:
+            sources = np.array([row.source == CROWD_COUNTS for row in rows], dtype=np.int64)
+            cells = np.array(
+                [index[row.branch_id] * HOURS_PER_WEEK + row.bucket for row in rows], dtype=np.int64
+            )
+            totals[sources, cells] = [float(row.total) for row in rows]
+            counts[sources, cells] = [row.count for row in rows]
+        totals = totals.reshape(2, len(branches), HOURS_PER_WEEK)
+        counts = counts.reshape(2, len(branches), HOURS_PER_WEEK)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected_crowds = np.where(counts[1] > 0, totals[1] / counts[1], np.nan)
+        samples = counts.sum(axis=0)
+
+        heatmaps = []
+        for i, branch in enumerate(branches):
+            expected_waits = local_wait_time_predictor.expected_wait_times(
+                branch.Name,
+                institution_service.get_branch_capacity(branch),
+                _histogram(totals[0, i], counts[0, i]),
+                _histogram(totals[1, i], counts[1, i]),
+            )
+            heatmaps.append(BranchHeatmap(
+                BranchId=branch.BranchId,
+                ComputedAt=now,
+                ExpectedWaitTimes=expected_waits.astype(WAIT_DTYPE).tobytes(),
+                ExpectedCrowdCounts=expected_crowds[i].astype(CROWD_DTYPE).tobytes(),
+                SampleCounts=samples[i].astype(SAMPLES_DTYPE).tobytes(),
+            ))
+        return heatmaps
+
+    def compute_heatmaps(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Recompute the heatmaps of every branch; the caller commits"""
+        now = now or datetime.now()
+        heatmaps = self._compute(db, db.query(Branch).all(), now)
+        db.query(BranchHeatmap).delete(synchronize_session=False)
+        db.add_all(heatmaps)
+        db.flush()
+        return len(heatmaps)
+
+    def _get_heatmap(self, db: Session, branch_id: str) -> BranchHeatmap:
+        """Get a branch's stored heatmap, computing it when missing or stale"""
+        heatmap = db.query(BranchHeatmap).filter(BranchHeatmap.BranchId == branch_id).first()
+        now = datetime.now()
+        if heatmap is not None and heatmap.ComputedAt >= now - timedelta(
+            hours=settings.HEATMAP_MAX_AGE_HOURS
+        ):
+            return heatmap
+
+        # Computed and stored now; a lagging replica would miss a concurrent insert
+        use_primary(db)
+        branch = db.query(Branch).filter(Branch.BranchId == branch_id).first()
+        if not branch:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Branch not found"
+            )
+        heatmap = db.merge(self._compute(db, [branch], now)[0])
+        try:
+            db.commit()
+        except IntegrityError:
+            # Computed concurrently by another request
+            db.rollback()
+            heatmap = db.query(BranchHeatmap).filter(BranchHeatmap.BranchId == branch_id).one()
+        return heatmap
+
+    def _matrices(self, heatmap: BranchHeatmap) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.frombuffer(heatmap.ExpectedWaitTimes, dtype=WAIT_DTYPE).astype(np.float64),
+            np.frombuffer(heatmap.ExpectedCrowdCounts, dtype=CROWD_DTYPE).astype(np.float64),
+            np.frombuffer(heatmap.SampleCounts, dtype=SAMPLES_DTYPE).astype(np.int64),
+        )
+
+    def get_heatmap(self, db: Session, branch_id: str) -> BranchHeatmapResponse:
+        """Get a branch's expected wait and crowd per day of the week and hour"""
+        heatmap = self._get_heatmap(db, branch_id)
+        waits, crowds, samples = self._matrices(heatmap)
+        crowds = np.round(crowds, 1)
+        return BranchHeatmapResponse(
+            branchId=heatmap.BranchId,
+            computedAt=heatmap.ComputedAt,
+            days=DAYS,
+            expectedWaitTime=np.round(waits, 1).reshape(7, 24).tolist(),
+            expectedCrowdCount=[
+                [None if np.isnan(crowd) else float(crowd) for crowd in day]
+                for day in crowds.reshape(7, 24)
+            ],
+            sampleCount=samples.reshape(7, 24).tolist(),
+        )
+
+    def get_best_times(
+        self,
+        db: Session,
+        branch_id: str,
+        limit: int = 5,
+        day_of_week: Optional[int] = None,
+        start_hour: int = 0,
+        end_hour: int = 24,
+    ) -> List[BestTimeSlot]:
+        """Get the hours with the shortest expected wait, then the smallest crowd.
+
+        Only hours with recorded visits or crowd readings are considered, so
+        a branch without history has no best times. `day_of_week` (0 =
+        Monday) and the [start_hour, end_hour) window narrow the candidates.
+        """
+        waits, crowds, samples = self._matrices(self._get_heatmap(db, branch_id))
+
+        buckets = np.flatnonzero(samples)
+        hours = buckets % 24
+        mask = (hours >= start_hour) & (hours < end_hour)
+        if day_of_week is not None:
+            mask &= buckets // 24 == day_of_week
+        buckets = buckets[mask]
+
+        # Unknown crowds sort after known ones
+        order = np.lexsort((np.nan_to_num(crowds[buckets], nan=np.inf), waits[buckets]))
+        return [
+            BestTimeSlot(
+                dayOfWeek=int(bucket // 24),
+                day=DAYS[bucket // 24],
+                hour=int(bucket % 24),
+                expectedWaitTime=round(float(waits[bucket]), 1),
+                expectedCrowdCount=None if np.isnan(crowds[bucket]) else round(float(crowds[bucket]), 1),
+                sampleCount=int(samples[bucket]),
+            )
+            for bucket in buckets[order][:limit]
+        ]
+
+
+branch_heatmap_service = BranchHeatmapService()
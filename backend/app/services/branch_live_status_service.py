@@ -0,0 +1,252 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Branch, BranchLiveStatus, CrowdData
+
+ROLLING_WINDOW = timedelta(minutes=15)
+
+
+class BranchLiveStatusService:
+    def __init__(self):
+        pass
+
+    def _occupancy_ratio(self, crowd_count: int, capacity: Optional[int]) -> Optional[float]:
+        """Ratio of the crowd count to the branch capacity, if the capacity is known"""
+        if not capacity:
+            return None
+        return crowd_count / capacity
+
+    def _query_latest_crowd_data(
+        self, db: Session, branch_ids: Optional[List[str]] = None
+    ) -> List:
+        """Get the latest crowd data row of many branches in a single query"""
+        columns = (
+            CrowdData.CrowdDataId,
+            CrowdData.BranchId,
+            CrowdData.Timestamp,
+            CrowdData.CurrentCrowdCount,
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            # DISTINCT ON picks the first row per branch in ORDER BY order
+            query = (
+                select(*columns)
+                .distinct(CrowdData.BranchId)
+                .order_by(CrowdData.BranchId, CrowdData.Timestamp.desc())
+            )
+            if branch_ids is not None:
+                query = query.where(CrowdData.BranchId.in_(branch_ids))
+        else:
+            # Portable fallback (SQLite, MySQL): ROW_NUMBER() over each branch
+            ranked = select(
+                *columns,
+                func.row_number()
+                .over(
+                    partition_by=CrowdData.BranchId,
+                    order_by=CrowdData.Timestamp.desc(),
+                )
+                .label("rn"),
+            )
+            if branch_ids is not None:
+                ranked = ranked.where(CrowdData.BranchId.in_(branch_ids))
+            ranked = ranked.subquery()
+            query = select(
+                ranked.c.CrowdDataId,
+                ranked.c.BranchId,
+                ranked.c.Timestamp,
+                ranked.c.CurrentCrowdCount,
+            ).where(ranked.c.rn == 1)
+        return db.execute(query).all()
+
+    def _rolling_average(
+        self, db: Session, branch_id: str, latest_timestamp: datetime
+    ) -> Optional[float]:
+        """Average crowd count of a branch over the window ending at `latest_timestamp`"""
+        result = (
+            db.query(func.avg(CrowdData.CurrentCrowdCount))
+            .filter(
+                CrowdData.BranchId == branch_id,
+                CrowdData.Timestamp >= latest_timestamp - ROLLING_WINDOW,
+                CrowdData.Timestamp <= latest_timestamp,
+            )
+            .scalar()
+        )
+        return float(result) if result is not None else None
+
+    def _apply(
+        self,
+        db: Session,
+        branch_id: str,
+        crowd_data_id: str,
+        timestamp: datetime,
+        crowd_count: int,
+        capacity: Optional[int],
+        newer_only: bool = False,
+    ) -> BranchLiveStatus:
+        """Write the latest crowd state of a branch without committing.
+
+        An upsert, so concurrent first readings of a branch do not collide.
+        With `newer_only` a stored state with a later timestamp is kept,
+        so a reading committed out of order never replaces a newer one.
+        """
+        # Query before touching the row so autoflushing sessions never see it half-filled
+        rolling_average = self._rolling_average(db, branch_id, timestamp)
+        values = {
+            "LatestCrowdDataId": crowd_data_id,
+            "LatestCrowdCount": crowd_count,
+            "LatestTimestamp": timestamp,
+            "RollingAverageCrowdCount": rolling_average,
+            "OccupancyRatio": self._occupancy_ratio(crowd_count, capacity),
+            "UpdatedAt": datetime.now(),
+        }
+
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(BranchLiveStatus).values(BranchId=branch_id, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["BranchId"],
+                set_={column: stmt.excluded[column] for column in values},
+                where=(
+                    stmt.excluded.LatestTimestamp >= BranchLiveStatus.LatestTimestamp
+                    if newer_only
+                    else None
+                ),
+            )
+            db.execute(stmt)
+            return (
+                db.query(BranchLiveStatus)
+                .filter(BranchLiveStatus.BranchId == branch_id)
+                .populate_existing()
+                .one()
+            )
+
+        live_status = (
+            db.query(BranchLiveStatus)
+            .filter(BranchLiveStatus.BranchId == branch_id)
+            .with_for_update()
+            .populate_existing()
+            .one_or_none()
+        )
+        if live_status is None:
+            live_status = BranchLiveStatus(BranchId=branch_id)
+            db.add(live_status)
+        elif newer_only and live_status.LatestTimestamp > timestamp:
+            return live_status
+        for column, value in values.items():
+            setattr(live_status, column, value)
+        return live_status
+
+    def refresh_branch(
+        self, db: Session, branch_id: str, newer_only: bool = False
+    ) -> Optional[BranchLiveStatus]:
+        """Recompute the live status of a branch inside the caller's transaction.
+
+        Pending crowd data changes are flushed first; the caller commits.
+        Inserts pass `newer_only`, so a concurrent insert of an older
+        reading cannot replace the state of a newer one; updates and
+        deletes may move the latest reading back in time.
+        """
+        db.flush()
+        latest = (
+            db.query(
+                CrowdData.CrowdDataId, CrowdData.Timestamp, CrowdData.CurrentCrowdCount
+            )
+            .filter(CrowdData.BranchId == branch_id)
+            .order_by(CrowdData.Timestamp.desc())
+            .first()
+        )
+
+        if latest is None:
+            live_status = db.get(BranchLiveStatus, branch_id)
+            if live_status is not None:
+                db.delete(live_status)
+            db.flush()
+            return None
+
+        capacity = db.query(Branch.Capacity).filter(Branch.BranchId == branch_id).scalar()
+        live_status = self._apply(
+            db,
+            branch_id,
+            latest.CrowdDataId,
+            latest.Timestamp,
+            latest.CurrentCrowdCount,
+            capacity,
+            newer_only=newer_only,
+        )
+        db.flush()
+        return live_status
+
+    def refresh_capacity(self, db: Session, branch_id: str, capacity: Optional[int]) -> None:
+        """Recompute the occupancy ratio after a branch capacity change"""
+        live_status = db.get(BranchLiveStatus, branch_id)
+        if live_status is not None:
+            live_status.OccupancyRatio = self._occupancy_ratio(
+                live_status.LatestCrowdCount, capacity
+            )
+            live_status.UpdatedAt = datetime.now()
+
+    def get_live_status(self, db: Session, branch_id: str) -> Optional[BranchLiveStatus]:
+        """Get the live status of a branch by primary key"""
+        return db.get(BranchLiveStatus, branch_id)
+
+    def get_live_statuses(self, db: Session, branch_ids: Iterable[str]) -> List[BranchLiveStatus]:
+        """Get the live status of many branches in a single query"""
+        branch_ids = list(branch_ids)
+        if not branch_ids:
+            return []
+        return (
+            db.query(BranchLiveStatus)
+            .filter(BranchLiveStatus.BranchId.in_(branch_ids))
+            .all()
+        )
+
+    def get_latest_crowd_counts(
+        self, db: Session, branch_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        """Get the latest crowd count of many branches.
+
+        Returns a mapping of BranchId -> LatestCrowdCount. When `branch_ids`
+        is None the count of every branch with crowd data is returned.
+        """
+        query = db.query(BranchLiveStatus.BranchId, BranchLiveStatus.LatestCrowdCount)
+        if branch_ids is not None:
+            branch_ids = list(branch_ids)
+            if not branch_ids:
+                return {}
+            query = query.filter(BranchLiveStatus.BranchId.in_(branch_ids))
+        return {branch_id: count for branch_id, count in query.all()}
+
+    def backfill(self, db: Session, batch_size: int = 500) -> int:
+        """Rebuild the live status of every branch from the crowd data table.
+
+        Commits every `batch_size` branches and returns the number of
+        branches written.
+        """
+        capacities = dict(db.query(Branch.BranchId, Branch.Capacity).all())
+        latest_rows = self._query_latest_crowd_data(db)
+
+        for i, row in enumerate(latest_rows, start=1):
+            self._apply(
+                db,
+                row.BranchId,
+                row.CrowdDataId,
+                row.Timestamp,
+                row.CurrentCrowdCount,
+                capacities.get(row.BranchId),
+            )
+            if i % batch_size == 0:
+                db.commit()
+
+        # Drop statuses of branches whose crowd data has since been removed
+        db.query(BranchLiveStatus).filter(
+            BranchLiveStatus.BranchId.notin_(select(CrowdData.BranchId).distinct())
+        ).delete(synchronize_session=False)
+
+        db.commit()
+        return len(latest_rows)
+
+
+branch_live_status_service = BranchLiveStatusService()
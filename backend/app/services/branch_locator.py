@@ -0,0 +1,185 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Branch
+from core.config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+# Side of a grid cell (about 2 km); a 5 km search visits some 36 cells
+GRID_CELL_DEGREES = 0.02
+
+_LATITUDE_ROWS = round(180 / GRID_CELL_DEGREES)
+_LONGITUDE_COLUMNS = round(360 / GRID_CELL_DEGREES)
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lon2 - lon1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell(latitude: float, longitude: float) -> Cell:
+    row = min(int((latitude + 90) // GRID_CELL_DEGREES), _LATITUDE_ROWS - 1)
+    column = int((longitude + 180) // GRID_CELL_DEGREES) % _LONGITUDE_COLUMNS
+    return row, column
+
+
+class BranchSpatialIndex:
+    """Branch coordinates bucketed in a fixed latitude/longitude grid.
+
+    A radius search only visits the cells overlapping the search circle's
+    bounding box (wrapping at the antimeridian, widening towards the
+    poles) and checks the exact distance of the branches in them. The
+    index is loaded from the branches table on first use and kept in sync
+    by the branch CRUD in InstitutionService. It is per process, so it is
+    reloaded when it was loaded more than `refresh_interval` seconds ago to
+    pick up changes made through other workers.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = (
+            settings.BRANCH_LOCATOR_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self._cells: Dict[Cell, Dict[str, Tuple[float, float]]] = {}
+        self._cell_by_branch: Dict[str, Cell] = {}
+        # Branches indexed or dropped by this process since the last load
+        self._changed: Set[str] = set()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _insert(self, branch_id: str, latitude: float, longitude: float) -> None:
+        cell = _cell(latitude, longitude)
+        self._cells.setdefault(cell, {})[branch_id] = (latitude, longitude)
+        self._cell_by_branch[branch_id] = cell
+
+    def _remove(self, branch_id: str) -> None:
+        cell = self._cell_by_branch.pop(branch_id, None)
+        if cell is None:
+            return
+        branches = self._cells[cell]
+        del branches[branch_id]
+        if not branches:
+            del self._cells[cell]
+
+    def _is_current(self, now: float) -> bool:
+        return self._loaded_at is not None and now - self._loaded_at < self.refresh_interval
+
+    def _ensure_loaded(self, db: Session) -> None:
+        started = time.monotonic()
+        with self._lock:
+            if self._is_current(started):
+                return
+        rows = (
+            db.query(Branch.BranchId, Branch.Latitude, Branch.Longitude)
+            .filter(Branch.Latitude.isnot(None), Branch.Longitude.isnot(None))
+            .all()
+        )
+        with self._lock:
+            if self._loaded_at is not None and self._loaded_at >= started:
+                return  # a concurrent search reloaded in the meantime
+            # Changes made by this process since the last load may be newer
+            # than the rows read
+            kept = {
+                branch_id: self._cells[self._cell_by_branch[branch_id]][branch_id]
+                for branch_id in self._changed
+                if branch_id in self._cell_by_branch
+            }
+            self._cells.clear()
+            self._cell_by_branch.clear()
+            for branch_id, latitude, longitude in rows:
+                if branch_id not in self._changed:
+                    self._insert(branch_id, latitude, longitude)
+            for branch_id, (latitude, longitude) in kept.items():
+                self._insert(branch_id, latitude, longitude)
+            self._changed.clear()
+            self._loaded_at = started
+
+    def upsert_branch(
+        self, branch_id: str, latitude: Optional[float], longitude: Optional[float]
+    ) -> None:
+        """Index a created or updated branch; branches without coordinates are dropped"""
+        with self._lock:
+            self._changed.add(branch_id)
+            self._remove(branch_id)
+            if latitude is not None and longitude is not None:
+                self._insert(branch_id, latitude, longitude)
+
+    def remove_branch(self, branch_id: str) -> None:
+        """Drop a deleted branch from the index"""
+        with self._lock:
+            self._changed.add(branch_id)
+            self._remove(branch_id)
+
+    def clear(self) -> None:
+        """Forget every branch; the index reloads on its next search"""
+        with self._lock:
+            self._cells.clear()
+            self._cell_by_branch.clear()
+            self._changed.clear()
+            self._loaded_at = None
+
+    def _candidate_cells(self, latitude: float, longitude: float, radius_km: float) -> List[Cell]:
+        """Occupied cells overlapping the bounding box of the search circle"""
+        angular_radius = radius_km / EARTH_RADIUS_KM
+        lat_span = math.degrees(angular_radius)
+        first_row = max(int((latitude - lat_span + 90) // GRID_CELL_DEGREES), 0)
+        last_row = min(int((latitude + lat_span + 90) // GRID_CELL_DEGREES), _LATITUDE_ROWS - 1)
+
+        # Widest longitude offset of the circle (it spans every longitude
+        # once it covers a pole)
+        sin_lon_span = (
+            math.sin(angular_radius) / math.cos(math.radians(latitude))
+            if abs(latitude) + lat_span < 90
+            else 1.0
+        )
+        if sin_lon_span >= 1.0:
+            columns: Optional[Set[int]] = None  # every longitude
+        else:
+            lon_span = math.degrees(math.asin(sin_lon_span))
+            first_column = int((longitude - lon_span + 180) // GRID_CELL_DEGREES)
+            last_column = int((longitude + lon_span + 180) // GRID_CELL_DEGREES)
+            columns = {column % _LONGITUDE_COLUMNS for column in range(first_column, last_column + 1)}
+
+        box_cells = (last_row - first_row + 1) * (
+            len(columns) if columns is not None else _LONGITUDE_COLUMNS
+        )
+        if box_cells > len(self._cells):
+            # Large radius: cheaper to filter the occupied cells
+            return [
+                cell
+                for cell in self._cells
+                if first_row <= cell[0] <= last_row and (columns is None or cell[1] in columns)
+            ]
+        return [
+            (row, column)
+            for row in range(first_row, last_row + 1)
+            for column in (columns if columns is not None else range(_LONGITUDE_COLUMNS))
+            if (row, column) in self._cells
+        ]
+
+    def search(
+        self, db: Session, latitude: float, longitude: float, radius_km: float
+    ) -> List[Tuple[str, float]]:
+        """(BranchId, distance in km) of the branches within `radius_km`, nearest first"""
+        self._ensure_loaded(db)
+        with self._lock:
+            found = []
+            for cell in self._candidate_cells(latitude, longitude, radius_km):
+                for branch_id, (branch_latitude, branch_longitude) in self._cells[cell].items():
+                    distance = haversine_km(latitude, longitude, branch_latitude, branch_longitude)
+                    if distance <= radius_km:
+                        found.append((branch_id, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+branch_locator = BranchSpatialIndex()
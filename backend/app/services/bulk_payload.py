@@ -0,0 +1,93 @@
+import json
+from typing import Any, List
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+# Upper bound on the serialized size of one bulk item, so a body is read at
+# most this many bytes per allowed item
+MAX_ITEM_BYTES = 4096
+
+
+class InvalidLine(ValueError):
+    """A line of an NDJSON payload that is not valid JSON"""
+
+
+def parse_bulk_body(body: bytes, content_type: str = "application/json") -> List[Any]:
+    """Parse a bulk payload into a list of raw items.
+
+    Accepts a JSON array, or NDJSON (one JSON object per line) when
+    `content_type` is one of NDJSON_CONTENT_TYPES. Malformed NDJSON lines are
+    returned as InvalidLine instances so they can be reported per item.
+    """
+    content_type = content_type.split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        items: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(InvalidLine(f"Invalid JSON: {str(e)}"))
+        return items
+
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON body: {str(e)}",
+        )
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON",
+        )
+    return items
+
+
+async def read_bulk_body(request: Request, max_items: int) -> List[Any]:
+    """Read and parse a bulk request body of at most `max_items` items.
+
+    The body is streamed and rejected with 413 as soon as it is larger than
+    `max_items` items can be, so an oversized upload is never buffered whole.
+    """
+    max_bytes = max_items * MAX_ITEM_BYTES
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {max_items} items per request",
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+
+    items = parse_bulk_body(bytes(body), request.headers.get("content-type", ""))
+    if len(items) > max_items:
+        raise too_large
+    return items
+
+
+def item_error(item: Any) -> str:
+    """Reason a raw bulk item cannot be validated, or an empty string"""
+    if isinstance(item, Exception):
+        return str(item)
+    if not isinstance(item, dict):
+        return "Item must be a JSON object"
+    return ""
+
+
+def validation_detail(error: ValidationError) -> str:
+    """Flatten a pydantic validation error into a single line"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import CatalogVersion
+from core.config import settings
+
+CATALOG_VERSION_ID = 1
+
+
+def catalog_etag(body: bytes) -> str:
+    """Strong ETag of a serialized catalog response, equal on every worker"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class CatalogEntry(NamedTuple):
+    version: int
+    expires_at: float
+    data: Any  # JSON-compatible, for callers that attach live values
+    body: bytes
+    etag: str
+
+
+class CatalogCache:
+    """Serialized institution and branch catalog responses.
+
+    Entries are tagged with the catalog version kept in the catalog_version
+    table, bumped in the transaction of every institution, branch,
+    institution type or administrator write, so a write through any worker
+    invalidates the entries of all of them. Entries hold no live crowd
+    counts (callers attach them per request), so an entry is served until
+    the next catalog write or until the TTL, which bounds staleness after
+    edits made outside the services.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._lock = threading.Lock()
+
+    def current_version(self, db: Session) -> int:
+        """The catalog version, one primary key read"""
+        version = db.query(CatalogVersion.Version).filter(
+            CatalogVersion.CatalogVersionId == CATALOG_VERSION_ID
+        ).scalar()
+        return version or 0
+
+    def get(self, key: str, version: int) -> Optional[CatalogEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version or entry.expires_at <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, version: int, data: Any) -> CatalogEntry:
+        """Store a response built from the catalog at `version`.
+
+        `version` must be read before the response is built, so a response
+        racing with a write is never served as current.
+        """
+        data = jsonable_encoder(data)
+        body = JSONResponse(content=data).body
+        entry = CatalogEntry(
+            version=version,
+            expires_at=time.monotonic() + self.ttl,
+            data=data,
+            body=body,
+            etag=catalog_etag(body),
+        )
+        if self.ttl > 0:
+            with self._lock:
+                current = self._entries.get(key)
+                if current is None or current.version <= version:
+                    self._entries[key] = entry
+        return entry
+
+    def invalidate(self, db: Session) -> None:
+        """Bump the catalog version in the transaction of a catalog write.
+
+        Call before the write commits; entries of this process are dropped
+        right away, those of other workers at their next lookup.
+        """
+        result = db.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.CatalogVersionId == CATALOG_VERSION_ID)
+            .values(Version=CatalogVersion.Version + 1)
+        )
+        if result.rowcount == 0:
+            db.add(CatalogVersion(CatalogVersionId=CATALOG_VERSION_ID, Version=1))
+        with self._lock:
+            self._entries.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS)
@@ -1,34 +1,109 @@
-from typing import List, Optional
-from datetime import datetime
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 
 from app.db.crud import CRUDBase
+from app.db.crowd_rollup_crud import DAY, HOUR, bucket_start, crowd_rollup_crud
+from app.db.crowd_series_crud import AVG, MAX, crowd_series_crud
+from app.db.time_buckets import EPOCH
+from app.db.pagination import Cursor, paginate
+from app.db.session import use_primary
 from app.models import CrowdData, Branch
-from app.schemas.crowd_data_schema import CrowdDataCreate, CrowdDataUpdate
+from app.schemas.crowd_data_schema import (
+    CrowdDataCreate,
+    CrowdDataUpdate,
+    CrowdDataBulkChunkResult,
+    CrowdDataBulkItemResult,
+    CrowdDataBulkResponse,
+    CrowdSeriesPoint,
+    CrowdSeriesResponse,
+)
+from app.schemas.user_schema import AlertNotification
+from app.services.alert_engine import alert_engine
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.bulk_payload import item_error, validation_detail
+from app.services.crowd_events import crowd_event_broker, live_status_event
+from app.services.prediction_cache import prediction_cache
 
 crowd_data_crud = CRUDBase(model=CrowdData)
 
+BULK_CHUNK_SIZE = 1000
+
+EXPORT_FIELDS = ("crowdDataId", "branchId", "timestamp", "currentCrowdCount")
+# Rows fetched per round trip by the export's server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+SERIES_BUCKETS = {"5m": 300, "1h": 3600, "1d": 86400}
+# Series buckets whose avg/max are served from the rollup tables
+ROLLUP_BUCKETS = {"1h": HOUR, "1d": DAY}
+# Upper bound on the buckets a single series request may span
+SERIES_MAX_POINTS = 10000
+
 
 class CrowdDataService:
     def __init__(self):
         pass
 
+    def stage_crowd_data(
+        self, db: Session, crowd_data: CrowdDataCreate, crowd_data_id: str
+    ) -> Tuple[CrowdData, Optional[str], List[AlertNotification]]:
+        """Add a reading with its rollups and live status and evaluate alerts, without committing.
+
+        Returns the new row, the live status event and the notifications to
+        hand to `publish_crowd_data` once committed. AsyncCrowdDataService
+        runs it through AsyncSession.run_sync, so both create paths share it.
+        """
+        use_primary(db)
+        # Create the crowd data object
+        db_crowd_data = CrowdData(
+            CrowdDataId=crowd_data_id,
+            BranchId=crowd_data.branchId,
+            Timestamp=crowd_data.timestamp,
+            CurrentCrowdCount=crowd_data.currentCrowdCount,
+        )
+
+        previous_counts = branch_live_status_service.get_latest_crowd_counts(
+            db, [crowd_data.branchId]
+        )
+        db.add(db_crowd_data)
+        crowd_rollup_crud.add_readings(
+            db, [(crowd_data.branchId, crowd_data.timestamp, crowd_data.currentCrowdCount)]
+        )
+        live_status = branch_live_status_service.refresh_branch(
+            db, db_crowd_data.BranchId, newer_only=True
+        )
+        event = live_status_event(live_status)
+        notifications = alert_engine.evaluate(db, {
+            crowd_data.branchId: (
+                previous_counts.get(crowd_data.branchId),
+                live_status.LatestCrowdCount if live_status else None,
+            )
+        })
+        return db_crowd_data, event, notifications
+
+    def publish_crowd_data(
+        self, branch_id: str, event: Optional[str], notifications: List[AlertNotification]
+    ) -> None:
+        """Invalidate predictions, stream the live status and send alerts of a committed reading"""
+        prediction_cache.invalidate_branch(branch_id)
+        crowd_event_broker.publish(branch_id, event)
+        alert_engine.dispatch(notifications)
+
     def create_crowd_data(
         self, db: Session, crowd_data: CrowdDataCreate, crowd_data_id: str
     ) -> CrowdData:
         """Create a new crowd data entry"""
         try:
-            # Create the crowd data object
-            db_crowd_data = CrowdData(
-                CrowdDataId=crowd_data_id,
-                BranchId=crowd_data.branchId,
-                Timestamp=crowd_data.timestamp,
-                CurrentCrowdCount=crowd_data.currentCrowdCount,
+            db_crowd_data, event, notifications = self.stage_crowd_data(
+                db, crowd_data, crowd_data_id
             )
-
-            db.add(db_crowd_data)
             db.commit()
+            self.publish_crowd_data(crowd_data.branchId, event, notifications)
             db.refresh(db_crowd_data)
             return db_crowd_data
         except Exception as e:
@@ -38,6 +113,126 @@ class CrowdDataService:
                 detail=f"Failed to create crowd data: {str(e)}",
             )
 
+    def bulk_create_crowd_data(
+        self, db: Session, items: List[Any], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> CrowdDataBulkResponse:
+        """Create many crowd data entries with one multi-row INSERT per chunk.
+
+        Every item is validated first (including one IN query for all
+        referenced branches); invalid items are reported and skipped. Each
+        chunk is committed together with the live status of its branches,
+        and reported with the items it holds, so a client can resend the
+        items of rolled back chunks only.
+        """
+        use_primary(db)
+        results: List[Optional[CrowdDataBulkItemResult]] = [None] * len(items)
+        valid: List[tuple] = []
+
+        for index, item in enumerate(items):
+            detail = item_error(item)
+            if not detail:
+                try:
+                    valid.append((index, CrowdDataCreate(**item)))
+                    continue
+                except ValidationError as e:
+                    detail = validation_detail(e)
+            results[index] = CrowdDataBulkItemResult(index=index, status="error", detail=detail)
+
+        # Validate every referenced branch with a single query
+        branch_ids = {crowd_data.branchId for _, crowd_data in valid}
+        known_branch_ids = set()
+        if branch_ids:
+            known_branch_ids = {
+                branch_id
+                for (branch_id,) in db.query(Branch.BranchId).filter(Branch.BranchId.in_(branch_ids))
+            }
+
+        rows = []
+        for index, crowd_data in valid:
+            if crowd_data.branchId not in known_branch_ids:
+                results[index] = CrowdDataBulkItemResult(
+                    index=index, status="error", detail="Branch not found"
+                )
+                continue
+            rows.append((
+                index,
+                {
+                    "CrowdDataId": str(uuid.uuid4()),
+                    "BranchId": crowd_data.branchId,
+                    "Timestamp": crowd_data.timestamp,
+                    "CurrentCrowdCount": crowd_data.currentCrowdCount,
+                },
+            ))
+
+        chunks: List[CrowdDataBulkChunkResult] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            item_indexes = [index for index, _ in chunk]
+            chunk_branch_ids = {row["BranchId"] for _, row in chunk}
+            try:
+                previous_counts = branch_live_status_service.get_latest_crowd_counts(
+                    db, chunk_branch_ids
+                )
+                db.execute(insert(CrowdData), [row for _, row in chunk])
+                crowd_rollup_crud.add_readings(
+                    db,
+                    [
+                        (row["BranchId"], row["Timestamp"], row["CurrentCrowdCount"])
+                        for _, row in chunk
+                    ],
+                )
+                # One event and one alert evaluation per branch per chunk,
+                # however many rows it had
+                live_statuses = {
+                    branch_id: branch_live_status_service.refresh_branch(
+                        db, branch_id, newer_only=True
+                    )
+                    for branch_id in chunk_branch_ids
+                }
+                events = {
+                    branch_id: live_status_event(live_status)
+                    for branch_id, live_status in live_statuses.items()
+                }
+                notifications = alert_engine.evaluate(db, {
+                    branch_id: (
+                        previous_counts.get(branch_id),
+                        live_status.LatestCrowdCount if live_status else None,
+                    )
+                    for branch_id, live_status in live_statuses.items()
+                })
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                for index, _ in chunk:
+                    results[index] = CrowdDataBulkItemResult(
+                        index=index, status="error", detail=f"Failed to insert: {str(e)}"
+                    )
+                chunks.append(CrowdDataBulkChunkResult(
+                    index=len(chunks), status="rolled_back", itemIndexes=item_indexes, detail=str(e)
+                ))
+                continue
+
+            for branch_id in chunk_branch_ids:
+                prediction_cache.invalidate_branch(branch_id)
+                crowd_event_broker.publish(branch_id, events[branch_id])
+            alert_engine.dispatch(notifications)
+            for index, row in chunk:
+                results[index] = CrowdDataBulkItemResult(
+                    index=index, status="created", crowdDataId=row["CrowdDataId"]
+                )
+            chunks.append(CrowdDataBulkChunkResult(
+                index=len(chunks), status="committed", itemIndexes=item_indexes
+            ))
+
+        created = sum(1 for result in results if result.status == "created")
+        return CrowdDataBulkResponse(
+            total=len(items),
+            created=created,
+            failed=len(items) - created,
+            items=results,
+            chunks=chunks,
+        )
+
     def get_crowd_data(self, db: Session, crowd_data_id: str) -> Optional[CrowdData]:
         """Get a single crowd data entry by ID"""
         crowd_data = (
@@ -54,56 +249,102 @@ class CrowdDataService:
         return crowd_data
 
     def get_all_crowd_data(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
     ) -> List[CrowdData]:
-        """Get all crowd data entries with pagination"""
-        crowd_data = (
-            db.query(CrowdData)
-            .options(joinedload(CrowdData.branch))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        """Get all crowd data entries with pagination, newest first"""
+        crowd_data = paginate(
+            db.query(CrowdData).options(joinedload(CrowdData.branch)),
+            CrowdData.Timestamp,
+            CrowdData.CrowdDataId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return crowd_data
 
     def get_crowd_data_by_branch(
-        self, db: Session, branch_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        branch_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[CrowdData]:
         """Get crowd data for a specific branch"""
-        crowd_data = (
+        crowd_data = paginate(
             db.query(CrowdData)
             .options(joinedload(CrowdData.branch))
-            .filter(CrowdData.BranchId == branch_id)
-            .order_by(CrowdData.Timestamp.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+            .filter(CrowdData.BranchId == branch_id),
+            CrowdData.Timestamp,
+            CrowdData.CrowdDataId,
+            skip,
+            limit,
+            cursor,
+        ).all()
         return crowd_data
 
     def get_latest_crowd_data_by_branch(
         self, db: Session, branch_id: str
     ) -> Optional[CrowdData]:
         """Get the latest crowd data for a specific branch"""
+        live_status = branch_live_status_service.get_live_status(db, branch_id)
+        if not live_status:
+            return None
+
+        # The timestamp lets PostgreSQL prune to the one partition holding it
         crowd_data = (
             db.query(CrowdData)
             .options(joinedload(CrowdData.branch))
-            .filter(CrowdData.BranchId == branch_id)
-            .order_by(CrowdData.Timestamp.desc())
+            .filter(
+                CrowdData.CrowdDataId == live_status.LatestCrowdDataId,
+                CrowdData.Timestamp == live_status.LatestTimestamp,
+            )
             .first()
         )
         return crowd_data
 
+    def get_latest_crowd_counts(
+        self, db: Session, branch_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        """Get the latest crowd count for many branches in a single query.
+
+        Returns a mapping of BranchId -> CurrentCrowdCount. When `branch_ids`
+        is None the latest count of every branch with crowd data is returned.
+        """
+        return branch_live_status_service.get_latest_crowd_counts(db, branch_ids)
+
     def update_crowd_data(
         self, db: Session, crowd_data_id: str, crowd_data_update: CrowdDataUpdate
     ) -> CrowdData:
         """Update a crowd data entry"""
+        # Timestamp is the partition key and part of the primary key
+        update_data = crowd_data_update.dict(exclude_unset=True)
+        if "timestamp" in update_data and update_data["timestamp"] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="timestamp must not be null",
+            )
+        use_primary(db)
         try:
             # Get existing crowd data
             db_crowd_data = self.get_crowd_data(db, crowd_data_id)
+            previous_branch_id = db_crowd_data.BranchId
+            previous_timestamp = db_crowd_data.Timestamp
+
+            # The target day's rollups are rebuilt from its raw rows, which
+            # retention may already have deleted
+            branch_id = update_data.get("branchId", previous_branch_id)
+            timestamp = update_data.get("timestamp", previous_timestamp)
+            moves_day = branch_id != previous_branch_id or (
+                bucket_start(timestamp, DAY) != bucket_start(previous_timestamp, DAY)
+            )
+            if moves_day and crowd_rollup_crud.is_expired_day(db, branch_id, timestamp):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="timestamp falls in a day whose raw crowd data was removed by retention",
+                )
 
             # Update fields if provided
-            update_data = crowd_data_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 # Convert camelCase to PascalCase for SQLAlchemy model
                 if field == "branchId":
@@ -113,9 +354,28 @@ class CrowdDataService:
                 elif field == "timestamp":
                     setattr(db_crowd_data, "Timestamp", value)
 
+            branch_id = db_crowd_data.BranchId
+            events = {
+                branch_id: live_status_event(
+                    branch_live_status_service.refresh_branch(db, branch_id)
+                )
+            }
+            if previous_branch_id != branch_id:
+                events[previous_branch_id] = live_status_event(
+                    branch_live_status_service.refresh_branch(db, previous_branch_id)
+                )
+            crowd_rollup_crud.rebuild_day(db, previous_branch_id, previous_timestamp)
+            crowd_rollup_crud.rebuild_day(db, branch_id, db_crowd_data.Timestamp)
+
             db.commit()
+            for changed_branch_id, event in events.items():
+                prediction_cache.invalidate_branch(changed_branch_id)
+                crowd_event_broker.publish(changed_branch_id, event)
             db.refresh(db_crowd_data)
             return db_crowd_data
+        except HTTPException:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(
@@ -125,12 +385,20 @@ class CrowdDataService:
 
     def delete_crowd_data(self, db: Session, crowd_data_id: str) -> bool:
         """Delete a crowd data entry"""
+        use_primary(db)
         try:
             # Get existing crowd data
             db_crowd_data = self.get_crowd_data(db, crowd_data_id)
 
+            branch_id = db_crowd_data.BranchId
+            timestamp = db_crowd_data.Timestamp
+
             db.delete(db_crowd_data)
+            event = live_status_event(branch_live_status_service.refresh_branch(db, branch_id))
+            crowd_rollup_crud.rebuild_day(db, branch_id, timestamp)
             db.commit()
+            prediction_cache.invalidate_branch(branch_id)
+            crowd_event_broker.publish(branch_id, event)
             return True
         except Exception as e:
             db.rollback()
@@ -156,5 +424,115 @@ class CrowdDataService:
         )
         return crowd_data
 
+    def get_crowd_series(
+        self,
+        db: Session,
+        branch_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        bucket: str,
+        agg: str,
+    ) -> CrowdSeriesResponse:
+        """Get a branch's crowd counts within a date range downsampled to buckets"""
+        bucket_seconds = SERIES_BUCKETS[bucket]
+        if end_date < start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_date must not be before start_date",
+            )
+        if (end_date - start_date).total_seconds() / bucket_seconds > SERIES_MAX_POINTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range spans more than {SERIES_MAX_POINTS} buckets, use a larger bucket",
+            )
+
+        if bucket in ROLLUP_BUCKETS and agg in (AVG, MAX):
+            points = self._rollup_series(db, branch_id, start_date, end_date, bucket, agg)
+        else:
+            points = self._raw_series(db, branch_id, start_date, end_date, bucket, agg)
+        return CrowdSeriesResponse(branchId=branch_id, bucket=bucket, agg=agg, points=points)
+
+    def _raw_series(
+        self, db: Session, branch_id: str, start_date: datetime, end_date: datetime, bucket: str, agg: str
+    ) -> List[CrowdSeriesPoint]:
+        """Series aggregated from the raw crowd data rows"""
+        rows = crowd_series_crud.get_series(
+            db, branch_id, start_date, end_date, SERIES_BUCKETS[bucket], agg
+        )
+        return [
+            CrowdSeriesPoint(
+                bucketStart=EPOCH + timedelta(seconds=int(row.bucket)),
+                value=float(row.value),
+                samples=row.samples,
+            )
+            for row in rows
+        ]
+
+    def _rollup_series(
+        self, db: Session, branch_id: str, start_date: datetime, end_date: datetime, bucket: str, agg: str
+    ) -> List[CrowdSeriesPoint]:
+        """Series read from the rollups for whole buckets, from raw rows at the edges.
+
+        Only the partial buckets at either end of the range touch raw rows,
+        so old ranges keep working after their raw rows are deleted.
+        """
+        granularity = ROLLUP_BUCKETS[bucket]
+        size = timedelta(seconds=SERIES_BUCKETS[bucket])
+        first = bucket_start(start_date, granularity)
+        if first < start_date:
+            first += size
+        last = bucket_start(end_date, granularity)
+        if first >= last:
+            return self._raw_series(db, branch_id, start_date, end_date, bucket, agg)
+
+        head = []
+        if start_date < first:
+            head = self._raw_series(
+                db, branch_id, start_date, first - timedelta(microseconds=1), bucket, agg
+            )
+        rollups = crowd_rollup_crud.get_rollups(db, branch_id, granularity, first, last)
+        tail = self._raw_series(db, branch_id, last, end_date, bucket, agg)
+        return head + [
+            CrowdSeriesPoint(
+                bucketStart=rollup.BucketStart,
+                value=(
+                    rollup.SumCrowdCount / rollup.SampleCount
+                    if agg == AVG
+                    else float(rollup.MaxCrowdCount)
+                ),
+                samples=rollup.SampleCount,
+            )
+            for rollup in rollups
+        ] + tail
+
+    def iter_crowd_data_by_date_range(
+        self, db: Session, branch_id: str, start_date: datetime, end_date: datetime
+    ) -> Iterator[Row]:
+        """Stream crowd data rows of a branch within a date range, oldest first.
+
+        Rows come in EXPORT_FIELDS order from a server-side cursor, so memory
+        stays constant however long the range is. Nothing runs until the
+        first row is requested.
+        """
+        result = db.execute(
+            select(
+                CrowdData.CrowdDataId,
+                CrowdData.BranchId,
+                CrowdData.Timestamp,
+                CrowdData.CurrentCrowdCount,
+            )
+            .where(
+                CrowdData.BranchId == branch_id,
+                CrowdData.Timestamp >= start_date,
+                CrowdData.Timestamp <= end_date,
+            )
+            .order_by(CrowdData.Timestamp.asc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        try:
+            yield from result
+        finally:
+            result.close()
+
 
 crowd_data_service = CrowdDataService()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models import BranchLiveStatus
+from app.schemas.crowd_data_schema import BranchLiveStatusResponse
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def live_status_response(live_status: BranchLiveStatus) -> BranchLiveStatusResponse:
+    return BranchLiveStatusResponse(
+        branchId=live_status.BranchId,
+        latestCrowdDataId=live_status.LatestCrowdDataId,
+        latestCrowdCount=live_status.LatestCrowdCount,
+        latestTimestamp=live_status.LatestTimestamp,
+        rollingAverageCrowdCount=live_status.RollingAverageCrowdCount,
+        occupancyRatio=live_status.OccupancyRatio,
+        updatedAt=live_status.UpdatedAt,
+    )
+
+
+def live_status_event(live_status: Optional[BranchLiveStatus]) -> Optional[str]:
+    """Serialize a live status once, ready to be fanned out to every subscriber"""
+    if live_status is None:
+        return None
+    return json.dumps(jsonable_encoder(live_status_response(live_status)))
+
+
+class CrowdSubscription:
+    """One client's queue of live status events for the branches it follows"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.branch_ids: Set[str] = set()
+
+    def deliver(self, event: str) -> None:
+        # Slow consumers only need the newest state, drop their oldest event
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class CrowdEventBroker:
+    """In-process pub/sub of branch live status updates, one topic per branch.
+
+    publish() may be called from any thread (sync routes run in the
+    threadpool); events are handed to each subscriber's event loop with a
+    single call_soon_threadsafe per loop, then appended to every queue there.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[CrowdSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, branch_ids: Iterable[str] = ()) -> CrowdSubscription:
+        """Create a subscription bound to the running event loop"""
+        subscription = CrowdSubscription(asyncio.get_running_loop(), self.queue_size)
+        self.add_branches(subscription, branch_ids)
+        return subscription
+
+    def add_branches(self, subscription: CrowdSubscription, branch_ids: Iterable[str]) -> None:
+        with self._lock:
+            for branch_id in branch_ids:
+                subscription.branch_ids.add(branch_id)
+                self._subscriptions.setdefault(branch_id, set()).add(subscription)
+
+    def remove_branches(self, subscription: CrowdSubscription, branch_ids: Iterable[str]) -> None:
+        with self._lock:
+            for branch_id in list(branch_ids):
+                subscription.branch_ids.discard(branch_id)
+                subscribers = self._subscriptions.get(branch_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[branch_id]
+
+    def unsubscribe(self, subscription: CrowdSubscription) -> None:
+        self.remove_branches(subscription, list(subscription.branch_ids))
+
+    def subscriber_count(self, branch_id: str) -> int:
+        return len(self._subscriptions.get(branch_id, ()))
+
+    def publish(self, branch_id: str, event: Optional[str]) -> None:
+        """Fan a serialized event out to every subscriber of the branch"""
+        if event is None:
+            return
+        with self._lock:
+            subscribers = list(self._subscriptions.get(branch_id, ()))
+        if not subscribers:
+            return
+
+        by_loop: Dict[asyncio.AbstractEventLoop, List[CrowdSubscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, loop_subscribers in by_loop.items():
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(self._deliver, loop_subscribers, event)
+
+    @staticmethod
+    def _deliver(subscribers: List[CrowdSubscription], event: str) -> None:
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+crowd_event_broker = CrowdEventBroker()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.db.crowd_rollup_crud import DAY, bucket_start, crowd_rollup_crud
+from app.db.partitions import add_months, partition_crud
+from app.models import BranchLiveStatus, CrowdData
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.crowd_data_service import EXPORT_BATCH_SIZE
+from app.services.prediction_cache import prediction_cache
+
+
+class CrowdRetentionService:
+    def _oldest_day(self, db: Session, before: datetime) -> Optional[datetime]:
+        oldest = (
+            db.query(func.min(CrowdData.Timestamp))
+            .filter(CrowdData.Timestamp < before)
+            .scalar()
+        )
+        return bucket_start(oldest, DAY) if oldest is not None else None
+
+    def apply_retention(
+        self,
+        db: Session,
+        retention_days: int,
+        archive: Optional[Callable[[Iterable[Row]], None]] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """Delete raw crowd data older than `retention_days`, a day at a time.
+
+        Each day's rollups are rebuilt from its raw rows in the same
+        transaction that deletes them, so nothing is dropped before it is
+        rolled up. `archive`, if given, receives the day's rows first. Only
+        whole days are deleted; on PostgreSQL, whole months past the horizon
+        are dropped with their partition. Returns the number of rows deleted.
+        """
+        cutoff = bucket_start((now or datetime.now()) - timedelta(days=retention_days), DAY)
+        deleted = 0
+
+        # Whole months are dropped with their partition instead of row by row
+        for _, month in partition_crud.get_partitions(db, CrowdData.__tablename__):
+            month_end = add_months(month, 1)
+            if month_end <= cutoff:
+                deleted += self._expire(db, month, month_end, archive, partition_month=month)
+
+        day_start = self._oldest_day(db, cutoff)
+        while day_start is not None:
+            deleted += self._expire(db, day_start, day_start + timedelta(days=1), archive)
+            day_start = self._oldest_day(db, cutoff)
+        return deleted
+
+    def _expire(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        archive: Optional[Callable[[Iterable[Row]], None]],
+        partition_month: Optional[datetime] = None,
+    ) -> int:
+        """Roll up, archive and delete the crowd data in [start, end), then commit"""
+        in_range = (CrowdData.Timestamp >= start, CrowdData.Timestamp < end)
+
+        crowd_rollup_crud.rebuild(db, start, end)
+        if archive is not None:
+            archive(db.execute(
+                select(
+                    CrowdData.CrowdDataId,
+                    CrowdData.BranchId,
+                    CrowdData.Timestamp,
+                    CrowdData.CurrentCrowdCount,
+                )
+                .where(*in_range)
+                .order_by(CrowdData.Timestamp)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            ))
+        if partition_month is not None:
+            deleted = db.query(func.count()).select_from(CrowdData).filter(*in_range).scalar()
+            partition_crud.detach_partition(
+                db, CrowdData.__tablename__, partition_month, drop=True
+            )
+        else:
+            deleted = db.execute(
+                delete(CrowdData).where(*in_range).execution_options(synchronize_session=False)
+            ).rowcount
+
+        # Branches whose latest reading was just deleted
+        stale_branch_ids = [
+            branch_id
+            for (branch_id,) in db.query(BranchLiveStatus.BranchId).filter(
+                BranchLiveStatus.LatestTimestamp < end
+            )
+        ]
+        for branch_id in stale_branch_ids:
+            branch_live_status_service.refresh_branch(db, branch_id)
+        db.commit()
+        for branch_id in stale_branch_ids:
+            prediction_cache.invalidate_branch(branch_id)
+        return deleted
+
+crowd_retention_service = CrowdRetentionService()
@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Dict, Any
+import heapq
 import uuid
 
 from app.db.crud import CRUDBase
@@ -11,7 +12,6 @@ from app.models import (
     InstitutionType,
     Administrator,
     User,
-    CrowdData,
 )
 from app.schemas.institution_schema import (
     InstitutionCreate,
@@ -22,14 +22,28 @@ from app.schemas.institution_schema import (
     InstitutionTypeUpdate,
     InstitutionResponse,
     BranchResponse,
+    NearbyBranchResponse,
+    BranchCrowdCountResponse,
     InstitutionTypeResponse,
     AdministratorResponse,
 )
+from app.services.crowd_data_service import crowd_data_service
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.branch_locator import branch_locator
+from app.services.catalog_cache import catalog_cache
+from app.services.prediction_cache import prediction_cache
 
 institution_crud = CRUDBase(model=Institution)
 branch_crud = CRUDBase(model=Branch)
 institution_type_crud = CRUDBase(model=InstitutionType)
 
+# Above this many matches, nearby search reads every crowd count instead of
+# passing the matching ids in an IN list
+NEARBY_COUNTS_IN_LIST_MAX = 1000
+
+# Assumed capacity of branches without one configured
+DEFAULT_BRANCH_CAPACITY = 50
+
 
 class InstitutionService:
     def __init__(self):
@@ -116,6 +130,7 @@ class InstitutionService:
             InstitutionType=institution_type_data.institutionType
         )
         db.add(db_institution_type)
+        catalog_cache.invalidate(db)
         db.commit()
         db.refresh(db_institution_type)
         return self._transform_institution_type(db_institution_type)
@@ -129,6 +144,7 @@ class InstitutionService:
         for field, value in institution_type_data.dict(exclude_unset=True).items():
             setattr(db_institution_type, field.title(), value)
         
+        catalog_cache.invalidate(db)
         db.commit()
         db.refresh(db_institution_type)
         return self._transform_institution_type(db_institution_type)
@@ -140,11 +156,12 @@ class InstitutionService:
             return False
         
         db.delete(db_institution_type)
+        catalog_cache.invalidate(db)
         db.commit()
         return True
 
     # Institution Methods
-    def get_all_institutions(self, db: Session) -> List[InstitutionResponse]:
+    def get_all_institutions(self, db: Session, with_crowd_counts: bool = True) -> List[InstitutionResponse]:
         """Get all institutions with related data"""
         institutions = (
             db.query(Institution)
@@ -156,19 +173,14 @@ class InstitutionService:
             .all()
         )
 
-        if not institutions:
-            return []
+        if not institutions or not with_crowd_counts:
+            return [self._transform_institution(institution) for institution in institutions]
 
-        # Calculate total crowd count for each branch
+        # Resolve the latest crowd count of every branch in one query
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(db)
         for institution in institutions:
             for branch in institution.branches:
-                latest_crowd_data = (
-                    db.query(CrowdData.CurrentCrowdCount)
-                    .filter(CrowdData.BranchId == branch.BranchId)
-                    .order_by(CrowdData.Timestamp.desc())
-                    .first()
-                )
-                branch.total_crowd_count = latest_crowd_data.CurrentCrowdCount if latest_crowd_data else 0
+                branch.total_crowd_count = crowd_counts.get(branch.BranchId, 0)
 
         return [self._transform_institution(institution) for institution in institutions]
 
@@ -186,15 +198,12 @@ class InstitutionService:
         )
 
         if institution:
-            # Calculate total crowd count for each branch
+            # Resolve the latest crowd count of all branches in one query
+            crowd_counts = crowd_data_service.get_latest_crowd_counts(
+                db, [branch.BranchId for branch in institution.branches]
+            )
             for branch in institution.branches:
-                latest_crowd_data = (
-                    db.query(CrowdData.CurrentCrowdCount)
-                    .filter(CrowdData.BranchId == branch.BranchId)
-                    .order_by(CrowdData.Timestamp.desc())
-                    .first()
-                )
-                branch.total_crowd_count = latest_crowd_data.CurrentCrowdCount if latest_crowd_data else 0
+                branch.total_crowd_count = crowd_counts.get(branch.BranchId, 0)
 
             return self._transform_institution(institution)
         return None
@@ -210,6 +219,7 @@ class InstitutionService:
             InstitutionDescription=institution_data.institutionDescription
         )
         db.add(db_institution)
+        catalog_cache.invalidate(db)
         db.commit()
         db.refresh(db_institution)
         return self._transform_institution(db_institution)
@@ -231,6 +241,7 @@ class InstitutionService:
             elif field == "administratorId":
                 setattr(db_institution, "AdministratorId", value)
         
+        catalog_cache.invalidate(db)
         db.commit()
         db.refresh(db_institution)
         return self._transform_institution(db_institution)
@@ -242,56 +253,84 @@ class InstitutionService:
             return False
         
         db.delete(db_institution)
+        catalog_cache.invalidate(db)
         db.commit()
         return True
 
     # Branch Methods
-    def get_all_branches(self, db: Session) -> List[BranchResponse]:
+    def get_all_branches(self, db: Session, with_crowd_counts: bool = True) -> List[BranchResponse]:
         """Get all branches with crowd count"""
         branches = db.query(Branch).all()
-        
-        result = []
-        for branch in branches:
-            latest_crowd_data = (
-                db.query(CrowdData.CurrentCrowdCount)
-                .filter(CrowdData.BranchId == branch.BranchId)
-                .order_by(CrowdData.Timestamp.desc())
-                .first()
-            )
-            result.append(self._transform_branch(branch, latest_crowd_data.CurrentCrowdCount if latest_crowd_data else 0))
-        
-        return result
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(db) if with_crowd_counts else {}
+
+        return [
+            self._transform_branch(branch, crowd_counts.get(branch.BranchId, 0))
+            for branch in branches
+        ]
+
+    def get_branch_crowd_counts(self, db: Session) -> List[BranchCrowdCountResponse]:
+        """Get the latest crowd count of every branch with crowd data"""
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(db)
+        return [
+            BranchCrowdCountResponse(branchId=branch_id, totalCrowdCount=count)
+            for branch_id, count in sorted(crowd_counts.items())
+        ]
 
     def get_branches_by_institution_id(self, db: Session, institution_id: str) -> List[BranchResponse]:
         """Get branches by institution ID"""
         branches = db.query(Branch).filter(Branch.InstitutionId == institution_id).all()
-        
-        result = []
-        for branch in branches:
-            latest_crowd_data = (
-                db.query(CrowdData.CurrentCrowdCount)
-                .filter(CrowdData.BranchId == branch.BranchId)
-                .order_by(CrowdData.Timestamp.desc())
-                .first()
-            )
-            result.append(self._transform_branch(branch, latest_crowd_data.CurrentCrowdCount if latest_crowd_data else 0))
-        
-        return result
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(
+            db, [branch.BranchId for branch in branches]
+        )
+
+        return [
+            self._transform_branch(branch, crowd_counts.get(branch.BranchId, 0))
+            for branch in branches
+        ]
+
+    def get_branch_capacity(self, branch: Branch) -> int:
+        """Get branch capacity, defaulting when the branch has none configured"""
+        return branch.Capacity or DEFAULT_BRANCH_CAPACITY
 
     def get_branch_by_id(self, db: Session, branch_id: str) -> Optional[BranchResponse]:
         """Get branch by ID with crowd count"""
         branch = db.query(Branch).filter(Branch.BranchId == branch_id).first()
         
         if branch:
-            latest_crowd_data = (
-                db.query(CrowdData.CurrentCrowdCount)
-                .filter(CrowdData.BranchId == branch.BranchId)
-                .order_by(CrowdData.Timestamp.desc())
-                .first()
-            )
-            return self._transform_branch(branch, latest_crowd_data.CurrentCrowdCount if latest_crowd_data else 0)
+            crowd_counts = crowd_data_service.get_latest_crowd_counts(db, [branch.BranchId])
+            return self._transform_branch(branch, crowd_counts.get(branch.BranchId, 0))
         return None
 
+    def get_nearby_branches(
+        self, db: Session, latitude: float, longitude: float, radius_km: float, limit: int
+    ) -> List[NearbyBranchResponse]:
+        """Get the `limit` least crowded branches within `radius_km`, nearest first on ties"""
+        found = branch_locator.search(db, latitude, longitude, radius_km)
+        if not found:
+            return []
+
+        crowd_counts = crowd_data_service.get_latest_crowd_counts(
+            db,
+            [branch_id for branch_id, _ in found] if len(found) <= NEARBY_COUNTS_IN_LIST_MAX else None,
+        )
+        nearest = heapq.nsmallest(
+            limit, found, key=lambda match: (crowd_counts.get(match[0], 0), match[1])
+        )
+        branches = {
+            branch.BranchId: branch
+            for branch in db.query(Branch).filter(
+                Branch.BranchId.in_([branch_id for branch_id, _ in nearest])
+            )
+        }
+        return [
+            NearbyBranchResponse(
+                **self._transform_branch(branches[branch_id], crowd_counts.get(branch_id, 0)).dict(),
+                distanceKm=round(distance, 3),
+            )
+            for branch_id, distance in nearest
+            if branch_id in branches
+        ]
+
     def create_branch(self, db: Session, branch_data: BranchCreate) -> BranchResponse:
         """Create a new branch"""
         # Verify institution exists
@@ -316,7 +355,9 @@ class InstitutionService:
             Capacity=branch_data.capacity
         )
         db.add(db_branch)
+        catalog_cache.invalidate(db)
         db.commit()
+        branch_locator.upsert_branch(branch_id, db_branch.Latitude, db_branch.Longitude)
         db.refresh(db_branch)
         return self._transform_branch(db_branch)
 
@@ -344,8 +385,15 @@ class InstitutionService:
                 setattr(db_branch, "Longitude", value)
             elif field == "capacity":
                 setattr(db_branch, "Capacity", value)
+
+        if "capacity" in update_data:
+            branch_live_status_service.refresh_capacity(db, branch_id, db_branch.Capacity)
         
+        catalog_cache.invalidate(db)
         db.commit()
+        branch_locator.upsert_branch(branch_id, db_branch.Latitude, db_branch.Longitude)
+        if "capacity" in update_data:
+            prediction_cache.invalidate_branch(branch_id)
         db.refresh(db_branch)
         return self._transform_branch(db_branch)
 
@@ -356,7 +404,9 @@ class InstitutionService:
             return False
         
         db.delete(db_branch)
+        catalog_cache.invalidate(db)
         db.commit()
+        branch_locator.remove_branch(branch_id)
         return True
 
 
@@ -0,0 +1,187 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from core.config import settings
+
+BUCKET_MINUTES = 15
+
+
+def visit_bucket(visit_date: datetime) -> datetime:
+    """Round a visit time down to the start of its 15 minute bucket"""
+    return visit_date.replace(
+        minute=visit_date.minute - visit_date.minute % BUCKET_MINUTES,
+        second=0,
+        microsecond=0,
+    )
+
+
+class PredictionCacheBackend(ABC):
+    """Storage used by PredictionCache.
+
+    Keys are (branch_id, visit bucket) tuples. A shared backend (e.g. Redis)
+    can be plugged in with PredictionCache.set_backend. Every invalidation
+    bumps the branch's generation; `set` with the generation read before the
+    prediction was computed is dropped if the branch was invalidated since,
+    so a stale result cannot overwrite the invalidation.
+    """
+
+    @abstractmethod
+    def get(self, key: Tuple[str, datetime]) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(
+        self, key: Tuple[str, datetime], value: Any, ttl: float, generation: Optional[int] = None
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def generation(self, branch_id: str) -> int:
+        ...
+
+    @abstractmethod
+    def invalidate_branch(self, branch_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+class InMemoryPredictionCacheBackend(PredictionCacheBackend):
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_branch: Dict[str, Set[Hashable]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: Tuple[str, datetime]) -> None:
+        self._entries.pop(key, None)
+        branch_keys = self._keys_by_branch.get(key[0])
+        if branch_keys is not None:
+            branch_keys.discard(key)
+            if not branch_keys:
+                del self._keys_by_branch[key[0]]
+
+    def get(self, key: Tuple[str, datetime]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self, key: Tuple[str, datetime], value: Any, ttl: float, generation: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            if generation is not None and self._generations.get(key[0], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._keys_by_branch.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def generation(self, branch_id: str) -> int:
+        with self._lock:
+            return self._generations.get(branch_id, 0)
+
+    def invalidate_branch(self, branch_id: str) -> None:
+        with self._lock:
+            self._generations[branch_id] = self._generations.get(branch_id, 0) + 1
+            for key in list(self._keys_by_branch.get(branch_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_branch.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class PredictionCache:
+    """Caches prediction results per (branch, 15 minute visit bucket).
+
+    Entries are dropped when new crowd data or visitor logs arrive for the
+    branch, so a cached prediction never outlives the history it was
+    computed from (or the configured TTL).
+    """
+
+    def __init__(self, backend: PredictionCacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def set_backend(self, backend: PredictionCacheBackend) -> None:
+        self.backend = backend
+
+    def get(self, branch_id: str, visit_date: datetime) -> Optional[dict]:
+        value = self.backend.get((branch_id, visit_bucket(visit_date)))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def generation(self, branch_id: str) -> int:
+        """Read before computing a prediction and pass to `set`"""
+        return self.backend.generation(branch_id)
+
+    def set(
+        self,
+        branch_id: str,
+        visit_date: datetime,
+        prediction: dict,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store a prediction, unless the branch was invalidated after `generation`"""
+        if self.ttl > 0:
+            self.backend.set(
+                (branch_id, visit_bucket(visit_date)), prediction, self.ttl, generation
+            )
+
+    def invalidate_branch(self, branch_id: Optional[str]) -> None:
+        if branch_id:
+            self.backend.invalidate_branch(branch_id)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": self.backend.size(),
+        }
+
+
+prediction_cache = PredictionCache(
+    InMemoryPredictionCacheBackend(settings.PREDICTION_CACHE_MAX_ENTRIES),
+    settings.PREDICTION_CACHE_TTL_SECONDS,
+)
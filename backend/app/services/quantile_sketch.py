@@ -0,0 +1,161 @@
+import math
+import struct
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Every quantile is estimated within this relative error
+RELATIVE_ACCURACY = 0.01
+# Smaller values (including zero and negatives) share one bin valued 0
+MIN_INDEXED_VALUE = 1e-3
+# Bound on the logarithmic bins; the lowest ones are collapsed beyond it
+MAX_BINS = 2048
+
+# zero count, key of the first bin, layout, bytes per count; followed by
+# the signed counts of every bin (dense) or uint16 key offsets and signed
+# counts of the non-empty bins (sparse)
+_HEADER = struct.Struct("<qiBB")
+_DENSE, _SPARSE = 0, 1
+_COUNT_DTYPES = {1: "<i1", 2: "<i2", 4: "<i4", 8: "<i8"}
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch).
+
+    Values are counted in logarithmic bins of ratio (1 + a) / (1 - a), so
+    every percentile is within RELATIVE_ACCURACY (a) of an actual value and
+    two sketches merge exactly by adding their bin counts. With wait times
+    in minutes a sketch needs a few hundred bins at most. Counts may be
+    negative in a delta sketch, which removes values when merged.
+    """
+
+    gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    _log_gamma = math.log(gamma)
+
+    def __init__(self, zero_count: int = 0, offset: int = 0, bins: Optional[np.ndarray] = None):
+        self.zero_count = int(zero_count)
+        self.offset = int(offset)
+        self.bins = np.zeros(0, dtype=np.int64) if bins is None else np.asarray(bins, dtype=np.int64)
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + int(self.bins.sum())
+
+    def _grow(self, low: int, high: int) -> None:
+        """Extend the bins to cover keys low..high"""
+        if len(self.bins):
+            low = min(low, self.offset)
+            high = max(high, self.offset + len(self.bins) - 1)
+        bins = np.zeros(high - low + 1, dtype=np.int64)
+        if len(self.bins):
+            start = self.offset - low
+            bins[start:start + len(self.bins)] = self.bins
+        self.offset = low
+        self.bins = bins
+
+    def _collapse(self) -> None:
+        """Fold the lowest bins into one once there are more than MAX_BINS"""
+        excess = len(self.bins) - MAX_BINS
+        if excess > 0:
+            self.bins[excess] += self.bins[:excess].sum()
+            self.bins = self.bins[excess:]
+            self.offset += excess
+
+    def add(self, values: Sequence[float], weights: Optional[Sequence[int]] = None) -> "QuantileSketch":
+        """Count values, each `weights` times (default once)"""
+        values = np.asarray(values, dtype=np.float64)
+        weights = (
+            np.ones(len(values), dtype=np.int64)
+            if weights is None
+            else np.asarray(weights, dtype=np.int64)
+        )
+        indexed = values >= MIN_INDEXED_VALUE
+        self.zero_count += int(weights[~indexed].sum())
+        if indexed.any():
+            keys = np.ceil(np.log(values[indexed]) / self._log_gamma).astype(np.int64)
+            self._grow(int(keys.min()), int(keys.max()))
+            self.bins += np.bincount(
+                keys - self.offset, weights=weights[indexed], minlength=len(self.bins)
+            ).astype(np.int64)
+            self._collapse()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add another sketch's counts to this one"""
+        self.zero_count += other.zero_count
+        if len(other.bins):
+            self._grow(other.offset, other.offset + len(other.bins) - 1)
+            start = other.offset - self.offset
+            self.bins[start:start + len(other.bins)] += other.bins
+            self._collapse()
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Sequence["QuantileSketch"]) -> "QuantileSketch":
+        """One sketch holding the counts of all `sketches`, allocated once"""
+        result = cls(sum(sketch.zero_count for sketch in sketches))
+        with_bins = [sketch for sketch in sketches if len(sketch.bins)]
+        if with_bins:
+            low = min(sketch.offset for sketch in with_bins)
+            high = max(sketch.offset + len(sketch.bins) for sketch in with_bins)
+            result.offset = low
+            result.bins = np.zeros(high - low, dtype=np.int64)
+            for sketch in with_bins:
+                start = sketch.offset - low
+                result.bins[start:start + len(sketch.bins)] += sketch.bins
+            result._collapse()
+        return result
+
+    def copy(self) -> "QuantileSketch":
+        return QuantileSketch(self.zero_count, self.offset, self.bins.copy())
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100) of the counted values; None when empty"""
+        count = self.count
+        if count <= 0:
+            return None
+        rank = max(1, math.ceil(q / 100.0 * count))
+        if rank <= self.zero_count:
+            return 0.0
+        # Not monotonic while a delta's negative bins are merged in, so
+        # take the first bin reaching the rank rather than bisecting
+        reached = np.cumsum(self.bins) + self.zero_count >= rank
+        index = int(np.argmax(reached)) if reached.any() else len(self.bins) - 1
+        # Midpoint (in relative terms) of the bin's value range
+        return 2 * self.gamma ** (self.offset + index) / (self.gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        """Compact encoding, keeping the negative counts of deltas.
+
+        Counts take the fewest bytes that fit, and sketches of a few values
+        spread over many bins (e.g. an hour of whole-minute waits) store
+        only their non-empty bins.
+        """
+        bins = self.bins
+        used = np.flatnonzero(bins)
+        offset = self.offset + int(used[0]) if len(used) else 0
+        used_bins = bins[used]
+        largest = int(np.abs(used_bins).max()) if len(used_bins) else 0
+        width = next(width for width in (1, 2, 4, 8) if largest < 256 ** width // 2)
+        header = (self.zero_count, offset)
+        if len(used) and (used[-1] - used[0] + 1) * width > len(used) * (2 + width):
+            return (
+                _HEADER.pack(*header, _SPARSE, width)
+                + (used - used[0]).astype("<u2").tobytes()
+                + used_bins.astype(_COUNT_DTYPES[width]).tobytes()
+            )
+        dense = bins[used[0]:used[-1] + 1] if len(used) else bins[:0]
+        return _HEADER.pack(*header, _DENSE, width) + dense.astype(_COUNT_DTYPES[width]).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "QuantileSketch":
+        zero_count, offset, layout, width = _HEADER.unpack_from(data)
+        if layout == _DENSE:
+            bins = np.frombuffer(data, dtype=_COUNT_DTYPES[width], offset=_HEADER.size)
+            return cls(zero_count, offset, bins.astype(np.int64))
+        used = (len(data) - _HEADER.size) // (2 + width)
+        keys = np.frombuffer(data, dtype="<u2", count=used, offset=_HEADER.size).astype(np.int64)
+        counts = np.frombuffer(data, dtype=_COUNT_DTYPES[width], offset=_HEADER.size + 2 * used)
+        bins = np.zeros(int(keys[-1]) + 1, dtype=np.int64)
+        bins[keys] = counts
+        return cls(zero_count, offset, bins)
@@ -6,6 +6,8 @@ from datetime import datetime
 
 from app.db.crud import CRUDBase
 from app.db.session import get_db
+from app.services.alert_engine import alert_engine
+from app.services.catalog_cache import catalog_cache
 from app.models import (
     User,
     Operator,
@@ -150,6 +152,8 @@ class UserService:
                 setattr(db_user, "Password", value)  # In production, hash this password
         
         db_user.UpdatedAt = datetime.now()
+        # Administrators are embedded in the institution catalog
+        catalog_cache.invalidate(db)
         db.commit()
         db.refresh(db_user)
         return self._transform_user(db_user)
@@ -161,6 +165,8 @@ class UserService:
             return False
         
         db.delete(db_user)
+        # Administrators are embedded in the institution catalog
+        catalog_cache.invalidate(db)
         db.commit()
         return True
 
@@ -569,6 +575,12 @@ class UserService:
         db.add(db_preference)
         db.commit()
         db.refresh(db_preference)
+        alert_engine.upsert_preference(
+            db_preference.AlertId,
+            db_preference.VisitorId,
+            db_preference.BranchId,
+            db_preference.CrowdThreshold,
+        )
         
         return AlertPreferenceResponse(
             alertId=db_preference.AlertId,
@@ -597,10 +609,21 @@ class UserService:
                     )
                 setattr(db_preference, "BranchId", value)
             elif field == "crowdThreshold":
+                if value is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="crowdThreshold must not be null"
+                    )
                 setattr(db_preference, "CrowdThreshold", value)
         
         db.commit()
         db.refresh(db_preference)
+        alert_engine.upsert_preference(
+            db_preference.AlertId,
+            db_preference.VisitorId,
+            db_preference.BranchId,
+            db_preference.CrowdThreshold,
+        )
         
         # Return with updated info
         branch = db.query(Branch).filter(Branch.BranchId == db_preference.BranchId).first()
@@ -622,6 +645,7 @@ class UserService:
         
         db.delete(db_preference)
         db.commit()
+        alert_engine.remove_preference(alert_id)
         return True
 
     # Administrator Methods
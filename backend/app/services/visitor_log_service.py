@@ -1,11 +1,79 @@
-from typing import List, Optional
-from datetime import datetime
+import time
+import uuid
+from typing import Any, Iterator, List, Optional
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
+from app.db.pagination import Cursor
 from app.db.visitor_log_crud import visitor_log_crud
 from app.models import VisitorLog, Branch
-from app.schemas.visitor_log_schema import VisitorLogCreate, VisitorLogUpdate, VisitorLogResponse
+from app.schemas.visitor_log_schema import (
+    VisitorLogCreate,
+    VisitorLogUpdate,
+    VisitorLogResponse,
+    VisitorLogBulkItemResult,
+    VisitorLogBulkResponse,
+    VisitorLogWaitTimeStatsResponse,
+    VisitorLogPercentilesResponse,
+    HourOfDayWaitTimePercentiles,
+)
+from app.services.bulk_payload import item_error, validation_detail
+from app.services.prediction_cache import prediction_cache
+from app.services.quantile_sketch import QuantileSketch
+from app.services.wait_time_stats import wait_time_stats
+
+BULK_CHUNK_SIZE = 1000
+# Range of the percentiles endpoint when no start date is given
+PERCENTILES_DEFAULT_RANGE = timedelta(days=30)
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """Drop the timezone of aware datetimes so they fit a datetime64 array"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _compute_wait_times(visitor_logs: List[VisitorLogCreate]) -> List[Optional[int]]:
+    """Wait time in whole minutes for each log, keeping values already provided"""
+    if not visitor_logs:
+        return []
+    check_in = np.array(
+        [_to_naive_utc(log.checkInTime) for log in visitor_logs], dtype="datetime64[us]"
+    )
+    service_start = np.array(
+        [_to_naive_utc(log.serviceStartTime) for log in visitor_logs], dtype="datetime64[us]"
+    )
+    # Truncate toward zero like int(total_seconds / 60) in create_visitor_log
+    computed = np.trunc((service_start - check_in) / np.timedelta64(60, "s")).astype(np.int64)
+    provided = np.array(
+        [log.waitTimeInMinutes is not None for log in visitor_logs], dtype=bool
+    )
+    wait_times = np.where(
+        provided,
+        np.array([log.waitTimeInMinutes or 0 for log in visitor_logs], dtype=np.int64),
+        computed,
+    )
+    return [int(wait_time) for wait_time in wait_times]
+
+
+def _percentiles(sketch: QuantileSketch) -> dict:
+    """Sample count and p50/p90/p99 (minutes, 2 decimals) of a wait time sketch"""
+    count = max(sketch.count, 0)
+    result = {"sampleCount": count}
+    if count:
+        for q in (50, 90, 99):
+            result[f"p{q}"] = round(sketch.percentile(q), 2)
+    return result
+
+
+def _sample(visitor_log: VisitorLog) -> tuple:
+    """(BranchId, WaitTimeInMinutes, CheckInTime) for the running wait time statistics"""
+    return (visitor_log.BranchId, visitor_log.WaitTimeInMinutes, visitor_log.CheckInTime)
 
 
 class VisitorLogService:
@@ -32,10 +100,11 @@ class VisitorLogService:
                     visitor_log.waitTimeInMinutes = int(time_diff.total_seconds() / 60)
 
             # Generate a unique ID for the visitor log
-            import uuid
             visitor_log_id = str(uuid.uuid4())
             
             db_visitor_log = visitor_log_crud.create_visitor_log(db, visitor_log, visitor_log_id)
+            prediction_cache.invalidate_branch(visitor_log.branchId)
+            wait_time_stats.record(db, added=[_sample(db_visitor_log)])
             return VisitorLogResponse(
                 visitorLogId=db_visitor_log.VisitorLogId,
                 visitorName=db_visitor_log.VisitorName,
@@ -52,6 +121,98 @@ class VisitorLogService:
                 detail=f"Failed to create visitor log: {str(e)}",
             )
 
+    def bulk_create_visitor_logs(
+        self, db: Session, items: List[Any], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> VisitorLogBulkResponse:
+        """Create many visitor log entries with chunked multi-row INSERTs.
+
+        All referenced branches are validated with a single IN query and
+        missing wait times are computed for the whole batch at once.
+        """
+        started = time.perf_counter()
+        results: List[Optional[VisitorLogBulkItemResult]] = [None] * len(items)
+        valid: List[tuple] = []
+
+        for index, item in enumerate(items):
+            detail = item_error(item)
+            if not detail:
+                try:
+                    valid.append((index, VisitorLogCreate(**item)))
+                    continue
+                except ValidationError as e:
+                    detail = validation_detail(e)
+            results[index] = VisitorLogBulkItemResult(index=index, status="error", detail=detail)
+
+        # Validate every referenced branch with a single query
+        branch_ids = {visitor_log.branchId for _, visitor_log in valid}
+        known_branch_ids = set()
+        if branch_ids:
+            known_branch_ids = {
+                branch_id
+                for (branch_id,) in db.query(Branch.BranchId).filter(Branch.BranchId.in_(branch_ids))
+            }
+
+        accepted = []
+        for index, visitor_log in valid:
+            if visitor_log.branchId not in known_branch_ids:
+                results[index] = VisitorLogBulkItemResult(
+                    index=index, status="error", detail="Branch not found"
+                )
+            else:
+                accepted.append((index, visitor_log))
+
+        wait_times = _compute_wait_times([visitor_log for _, visitor_log in accepted])
+        rows = [
+            (
+                index,
+                {
+                    "VisitorLogId": str(uuid.uuid4()),
+                    "VisitorName": visitor_log.visitorName,
+                    "BranchId": visitor_log.branchId,
+                    "CheckInTime": visitor_log.checkInTime,
+                    "ServiceStartTime": visitor_log.serviceStartTime,
+                    "WaitTimeInMinutes": wait_time,
+                },
+            )
+            for (index, visitor_log), wait_time in zip(accepted, wait_times)
+        ]
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                visitor_log_crud.bulk_create_visitor_logs(db, [row for _, row in chunk])
+            except Exception as e:
+                for index, _ in chunk:
+                    results[index] = VisitorLogBulkItemResult(
+                        index=index, status="error", detail=f"Failed to insert: {str(e)}"
+                    )
+                continue
+
+            for branch_id in {row["BranchId"] for _, row in chunk}:
+                prediction_cache.invalidate_branch(branch_id)
+            wait_time_stats.record(
+                db,
+                added=[
+                    (row["BranchId"], row["WaitTimeInMinutes"], row["CheckInTime"])
+                    for _, row in chunk
+                ],
+            )
+            for index, row in chunk:
+                results[index] = VisitorLogBulkItemResult(
+                    index=index, status="created", visitorLogId=row["VisitorLogId"]
+                )
+
+        elapsed = time.perf_counter() - started
+        created = sum(1 for result in results if result.status == "created")
+        return VisitorLogBulkResponse(
+            total=len(items),
+            created=created,
+            failed=len(items) - created,
+            elapsedSeconds=round(elapsed, 6),
+            rowsPerSecond=round(created / elapsed, 2) if elapsed > 0 else 0.0,
+            items=results,
+        )
+
     def get_visitor_log(self, db: Session, visitor_log_id: str) -> VisitorLogResponse:
         """Get a single visitor log entry by ID"""
         try:
@@ -73,11 +234,11 @@ class VisitorLogService:
             )
 
     def get_all_visitor_logs(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
     ) -> List[VisitorLogResponse]:
         """Get all visitor log entries with pagination"""
         try:
-            db_visitor_logs = visitor_log_crud.get_all_visitor_logs(db, skip, limit)
+            db_visitor_logs = visitor_log_crud.get_all_visitor_logs(db, skip, limit, cursor)
             return [
                 VisitorLogResponse(
                     visitorLogId=log.VisitorLogId,
@@ -96,11 +257,18 @@ class VisitorLogService:
             )
 
     def get_visitor_logs_by_branch(
-        self, db: Session, branch_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        branch_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[VisitorLogResponse]:
         """Get visitor logs for a specific branch"""
         try:
-            db_visitor_logs = visitor_log_crud.get_visitor_logs_by_branch(db, branch_id, skip, limit)
+            db_visitor_logs = visitor_log_crud.get_visitor_logs_by_branch(
+                db, branch_id, skip, limit, cursor
+            )
             return [
                 VisitorLogResponse(
                     visitorLogId=log.VisitorLogId,
@@ -118,6 +286,12 @@ class VisitorLogService:
                 detail=f"Failed to get visitor logs by branch: {str(e)}",
             )
 
+    def iter_visitor_logs_by_branch(
+        self, db: Session, branch_id: str, start_date: datetime, end_date: datetime
+    ) -> Iterator[Row]:
+        """Stream visitor logs of a branch within a date range for export"""
+        return visitor_log_crud.iter_visitor_logs_by_branch(db, branch_id, start_date, end_date)
+
     def get_visitor_logs_by_branch_last_30_days(
         self, db: Session, branch_id: str
     ) -> List[VisitorLogResponse]:
@@ -142,21 +316,110 @@ class VisitorLogService:
             )
 
     def get_average_wait_time_by_branch(self, db: Session, branch_id: str) -> float:
-        """Get average wait time for a specific branch"""
+        """Get average wait time for a specific branch from its running statistics"""
         try:
-            return visitor_log_crud.get_average_wait_time_by_branch(db, branch_id)
+            stats = wait_time_stats.get(db, branch_id)
+            if stats is None:
+                # Nothing recorded yet (e.g. before rebuild-wait-time-stats has run)
+                return visitor_log_crud.get_average_wait_time_by_branch(db, branch_id)
+            return stats.mean if stats.count else 0.0
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to get average wait time: {str(e)}",
             )
 
+    def get_wait_time_stats_by_branch(
+        self, db: Session, branch_id: str
+    ) -> VisitorLogWaitTimeStatsResponse:
+        """Get running wait time statistics and percentiles of a branch"""
+        try:
+            stats = wait_time_stats.get(db, branch_id)
+            if stats is None or stats.count <= 0:
+                return VisitorLogWaitTimeStatsResponse(branchId=branch_id, sampleCount=0)
+            return VisitorLogWaitTimeStatsResponse(
+                branchId=branch_id,
+                sampleCount=stats.count,
+                averageWaitTime=stats.mean,
+                standardDeviation=stats.standard_deviation,
+                recentAverageWaitTime=stats.recent_mean,
+                p50=stats.percentile(50),
+                p90=stats.percentile(90),
+                p99=stats.percentile(99),
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get wait time statistics: {str(e)}",
+            )
+
+    def get_wait_time_percentiles(
+        self,
+        db: Session,
+        branch_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        hourly: bool = False,
+    ) -> VisitorLogPercentilesResponse:
+        """Get wait time percentiles of a branch's check-ins within a date range.
+
+        Merged from the hourly and daily wait time sketches, so the cost does
+        not grow with the number of logs; the range has hour resolution and
+        defaults to the last 30 days. `hourly` adds a breakdown per hour of
+        the day.
+        """
+        # Wall-clock times, like the stored check-ins
+        end_date = end_date.replace(tzinfo=None) if end_date else datetime.now()
+        start_date = (
+            start_date.replace(tzinfo=None) if start_date else end_date - PERCENTILES_DEFAULT_RANGE
+        )
+        if end_date < start_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="to must not be before from",
+            )
+        try:
+            sketches = wait_time_stats.get_sketches(
+                db, branch_id, start_date, end_date, by_hour_of_day=hourly
+            )
+            return VisitorLogPercentilesResponse(
+                branchId=branch_id,
+                rangeStart=start_date,
+                rangeEnd=end_date,
+                hourly=(
+                    [
+                        HourOfDayWaitTimePercentiles(hour=hour, **_percentiles(sketches[hour]))
+                        for hour in sorted(sketches)
+                        if sketches[hour].count > 0
+                    ]
+                    if hourly
+                    else None
+                ),
+                **_percentiles(QuantileSketch.merged(list(sketches.values()))),
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get wait time percentiles: {str(e)}",
+            )
+
     def update_visitor_log(
         self, db: Session, visitor_log_id: str, visitor_log_update: VisitorLogUpdate
     ) -> VisitorLogResponse:
         """Update a visitor log entry"""
         try:
+            # CheckInTime is the partition key and part of the primary key
+            update_data = visitor_log_update.dict(exclude_unset=True)
+            if "checkInTime" in update_data and update_data["checkInTime"] is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="checkInTime must not be null",
+                )
+            previous = _sample(visitor_log_crud.get_visitor_log(db, visitor_log_id))
             db_visitor_log = visitor_log_crud.update_visitor_log(db, visitor_log_id, visitor_log_update)
+            prediction_cache.invalidate_branch(previous[0])
+            prediction_cache.invalidate_branch(db_visitor_log.BranchId)
+            wait_time_stats.record(db, added=[_sample(db_visitor_log)], removed=[previous])
             return VisitorLogResponse(
                 visitorLogId=db_visitor_log.VisitorLogId,
                 visitorName=db_visitor_log.VisitorName,
@@ -176,7 +439,11 @@ class VisitorLogService:
     def delete_visitor_log(self, db: Session, visitor_log_id: str) -> bool:
         """Delete a visitor log entry"""
         try:
-            return visitor_log_crud.delete_visitor_log(db, visitor_log_id)
+            previous = _sample(visitor_log_crud.get_visitor_log(db, visitor_log_id))
+            deleted = visitor_log_crud.delete_visitor_log(db, visitor_log_id)
+            prediction_cache.invalidate_branch(previous[0])
+            wait_time_stats.record(db, removed=[previous])
+            return deleted
         except HTTPException:
             raise
         except Exception as e:
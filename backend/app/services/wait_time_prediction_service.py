@@ -1,76 +1,166 @@
+import asyncio
 import json
 import uuid
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 import openai
 
+from app.db.branch_history_crud import CROWD_COUNTS, WAIT_TIMES, branch_history_crud
+from app.db.pagination import Cursor
+from app.db.session import routing_session_local
 from app.db.wait_time_prediction_crud import wait_time_prediction_crud
-from app.db.visitor_log_crud import visitor_log_crud
-from app.models import WaitTimePrediction, Branch, CrowdData
+from app.models import WaitTimePrediction, Branch
+from app.services.institution_service import institution_service
+from app.services.prediction_cache import prediction_cache, visit_bucket
+from app.services.wait_time_predictor import BucketHistogram, local_wait_time_predictor
 from app.schemas.wait_time_prediction_schema import (
     WaitTimePredictionCreate, 
     WaitTimePredictionUpdate, 
     WaitTimePredictionResponse,
-    WaitTimePredictionRequest
+    WaitTimePredictionRequest,
+    WaitTimePredictionBatchRequest,
 )
 from core.config import settings
 
+HISTORY_WINDOW = timedelta(days=30)
+
 
 class WaitTimePredictionService:
-    def __init__(self):
+    def __init__(self, session_factory: sessionmaker = routing_session_local):
+        # Shared predictions open their own session: the request that started
+        # one may end (and close its session) while others still wait on it
+        self.session_factory = session_factory
+
         # Initialize OpenAI client only if API key is available
         self.openai_client = None
         try:
             if settings.OPENAI_API_KEY:
-                self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+                self.openai_client = openai.AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                    max_retries=0,
+                )
         except Exception:
             # If OpenAI client initialization fails, we'll handle it gracefully
             self.openai_client = None
 
-    def _get_branch_capacity(self, branch: Branch) -> int:
-        """Get branch capacity - this is a placeholder implementation"""
-        # In a real implementation, you might have a capacity field in the Branch model
-        # For now, we'll use a default capacity based on institution type
-        return 50  # Default capacity
-
-    def _format_visitor_logs_for_prompt(self, visitor_logs: List) -> str:
-        """Format visitor logs for the OpenAI prompt"""
-        if not visitor_logs:
-            return "No visitor log data available for the last 30 days."
-        
-        formatted_logs = []
-        for log in visitor_logs:
-            wait_time = log.WaitTimeInMinutes
-            formatted_logs.append(
-                f"Visitor Name - {log.VisitorName} - Check In time - {log.CheckInTime} - "
-                f"Service Start Time - {log.ServiceStartTime} - Waited for - {wait_time} minutes"
+        # Event loop state, created on first use in the running loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._openai_semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def _bind_loop(self) -> None:
+        """(Re)create the semaphore and in-flight map for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+            self._in_flight = {}
+
+    async def _single_flight(
+        self, key: Hashable, compute: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Run `compute` once for concurrent callers sharing the same key"""
+        self._bind_loop()
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(compute())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one caller going away does not cancel the others
+        return await asyncio.shield(future)
+
+    def _get_history(
+        self, db: Session, branch_id: str
+    ) -> Tuple[BucketHistogram, BucketHistogram]:
+        """Get hour-of-week histograms of the last 30 days of wait times and crowd counts"""
+        rows = branch_history_crud.get_history_aggregates(
+            db, branch_id, datetime.now() - HISTORY_WINDOW
+        )
+        histograms = {}
+        for source in (WAIT_TIMES, CROWD_COUNTS):
+            source_rows = [row for row in rows if row.source == source]
+            histograms[source] = BucketHistogram(
+                [row.bucket for row in source_rows],
+                [row.value for row in source_rows],
+                [row.count for row in source_rows],
             )
-        
-        return "\n".join(formatted_logs)
-
-    def _format_crowd_data_for_prompt(self, crowd_data: List) -> str:
-        """Format crowd data for the OpenAI prompt"""
-        if not crowd_data:
-            return "No crowd data available for the last 30 days."
-        
-        formatted_data = []
-        for data in crowd_data:
-            formatted_data.append(
-                f"Date - {data.Timestamp} - Crowd Count - {data.CurrentCrowdCount}"
+        return histograms[WAIT_TIMES], histograms[CROWD_COUNTS]
+
+    def _get_histories(
+        self, db: Session, branch_ids: Sequence[str]
+    ) -> Dict[str, Tuple[BucketHistogram, BucketHistogram]]:
+        """Get wait time and crowd histograms of several branches from one grouped query.
+
+        Each histogram row holds an hour-of-week bucket's mean, which gives the
+        local model the same bucket sums and counts as `_get_history`.
+        """
+        rows = branch_history_crud.get_bucket_totals(
+            db, datetime.now() - HISTORY_WINDOW, branch_ids
+        )
+        grouped: Dict[Tuple[str, str], list] = {}
+        for row in rows:
+            grouped.setdefault((row.branch_id, row.source), []).append(row)
+
+        def histogram(source_rows: list) -> BucketHistogram:
+            return BucketHistogram(
+                [row.bucket for row in source_rows],
+                [float(row.total) / row.count for row in source_rows],
+                [row.count for row in source_rows],
             )
-        
-        return "\n".join(formatted_data)
 
-    def _call_openai_for_prediction(
+        return {
+            branch_id: (
+                histogram(grouped.get((branch_id, WAIT_TIMES), [])),
+                histogram(grouped.get((branch_id, CROWD_COUNTS), [])),
+            )
+            for branch_id in branch_ids
+        }
+
+    def _format_histogram_for_prompt(
+        self, histogram: BucketHistogram, label: str, unit: str
+    ) -> str:
+        """Summarise a history histogram for the OpenAI prompt"""
+        if not histogram.count:
+            return f"No {label} data available for the last 30 days."
+
+        hourly = ", ".join(
+            f"{hour:02d}:00 - {int(count)}"
+            for hour, count in enumerate(histogram.hour_of_day_counts())
+            if count
+        )
+        return (
+            f"{histogram.count} records, average {histogram.mean:.1f} {unit}, "
+            f"median {histogram.percentile(50):g} {unit}, "
+            f"90th percentile {histogram.percentile(90):g} {unit}.\n"
+            f"Records per hour of day: {hourly}"
+        )
+
+    async def _call_openai_for_prediction(
         self, 
         branch_name: str, 
         branch_capacity: int, 
-        crowd_data_str: str, 
-        visitor_logs_str: str
+        wait_times: BucketHistogram,
+        crowd_counts: BucketHistogram,
+        local_prediction: dict,
     ) -> dict:
-        """Call OpenAI API to get wait time prediction"""
+        """Call OpenAI API to refine the local wait time prediction.
+
+        At most OPENAI_MAX_CONCURRENCY calls are in flight at once. Falls back to
+        `local_prediction` when OpenAI is not configured, fails, or does not
+        answer within OPENAI_TIMEOUT_SECONDS (including time spent waiting for
+        a free slot).
+        """
+        if not self.openai_client:
+            return local_prediction
+
+        # Only build the prompt when it is actually sent
+        visitor_logs_str = self._format_histogram_for_prompt(wait_times, "visitor log", "minutes waited")
+        crowd_data_str = self._format_histogram_for_prompt(crowd_counts, "crowd", "people")
+
         prompt = f"""
 						You are a clever predictive model that can predict the wait time for a user to receive service at an institution like a bank, restaurant, park, corporate office or similar places. You will be given the following information to analyze and come up with a meaningful possible wait time based on historical visit logs collected from the institutions.
 
@@ -78,12 +168,14 @@ class WaitTimePredictionService:
 
 						The branch name is {branch_name}, and it can hold a NORMAL capacity of {branch_capacity} people before one can consider the place crowded(Note that NORMAL capacity means ALL or SOME of the service centers in the institution can be occupied at a given time).
 
-						You are also given a record of the crowd data in the last 30 days of that branch, in the following manner:
+						You are also given a summary of the crowd data in the last 30 days of that branch:
 						{crowd_data_str}
 
-						Finally, you are given a record of all the VisitorLog data in the last 30 days, in the following manner:
+						Finally, you are given a summary of all the VisitorLog data in the last 30 days:
 						{visitor_logs_str}
 
+						A statistical model trained on this branch's history estimates a wait time of {local_prediction["predictedWaitTime"]} minutes for the requested visit time. Use it as your baseline.
+
 						Based on these data, you will give me thoughtful answer about the waiting time for the visitor which we are calling PredictedWaitTime in our WaitTimePredictionTable. You will provide me the data in the following JSON format:
 
 						{{
@@ -96,18 +188,8 @@ class WaitTimePredictionService:
 """
 
         try:
-            if not self.openai_client:
-                # Fallback to local prediction if OpenAI is not configured
-                return self._generate_fallback_prediction(branch_name, branch_capacity, crowd_data_str, visitor_logs_str)
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that provides wait time predictions in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
+            response = await asyncio.wait_for(
+                self._limited_openai_request(prompt), settings.OPENAI_TIMEOUT_SECONDS
             )
             
             # Extract the JSON response
@@ -121,139 +203,96 @@ class WaitTimePredictionService:
             else:
                 raise ValueError("No valid JSON found in OpenAI response")
                 
-        except Exception as e:
-            # Fallback to local prediction if OpenAI fails
-            return self._generate_fallback_prediction(branch_name, branch_capacity, crowd_data_str, visitor_logs_str)
-
-    def _generate_fallback_prediction(
-        self, 
-        branch_name: str, 
-        branch_capacity: int, 
-        crowd_data_str: str, 
-        visitor_logs_str: str
-    ) -> dict:
-        """Generate a fallback prediction when OpenAI is not available"""
-        import random
-        from datetime import datetime
-        
-        # Parse visitor logs to get historical wait times
-        historical_wait_times = []
-        if visitor_logs_str and visitor_logs_str != "No visitor log data available for the last 30 days.":
-            lines = visitor_logs_str.split('\n')
-            for line in lines:
-                if 'Waited for' in line:
-                    try:
-                        # Extract wait time from line like "Waited for - 15 minutes"
-                        wait_time_str = line.split('Waited for - ')[1].split(' ')[0]
-                        historical_wait_times.append(int(wait_time_str))
-                    except:
-                        continue
-        
-        # Parse crowd data to get average crowd levels
-        crowd_counts = []
-        if crowd_data_str and crowd_data_str != "No crowd data available for the last 30 days.":
-            lines = crowd_data_str.split('\n')
-            for line in lines:
-                if 'Crowd Count' in line:
-                    try:
-                        # Extract crowd count from line like "Crowd Count - 25"
-                        crowd_count_str = line.split('Crowd Count - ')[1]
-                        crowd_counts.append(int(crowd_count_str))
-                    except:
-                        continue
-        
-        # Calculate base prediction
-        if historical_wait_times:
-            base_wait_time = sum(historical_wait_times) / len(historical_wait_times)
-        else:
-            # Default wait times based on institution type
-            if 'bank' in branch_name.lower():
-                base_wait_time = 20
-            elif 'restaurant' in branch_name.lower():
-                base_wait_time = 15
-            elif 'park' in branch_name.lower():
-                base_wait_time = 5
-            else:
-                base_wait_time = 12
-        
-        # Adjust based on crowd data
-        if crowd_counts:
-            avg_crowd = sum(crowd_counts) / len(crowd_counts)
-            crowd_factor = avg_crowd / branch_capacity
-            if crowd_factor > 0.8:
-                base_wait_time *= 1.5  # High crowd
-            elif crowd_factor > 0.5:
-                base_wait_time *= 1.2  # Medium crowd
-            else:
-                base_wait_time *= 0.8  # Low crowd
-        
-        # Add some randomness to make predictions more realistic
-        variation = random.uniform(0.8, 1.2)
-        predicted_wait_time = int(base_wait_time * variation)
-        
-        # Ensure reasonable bounds
-        predicted_wait_time = max(5, min(60, predicted_wait_time))
-        
-        # Calculate accuracy based on data availability
-        if historical_wait_times and crowd_counts:
-            accuracy = 85.0
-        elif historical_wait_times or crowd_counts:
-            accuracy = 75.0
-        else:
-            accuracy = 65.0
-        
-        return {
-            "predictedWaitTime": predicted_wait_time,
-            "actualWaitTime": base_wait_time,
-            "accuracy": accuracy
-        }
+        except Exception:
+            # Fallback to local prediction if OpenAI fails or times out
+            return local_prediction
+
+    async def _limited_openai_request(self, prompt: str):
+        """Send the prediction prompt once a concurrency slot is free"""
+        self._bind_loop()
+        async with self._openai_semaphore:
+            return await self.openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that provides wait time predictions in JSON format."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=500
+            )
 
-    def create_wait_time_prediction(
-        self, db: Session, prediction_request: WaitTimePredictionRequest
-    ) -> WaitTimePredictionResponse:
-        """Create a new wait time prediction using OpenAI"""
+    def _load_history(self, branch_id: str) -> Tuple[BucketHistogram, BucketHistogram]:
+        """Get a branch's history in a session of its own"""
+        db = self.session_factory()
         try:
-            # Verify that the branch exists
-            branch = db.query(Branch).filter(Branch.BranchId == prediction_request.branchId).first()
-            if not branch:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Branch not found"
-                )
+            return self._get_history(db, branch_id)
+        finally:
+            db.close()
 
-            # Get visitor logs for the last 30 days
-            visitor_logs = visitor_log_crud.get_visitor_logs_by_branch_last_30_days(
-                db, prediction_request.branchId
+    async def _predict(
+        self, branch_id: str, branch_name: str, branch_capacity: int, visit_date: datetime
+    ) -> dict:
+        """Predict a visit's wait time with the configured prediction engine.
+
+        Shared by concurrent requests, so it does not touch any request's session.
+        """
+        # Data arriving while predicting must not be hidden by the cached result
+        generation = prediction_cache.generation(branch_id)
+
+        # Predict locally from the last 30 days of history
+        wait_times, crowd_counts = await run_in_threadpool(self._load_history, branch_id)
+        prediction_result = local_wait_time_predictor.predict(
+            branch_name, branch_capacity, visit_date, wait_times, crowd_counts
+        )
+
+        if settings.PREDICTION_ENGINE == "openai":
+            # Refine the local prediction with OpenAI
+            prediction_result = await self._call_openai_for_prediction(
+                branch_name, branch_capacity, wait_times, crowd_counts, prediction_result
             )
 
-            # Get crowd data for the last 30 days
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            crowd_data = (
-                db.query(CrowdData)
-                .filter(
-                    CrowdData.BranchId == prediction_request.branchId,
-                    CrowdData.Timestamp >= thirty_days_ago
-                )
-                .order_by(CrowdData.Timestamp.desc())
-                .all()
-            )
+        # Actual wait time is the average over the same 30 day window
+        prediction_result = {**prediction_result, "actualWaitTime": wait_times.mean}
+        prediction_cache.set(branch_id, visit_date, prediction_result, generation)
+        return prediction_result
 
-            # Get branch capacity
-            branch_capacity = self._get_branch_capacity(branch)
+    def _get_branch(self, db: Session, branch_id: str) -> Branch:
+        """Get a branch, raising 404 when it does not exist"""
+        branch = db.query(Branch).filter(Branch.BranchId == branch_id).first()
+        if not branch:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Branch not found"
+            )
+        return branch
 
-            # Format data for OpenAI prompt
-            visitor_logs_str = self._format_visitor_logs_for_prompt(visitor_logs)
-            crowd_data_str = self._format_crowd_data_for_prompt(crowd_data)
+    async def create_wait_time_prediction(
+        self, db: Session, prediction_request: WaitTimePredictionRequest
+    ) -> WaitTimePredictionResponse:
+        """Create a new wait time prediction with the configured prediction engine.
 
-            # Get prediction from OpenAI
-            prediction_result = self._call_openai_for_prediction(
-                branch.Name, branch_capacity, crowd_data_str, visitor_logs_str
-            )
+        Database work runs in the threadpool; only the OpenAI call is awaited on
+        the event loop. Concurrent requests for the same branch and 15 minute
+        visit slot share one prediction.
+        """
+        try:
+            # Verify that the branch exists
+            branch = await run_in_threadpool(self._get_branch, db, prediction_request.branchId)
 
-            # Calculate actual wait time (average of historical data)
-            actual_wait_time = visitor_log_crud.get_average_wait_time_by_branch(
-                db, prediction_request.branchId
+            # Visitors asking about the same branch and 15 minute slot share a prediction
+            prediction_result = prediction_cache.get(
+                prediction_request.branchId, prediction_request.visitDate
             )
+            if prediction_result is None:
+                prediction_result = await self._single_flight(
+                    (prediction_request.branchId, visit_bucket(prediction_request.visitDate)),
+                    lambda: self._predict(
+                        branch.BranchId,
+                        branch.Name,
+                        institution_service.get_branch_capacity(branch),
+                        prediction_request.visitDate,
+                    ),
+                )
 
             # Create the prediction record
             prediction_id = str(uuid.uuid4())
@@ -265,13 +304,13 @@ class WaitTimePredictionService:
                 branchId=prediction_request.branchId,
                 visitDate=prediction_request.visitDate,
                 predictedWaitTime=float(prediction_result.get("predictedWaitTime", 0)),
-                actualWaitTime=actual_wait_time,
+                actualWaitTime=prediction_result["actualWaitTime"],
                 accuracy=float(prediction_result.get("accuracy", 0.0)),
                 predictedAt=predicted_at,
             )
 
-            db_prediction = wait_time_prediction_crud.create_wait_time_prediction(
-                db, wait_time_prediction
+            db_prediction = await run_in_threadpool(
+                wait_time_prediction_crud.create_wait_time_prediction, db, wait_time_prediction
             )
 
             return WaitTimePredictionResponse(
@@ -293,6 +332,111 @@ class WaitTimePredictionService:
                 detail=f"Failed to create wait time prediction: {str(e)}",
             )
 
+    def create_wait_time_predictions(
+        self, db: Session, batch_request: WaitTimePredictionBatchRequest
+    ) -> List[WaitTimePredictionResponse]:
+        """Create wait time predictions for many (branch, visit time) pairs at once.
+
+        Branches are looked up in one query, the history of every branch
+        without cached predictions is loaded in one grouped query and run
+        through the local model once per branch, and the records are stored
+        with one multi-row INSERT. Cached predictions are reused, but misses
+        always use the local model, also when PREDICTION_ENGINE is "openai".
+        """
+        items = batch_request.predictions
+        if len(items) > settings.PREDICTION_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.PREDICTION_BATCH_MAX_ITEMS} predictions per request",
+            )
+        if not items:
+            return []
+
+        try:
+            # Verify that all branches exist
+            branch_ids = list(dict.fromkeys(item.branchId for item in items))
+            branches = {
+                branch.BranchId: branch
+                for branch in db.query(Branch).filter(Branch.BranchId.in_(branch_ids)).all()
+            }
+            missing = [branch_id for branch_id in branch_ids if branch_id not in branches]
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Branch not found: {', '.join(missing)}",
+                )
+
+            results = [prediction_cache.get(item.branchId, item.visitDate) for item in items]
+            uncached: Dict[str, List[int]] = {}
+            for index, result in enumerate(results):
+                if result is None:
+                    uncached.setdefault(items[index].branchId, []).append(index)
+
+            if uncached:
+                generations = {
+                    branch_id: prediction_cache.generation(branch_id) for branch_id in uncached
+                }
+                histories = self._get_histories(db, list(uncached))
+                for branch_id, indexes in uncached.items():
+                    branch = branches[branch_id]
+                    wait_times, crowd_counts = histories[branch_id]
+                    predictions = local_wait_time_predictor.predict_many(
+                        branch.Name,
+                        institution_service.get_branch_capacity(branch),
+                        [items[index].visitDate for index in indexes],
+                        wait_times,
+                        crowd_counts,
+                    )
+                    for index, prediction in zip(indexes, predictions):
+                        # Actual wait time is the average over the same 30 day window
+                        results[index] = {**prediction, "actualWaitTime": wait_times.mean}
+                        # The single endpoint would have asked OpenAI for these
+                        if settings.PREDICTION_ENGINE == "local":
+                            prediction_cache.set(
+                                branch_id,
+                                items[index].visitDate,
+                                results[index],
+                                generations[branch_id],
+                            )
+
+            predicted_at = datetime.now()
+            rows = [
+                {
+                    "WaitTimePredictionId": str(uuid.uuid4()),
+                    "VisitorId": batch_request.visitorId,
+                    "BranchId": item.branchId,
+                    "VisitDate": item.visitDate,
+                    "PredictedWaitTime": float(result.get("predictedWaitTime", 0)),
+                    "ActualWaitTime": result["actualWaitTime"],
+                    "Accuracy": float(result.get("accuracy", 0.0)),
+                    "PredictedAt": predicted_at,
+                }
+                for item, result in zip(items, results)
+            ]
+            wait_time_prediction_crud.bulk_create_wait_time_predictions(db, rows)
+
+            return [
+                WaitTimePredictionResponse(
+                    waitTimePredictionId=row["WaitTimePredictionId"],
+                    visitorId=row["VisitorId"],
+                    branchId=row["BranchId"],
+                    visitDate=row["VisitDate"],
+                    predictedWaitTime=row["PredictedWaitTime"],
+                    actualWaitTime=row["ActualWaitTime"],
+                    accuracy=row["Accuracy"],
+                    predictedAt=row["PredictedAt"],
+                )
+                for row in rows
+            ]
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create wait time predictions: {str(e)}",
+            )
+
     def get_wait_time_prediction(
         self, db: Session, wait_time_prediction_id: str
     ) -> WaitTimePredictionResponse:
@@ -320,12 +464,12 @@ class WaitTimePredictionService:
             )
 
     def get_all_wait_time_predictions(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
     ) -> List[WaitTimePredictionResponse]:
         """Get all wait time prediction entries with pagination"""
         try:
             db_predictions = wait_time_prediction_crud.get_all_wait_time_predictions(
-                db, skip, limit
+                db, skip, limit, cursor
             )
             return [
                 WaitTimePredictionResponse(
@@ -347,12 +491,17 @@ class WaitTimePredictionService:
             )
 
     def get_wait_time_predictions_by_visitor(
-        self, db: Session, visitor_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        visitor_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[WaitTimePredictionResponse]:
         """Get wait time predictions for a specific visitor"""
         try:
             db_predictions = wait_time_prediction_crud.get_wait_time_predictions_by_visitor(
-                db, visitor_id, skip, limit
+                db, visitor_id, skip, limit, cursor
             )
             return [
                 WaitTimePredictionResponse(
@@ -374,12 +523,17 @@ class WaitTimePredictionService:
             )
 
     def get_wait_time_predictions_by_branch(
-        self, db: Session, branch_id: str, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        branch_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
     ) -> List[WaitTimePredictionResponse]:
         """Get wait time predictions for a specific branch"""
         try:
             db_predictions = wait_time_prediction_crud.get_wait_time_predictions_by_branch(
-                db, branch_id, skip, limit
+                db, branch_id, skip, limit, cursor
             )
             return [
                 WaitTimePredictionResponse(
@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+HOURS_PER_WEEK = 7 * 24
+
+# Default wait times (minutes) used when a branch has no visitor history
+DEFAULT_WAIT_TIMES = {"bank": 20, "restaurant": 15, "park": 5}
+DEFAULT_WAIT_TIME = 12
+
+
+def hour_of_week(times: Sequence[datetime]) -> np.ndarray:
+    """Map datetimes to hour-of-week buckets (Monday 00:00 = 0 ... Sunday 23:00 = 167)"""
+    if len(times) == 0:
+        return np.empty(0, dtype=np.int64)
+    # Wall-clock time: drop offsets the same way "timestamp without time zone" does
+    hours = np.array(
+        [t.replace(tzinfo=None) for t in times], dtype="datetime64[h]"
+    ).astype(np.int64)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekdays = (hours // 24 + 3) % 7
+    return weekdays * 24 + hours % 24
+
+
+def default_wait_time(branch_name: str) -> float:
+    """Institution-type based wait time for branches without history"""
+    name = branch_name.lower()
+    for keyword, wait_time in DEFAULT_WAIT_TIMES.items():
+        if keyword in name:
+            return float(wait_time)
+    return float(DEFAULT_WAIT_TIME)
+
+
+class BucketHistogram:
+    """Observed values aggregated as (hour-of-week bucket, value, count) rows.
+
+    This is the shape returned by the grouped SQL history query, so its size
+    depends on the number of distinct values rather than the number of rows.
+    """
+
+    def __init__(
+        self,
+        buckets: Sequence[int] = (),
+        values: Sequence[float] = (),
+        counts: Sequence[int] = (),
+    ):
+        self.buckets = np.asarray(buckets, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+    @classmethod
+    def from_observations(
+        cls, times: Sequence[datetime], values: Sequence[float]
+    ) -> "BucketHistogram":
+        """Build a histogram from raw (time, value) observations"""
+        return cls(hour_of_week(times), values, np.ones(len(values)))
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def mean(self) -> float:
+        total = self.counts.sum()
+        return float(self.counts @ self.values / total) if total else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile (0-100) of the observed values"""
+        if not self.count:
+            return 0.0
+        order = np.argsort(self.values, kind="stable")
+        cumulative = np.cumsum(self.counts[order])
+        rank = max(1.0, np.ceil(q / 100.0 * cumulative[-1]))
+        return float(self.values[order][np.searchsorted(cumulative, rank)])
+
+    def bucket_counts(self) -> np.ndarray:
+        return np.bincount(self.buckets, weights=self.counts, minlength=HOURS_PER_WEEK)
+
+    def bucket_sums(self) -> np.ndarray:
+        return np.bincount(
+            self.buckets, weights=self.counts * self.values, minlength=HOURS_PER_WEEK
+        )
+
+    def hour_of_day_counts(self) -> np.ndarray:
+        """Observation counts per hour of the day, across all weekdays"""
+        return self.bucket_counts().reshape(7, 24).sum(axis=0)
+
+
+class LocalWaitTimePredictor:
+    """Statistical wait time model trained from a branch's own history.
+
+    Visitor wait times are averaged per hour-of-week bucket. The bucket mean
+    is shrunk towards a prior (the branch's overall mean wait time scaled by
+    how crowded the requested hour usually is), so sparse buckets lean on the
+    prior and well-populated buckets on their own data.
+    """
+
+    def __init__(self, prior_weight: float = 5.0):
+        self.prior_weight = prior_weight
+
+    def _crowd_factors(self, crowd: BucketHistogram, capacity: Optional[int]) -> np.ndarray:
+        """How much busier than usual each hour-of-week bucket is, from crowd data"""
+        factors = np.ones(HOURS_PER_WEEK)
+        if not crowd.count:
+            return factors
+
+        bucket_counts = crowd.bucket_counts()
+        observed = bucket_counts > 0
+        expected_crowd = crowd.bucket_sums()[observed] / bucket_counts[observed]
+        mean_crowd = crowd.mean
+        if mean_crowd > 0:
+            factors[observed] = np.clip(expected_crowd / mean_crowd, 0.5, 2.0)
+
+        # Waits grow faster once the branch is over capacity
+        if capacity:
+            factors[observed] *= np.where(
+                expected_crowd > capacity, np.minimum(expected_crowd / capacity, 1.5), 1.0
+            )
+        return factors
+
+    def expected_wait_times(
+        self,
+        branch_name: str,
+        capacity: Optional[int],
+        wait_times: BucketHistogram,
+        crowd_counts: BucketHistogram,
+    ) -> np.ndarray:
+        """Expected wait time (minutes) of every hour-of-week bucket"""
+        if wait_times.count:
+            samples = wait_times.bucket_counts()
+            bucket_sums = wait_times.bucket_sums()
+            overall_wait_time = wait_times.mean
+        else:
+            samples = np.zeros(HOURS_PER_WEEK)
+            bucket_sums = np.zeros(HOURS_PER_WEEK)
+            overall_wait_time = default_wait_time(branch_name)
+
+        prior = overall_wait_time * self._crowd_factors(crowd_counts, capacity)
+        return (bucket_sums + self.prior_weight * prior) / (samples + self.prior_weight)
+
+    def predict(
+        self,
+        branch_name: str,
+        capacity: Optional[int],
+        visit_date: datetime,
+        wait_times: BucketHistogram,
+        crowd_counts: BucketHistogram,
+    ) -> dict:
+        """Predict the wait time for a visit, in the same shape as the OpenAI result"""
+        return self.predict_many(branch_name, capacity, [visit_date], wait_times, crowd_counts)[0]
+
+    def predict_many(
+        self,
+        branch_name: str,
+        capacity: Optional[int],
+        visit_dates: Sequence[datetime],
+        wait_times: BucketHistogram,
+        crowd_counts: BucketHistogram,
+    ) -> List[dict]:
+        """Predict the wait times of several visits to one branch at once"""
+        target_buckets = hour_of_week(visit_dates)
+        estimates = self.expected_wait_times(branch_name, capacity, wait_times, crowd_counts)[
+            target_buckets
+        ]
+
+        if wait_times.count:
+            samples = wait_times.bucket_counts()[target_buckets]
+            overall_wait_time = wait_times.mean
+        else:
+            samples = np.zeros(len(target_buckets))
+            overall_wait_time = default_wait_time(branch_name)
+
+        # Confidence grows with the number of visits seen in the bucket
+        accuracies = 65.0 + 20.0 * samples / (samples + self.prior_weight)
+        if wait_times.count:
+            accuracies += 5.0
+        if crowd_counts.count:
+            accuracies += 5.0
+
+        return [
+            {
+                "predictedWaitTime": max(0, int(round(estimate))),
+                "actualWaitTime": overall_wait_time,
+                "accuracy": round(float(accuracy), 1),
+            }
+            for estimate, accuracy in zip(estimates.tolist(), accuracies.tolist())
+        ]
+
+
+local_wait_time_predictor = LocalWaitTimePredictor()
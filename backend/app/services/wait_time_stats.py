@@ -0,0 +1,458 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.crowd_rollup_crud import DAY, GRANULARITIES, HOUR, bucket_start
+from app.db.session import use_primary
+from app.models import Branch, BranchWaitTimeStats, VisitorLog, VisitorLogWaitSketch
+from app.services.quantile_sketch import QuantileSketch
+from core.config import settings
+
+EPOCH = datetime(1970, 1, 1)
+
+# (BranchId, WaitTimeInMinutes, CheckInTime) of a visitor log
+Sample = Tuple[str, Optional[int], Optional[datetime]]
+# (BranchId, Granularity, BucketStart) of a wait time sketch
+SketchKey = Tuple[str, str, datetime]
+# Keys per IN (...) lookup of stored sketches
+SKETCH_LOOKUP_BATCH = 500
+
+
+def range_buckets(start: datetime, end: datetime) -> List[Tuple[str, datetime, datetime]]:
+    """(granularity, first bucket start, end) spans covering the hours of [start, end).
+
+    Whole days use day buckets and the hours before and after them hour
+    buckets, so a range needs at most 47 hour sketches plus one per day.
+    The hour `end` falls in counts when `end` is not on the hour.
+    """
+    start = bucket_start(start, HOUR)
+    first_day = bucket_start(start + timedelta(days=1) - timedelta(hours=1), DAY)
+    last_day = bucket_start(end, DAY)
+    if first_day >= last_day:
+        return [(HOUR, start, end)]
+    return [(HOUR, start, first_day), (DAY, first_day, last_day), (HOUR, last_day, end)]
+
+
+def _epoch_hours(times: Sequence[datetime]) -> np.ndarray:
+    """Hours since the epoch, on the wall clock like the stored timestamps"""
+    return (
+        np.array([t.replace(tzinfo=None) for t in times], dtype="datetime64[us]")
+        .astype(np.int64) / 3.6e9
+    )
+
+
+class WaitTimeStats:
+    """Running statistics of a branch's wait times.
+
+    Count, sum and sum of squares are kept as plain sums, with removed
+    values counted negatively, so states (and signed deltas) merge by
+    addition in any order; mean and variance are derived when read. The
+    recent average is a mean weighted by check-in time that halves every
+    WAIT_TIME_EWMA_HALF_LIFE_HOURS, and percentiles come from a
+    QuantileSketch.
+    """
+
+    def __init__(
+        self,
+        count: int = 0,
+        total: float = 0.0,
+        squares: float = 0.0,
+        decayed_sum: float = 0.0,
+        decayed_weight: float = 0.0,
+        decayed_at: Optional[float] = None,
+        sketch: Optional[QuantileSketch] = None,
+    ):
+        self.count = count
+        self.total = total
+        self.squares = squares
+        self.decayed_sum = decayed_sum
+        self.decayed_weight = decayed_weight
+        self.decayed_at = decayed_at  # hours since the epoch
+        self.sketch = sketch or QuantileSketch()
+
+    @staticmethod
+    def _decay(hours: float) -> float:
+        return 0.5 ** (hours / settings.WAIT_TIME_EWMA_HALF_LIFE_HOURS)
+
+    def _merge_decayed(self, decayed_sum: float, decayed_weight: float, decayed_at: Optional[float]) -> None:
+        if decayed_at is None:
+            return
+        if self.decayed_at is None:
+            self.decayed_sum, self.decayed_weight, self.decayed_at = decayed_sum, decayed_weight, decayed_at
+            return
+        # Bring both sums to the later reference time
+        reference = max(self.decayed_at, decayed_at)
+        own, other = self._decay(reference - self.decayed_at), self._decay(reference - decayed_at)
+        self.decayed_sum = self.decayed_sum * own + decayed_sum * other
+        self.decayed_weight = self.decayed_weight * own + decayed_weight * other
+        self.decayed_at = reference
+
+    def add(
+        self, wait_times: Sequence[float], check_in_times: Sequence[datetime], weight: int = 1
+    ) -> "WaitTimeStats":
+        """Fold a batch of wait times in, `weight` times each (-1 removes them)"""
+        values = np.asarray(wait_times, dtype=np.float64)
+        if not len(values):
+            return self
+        self.count += weight * len(values)
+        self.total += weight * float(values.sum())
+        self.squares += weight * float(values @ values)
+
+        hours = _epoch_hours(check_in_times)
+        reference = float(hours.max())
+        weights = weight * 0.5 ** ((reference - hours) / settings.WAIT_TIME_EWMA_HALF_LIFE_HOURS)
+        self._merge_decayed(float(weights @ values), float(weights.sum()), reference)
+
+        self.sketch.add(values, np.full(len(values), weight))
+        return self
+
+    def merge(self, other: "WaitTimeStats") -> "WaitTimeStats":
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self._merge_decayed(other.decayed_sum, other.decayed_weight, other.decayed_at)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def subtract(self, other: "WaitTimeStats") -> "WaitTimeStats":
+        """Take out values previously merged in"""
+        self.count -= other.count
+        self.total -= other.total
+        self.squares -= other.squares
+        self._merge_decayed(-other.decayed_sum, -other.decayed_weight, other.decayed_at)
+        self.sketch.merge(QuantileSketch(-other.sketch.zero_count, other.sketch.offset, -other.sketch.bins))
+        return self
+
+    def copy(self) -> "WaitTimeStats":
+        return WaitTimeStats(
+            self.count, self.total, self.squares,
+            self.decayed_sum, self.decayed_weight, self.decayed_at,
+            self.sketch.copy(),
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    @property
+    def standard_deviation(self) -> float:
+        """Sample standard deviation"""
+        if self.count <= 1:
+            return 0.0
+        variance = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    @property
+    def recent_mean(self) -> Optional[float]:
+        """Exponentially decayed mean, weighting recent check-ins most"""
+        return self.decayed_sum / self.decayed_weight if self.decayed_weight > 1e-12 else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        return self.sketch.percentile(q)
+
+    @classmethod
+    def from_row(cls, row: BranchWaitTimeStats) -> "WaitTimeStats":
+        return cls(
+            count=row.SampleCount,
+            total=row.WaitTimeSum,
+            squares=row.WaitTimeSquaresSum,
+            decayed_sum=row.DecayedWaitTimeSum,
+            decayed_weight=row.DecayedWeight,
+            decayed_at=(
+                (row.DecayedAt - EPOCH) / timedelta(hours=1) if row.DecayedAt is not None else None
+            ),
+            sketch=QuantileSketch.from_bytes(row.Sketch),
+        )
+
+    def to_row(self, row: BranchWaitTimeStats) -> BranchWaitTimeStats:
+        row.SampleCount = self.count
+        row.WaitTimeSum = self.total
+        row.WaitTimeSquaresSum = self.squares
+        row.DecayedWaitTimeSum = self.decayed_sum
+        row.DecayedWeight = self.decayed_weight
+        row.DecayedAt = (
+            EPOCH + timedelta(hours=self.decayed_at) if self.decayed_at is not None else None
+        )
+        row.Sketch = self.sketch.to_bytes()
+        row.UpdatedAt = datetime.now()
+        return row
+
+
+def _group(samples: Iterable[Sample], weight: int, into: Dict[str, WaitTimeStats]) -> None:
+    """Add samples to per-branch states, `weight` times each; logs without a wait time are skipped"""
+    batches: Dict[str, Tuple[List[float], List[datetime]]] = {}
+    for branch_id, wait_time, check_in_time in samples:
+        if branch_id is None or wait_time is None:
+            continue
+        wait_times, check_in_times = batches.setdefault(branch_id, ([], []))
+        wait_times.append(wait_time)
+        check_in_times.append(check_in_time or datetime.now())
+    for branch_id, (wait_times, check_in_times) in batches.items():
+        state = WaitTimeStats().add(wait_times, check_in_times, weight)
+        into[branch_id] = into[branch_id].merge(state) if branch_id in into else state
+
+
+def _group_sketches(samples: Iterable[Sample], weight: int, into: Dict[SketchKey, QuantileSketch]) -> None:
+    """Add samples to per-branch hour and day sketches, `weight` times each"""
+    batches: Dict[SketchKey, List[float]] = {}
+    for branch_id, wait_time, check_in_time in samples:
+        if branch_id is None or wait_time is None:
+            continue
+        # Wall-clock buckets, like the stored timestamps
+        check_in_time = (check_in_time or datetime.now()).replace(tzinfo=None)
+        for granularity in GRANULARITIES:
+            key = (branch_id, granularity, bucket_start(check_in_time, granularity))
+            batches.setdefault(key, []).append(wait_time)
+    for key, wait_times in batches.items():
+        sketch = into.get(key)
+        if sketch is None:
+            sketch = into[key] = QuantileSketch()
+        sketch.add(wait_times, np.full(len(wait_times), weight))
+
+
+class WaitTimeStatsRecorder:
+    """Per-branch wait time statistics kept current on visitor log writes.
+
+    Writes are folded into per-process signed deltas (removed values count
+    negatively), and into hourly and daily sketch deltas, which are added to the
+    branch_wait_time_stats and visitor_log_wait_sketches rows every
+    WAIT_TIME_STATS_FLUSH_SECONDS: by the next write once that long has
+    passed, by `flush_periodically` when no write comes, and on shutdown.
+    A crash loses at most that long of buffered writes. Ingest never waits
+    on a contended stats row, and since deltas add up in any order, workers
+    may flush a removal before the insert it undoes. Reads combine the
+    stored rows with this process's pending deltas.
+    `manage.py rebuild-wait-time-stats` recomputes the rows from the
+    visitor logs.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        # Signed deltas; removed values have negative counts
+        self._deltas: Dict[str, WaitTimeStats] = {}
+        # Sketch deltas; removed values have negative counts
+        self._sketches: Dict[SketchKey, QuantileSketch] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(
+        self, db: Session, added: Iterable[Sample] = (), removed: Iterable[Sample] = ()
+    ) -> None:
+        """Record committed visitor log inserts, and the old values of updates/deletes"""
+        with self._lock:
+            _group(added, 1, self._deltas)
+            _group(removed, -1, self._deltas)
+            _group_sketches(added, 1, self._sketches)
+            _group_sketches(removed, -1, self._sketches)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush(db)
+
+    def flush(self, db: Session) -> int:
+        """Add the pending deltas to the stored rows and commit.
+
+        On failure (e.g. a concurrent first insert of the same row) the
+        deltas are kept for the next flush. Returns the rows written.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            sketches, self._sketches = self._sketches, {}
+            self._last_flush = time.monotonic()
+        pending = set(deltas) | {branch_id for branch_id, _, _ in sketches}
+        if not pending:
+            return 0
+        # The stored rows are read FOR UPDATE and rewritten
+        use_primary(db)
+
+        try:
+            # Skip branches deleted since their logs were recorded
+            branch_ids = {
+                branch_id
+                for (branch_id,) in db.query(Branch.BranchId).filter(Branch.BranchId.in_(pending))
+            }
+            rows = {
+                row.BranchId: row
+                for row in db.query(BranchWaitTimeStats)
+                .filter(BranchWaitTimeStats.BranchId.in_(branch_ids))
+                .with_for_update()
+            }
+            for branch_id in branch_ids:
+                row = rows.get(branch_id)
+                if row is None:
+                    row = BranchWaitTimeStats(BranchId=branch_id)
+                    db.add(row)
+                stats = WaitTimeStats.from_row(row) if branch_id in rows else WaitTimeStats()
+                if branch_id in deltas:
+                    stats.merge(deltas[branch_id])
+                stats.to_row(row)
+            self._flush_sketches(
+                db, {key: sketch for key, sketch in sketches.items() if key[0] in branch_ids}
+            )
+            db.commit()
+            return len(branch_ids)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                _merge_into(self._deltas, deltas)
+                for key, sketch in sketches.items():
+                    pending_sketch = self._sketches.get(key)
+                    self._sketches[key] = sketch if pending_sketch is None else sketch.merge(pending_sketch)
+            return 0
+
+    def flush_with_session(self, session_factory: sessionmaker) -> int:
+        """Flush through a session of its own"""
+        db = session_factory()
+        try:
+            return self.flush(db)
+        finally:
+            db.close()
+
+    async def flush_periodically(self, session_factory: sessionmaker) -> None:
+        """Flush every flush_interval until cancelled, so buffered writes are
+        stored even when no further write triggers a flush"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            with self._lock:
+                due = time.monotonic() - self._last_flush >= self.flush_interval
+            if due:
+                await asyncio.to_thread(self.flush_with_session, session_factory)
+
+    def _flush_sketches(self, db: Session, sketches: Dict[SketchKey, QuantileSketch]) -> None:
+        """Merge sketch deltas into the stored hour and day sketches"""
+        keys = list(sketches)
+        for start in range(0, len(keys), SKETCH_LOOKUP_BATCH):
+            batch = keys[start:start + SKETCH_LOOKUP_BATCH]
+            rows = {
+                (row.BranchId, row.Granularity, row.BucketStart): row
+                for row in db.query(VisitorLogWaitSketch)
+                .filter(
+                    tuple_(
+                        VisitorLogWaitSketch.BranchId,
+                        VisitorLogWaitSketch.Granularity,
+                        VisitorLogWaitSketch.BucketStart,
+                    ).in_(batch)
+                )
+                .with_for_update()
+            }
+            for key in batch:
+                row = rows.get(key)
+                sketch = sketches[key]
+                if row is not None:
+                    sketch = QuantileSketch.from_bytes(row.Sketch).merge(sketch)
+                if sketch.zero_count == 0 and not sketch.bins.any():
+                    # Every log of the bucket was deleted or moved. A removal
+                    # flushed before its insert is kept, with negative counts
+                    if row is not None:
+                        db.delete(row)
+                    continue
+                if row is None:
+                    row = VisitorLogWaitSketch(BranchId=key[0], Granularity=key[1], BucketStart=key[2])
+                    db.add(row)
+                row.Sketch = sketch.to_bytes()
+                row.SampleCount = sketch.count
+
+    def get(self, db: Session, branch_id: str) -> Optional[WaitTimeStats]:
+        """Current statistics of a branch; None when nothing was recorded"""
+        with self._lock:
+            delta = self._deltas.get(branch_id)
+            delta = delta.copy() if delta is not None else None
+
+        row = db.get(BranchWaitTimeStats, branch_id)
+        if row is None and delta is None:
+            return None
+        stats = WaitTimeStats.from_row(row) if row is not None else WaitTimeStats()
+        return stats.merge(delta) if delta is not None else stats
+
+    def get_sketches(
+        self, db: Session, branch_id: str, start: datetime, end: datetime, by_hour_of_day: bool = False
+    ) -> Dict[Optional[int], QuantileSketch]:
+        """Merged wait time sketch of a branch's check-ins in the hours of [start, end).
+
+        Keyed by None, or by hour of the day (0-23) with `by_hour_of_day`,
+        which reads hour sketches only.
+        """
+        start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        if by_hour_of_day:
+            spans = [(HOUR, bucket_start(start, HOUR), end)]
+        else:
+            spans = range_buckets(start, end)
+
+        conditions = [
+            and_(
+                VisitorLogWaitSketch.Granularity == granularity,
+                VisitorLogWaitSketch.BucketStart >= first,
+                VisitorLogWaitSketch.BucketStart < last,
+            )
+            for granularity, first, last in spans
+        ]
+        rows = db.query(
+            VisitorLogWaitSketch.BucketStart, VisitorLogWaitSketch.Sketch
+        ).filter(VisitorLogWaitSketch.BranchId == branch_id, or_(*conditions))
+        parts = [(bucket, QuantileSketch.from_bytes(sketch)) for bucket, sketch in rows]
+
+        with self._lock:
+            parts += [
+                (bucket, sketch.copy())
+                for (pending_branch_id, granularity, bucket), sketch in self._sketches.items()
+                if pending_branch_id == branch_id
+                and any(granularity == g and first <= bucket < last for g, first, last in spans)
+            ]
+
+        groups: Dict[Optional[int], List[QuantileSketch]] = {}
+        for bucket, sketch in parts:
+            groups.setdefault(bucket.hour if by_hour_of_day else None, []).append(sketch)
+        return {key: QuantileSketch.merged(sketches) for key, sketches in groups.items()}
+
+    def rebuild(self, db: Session, batch_size: int = 10000) -> int:
+        """Recompute every branch's statistics and sketches from the visitor logs and commit"""
+        self.clear()
+        states: Dict[str, WaitTimeStats] = {}
+        sketches: Dict[SketchKey, QuantileSketch] = {}
+        result = db.execute(
+            select(VisitorLog.BranchId, VisitorLog.WaitTimeInMinutes, VisitorLog.CheckInTime)
+            .where(VisitorLog.WaitTimeInMinutes.isnot(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for batch in result.partitions():
+            _group(batch, 1, states)
+            _group_sketches(batch, 1, sketches)
+
+        db.query(BranchWaitTimeStats).delete()
+        db.query(VisitorLogWaitSketch).delete()
+        db.add_all(
+            stats.to_row(BranchWaitTimeStats(BranchId=branch_id))
+            for branch_id, stats in states.items()
+        )
+        db.add_all(
+            VisitorLogWaitSketch(
+                BranchId=branch_id,
+                Granularity=granularity,
+                BucketStart=bucket,
+                SampleCount=sketch.count,
+                Sketch=sketch.to_bytes(),
+            )
+            for (branch_id, granularity, bucket), sketch in sketches.items()
+        )
+        db.commit()
+        return len(states)
+
+    def clear(self) -> None:
+        """Drop pending states without writing them"""
+        with self._lock:
+            self._deltas = {}
+            self._sketches = {}
+            self._last_flush = time.monotonic()
+
+
+def _merge_into(target: Dict[str, WaitTimeStats], states: Dict[str, WaitTimeStats]) -> None:
+    for branch_id, state in states.items():
+        target[branch_id] = state.merge(target[branch_id]) if branch_id in target else state
+
+
+wait_time_stats = WaitTimeStatsRecorder(settings.WAIT_TIME_STATS_FLUSH_SECONDS)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Load benchmark comparing the sync and async database stacks.
+
+Seeds branches with crowd data, then starts the API twice with uvicorn
+(DB_ASYNC=false and DB_ASYNC=true) and hammers the live status and latest
+crowd data endpoints with many concurrent clients, printing requests/sec
+and latency percentiles for each stack.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_load --clients 500 --requests 50000
+    python -m benchmarks.async_load --database-url postgresql://... --clients 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import Base, Branch, CrowdData, Institution
+from app.services.branch_live_status_service import branch_live_status_service
+
+ENDPOINTS = (
+    "/api/v1/crowd-data/branch/{branch_id}/live-status",
+    "/api/v1/crowd-data/branch/{branch_id}/latest",
+)
+
+
+def seed(database_url: str, branches: int, readings: int) -> list:
+    """Create branches with `readings` crowd readings each and their live status."""
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    branch_ids = [str(uuid.uuid4()) for _ in range(branches)]
+    start = datetime.now() - timedelta(days=1)
+    with engine.begin() as conn:
+        institution_id = str(uuid.uuid4())
+        conn.execute(Institution.__table__.insert(), [{"InstitutionId": institution_id, "Name": "Benchmark"}])
+        conn.execute(
+            Branch.__table__.insert(),
+            [
+                {"BranchId": branch_id, "InstitutionId": institution_id, "Name": f"Branch {i}", "Capacity": 50}
+                for i, branch_id in enumerate(branch_ids)
+            ],
+        )
+        conn.execute(
+            CrowdData.__table__.insert(),
+            [
+                {
+                    "CrowdDataId": str(uuid.uuid4()),
+                    "BranchId": branch_id,
+                    "Timestamp": start + timedelta(minutes=5 * i),
+                    "CurrentCrowdCount": random.randrange(100),
+                }
+                for branch_id in branch_ids
+                for i in range(readings)
+            ],
+        )
+
+    with Session(engine) as db:
+        branch_live_status_service.backfill(db)
+    engine.dispose()
+    return branch_ids
+
+
+def start_server(database_url: str, port: int, use_async: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": database_url,
+        "DB_ASYNC": "true" if use_async else "false",
+    }
+    env.setdefault("JWT_SECRET_KEY", "benchmark")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+
+async def run_load(port: int, branch_ids: list, clients: int, total: int) -> dict:
+    """Send `total` GET requests from `clients` concurrent workers."""
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            path = random.choice(ENDPOINTS).format(branch_id=random.choice(branch_ids))
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync vs async database stack load benchmark")
+    parser.add_argument("--database-url", default="sqlite:///async_load_benchmark.db")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--branches", type=int, default=200)
+    parser.add_argument("--readings", type=int, default=50, help="crowd readings per branch")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    branch_ids = seed(args.database_url, args.branches, args.readings)
+    print(
+        f"Seeded {args.branches} branches; {args.requests} requests from {args.clients} clients\n"
+    )
+
+    for use_async in (False, True):
+        server = start_server(args.database_url, args.port, use_async)
+        try:
+            # Warm up connection pools before measuring
+            asyncio.run(run_load(args.port, branch_ids, min(args.clients, 50), 500))
+            result = asyncio.run(run_load(args.port, branch_ids, args.clients, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+        stack = "async (AsyncEngine)" if use_async else "sync (threadpool)"
+        print(
+            f"{stack:>20}: {result['requests_per_second']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+            f"errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
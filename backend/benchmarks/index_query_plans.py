@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Query-plan benchmark for the time-series indexes.
+
+Seeds crowd_data, visitor_logs and wait_time_predictions, then prints the
+query plan and timing of the hot queries with and without the indexes
+declared in app/models.py.
+
+Usage (from the backend directory):
+    python -m benchmarks.index_query_plans --rows 10000000
+    python -m benchmarks.index_query_plans --database-url postgresql://... --rows 10000000
+"""
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.models import Base, Branch, CrowdData, Institution, VisitorLog, WaitTimePrediction
+
+HOT_QUERIES = {
+    "latest crowd count of a branch": (
+        'SELECT "CurrentCrowdCount" FROM crowd_data WHERE "BranchId" = :branch_id '
+        'ORDER BY "Timestamp" DESC LIMIT 1'
+    ),
+    "crowd data date range": (
+        'SELECT * FROM crowd_data WHERE "BranchId" = :branch_id '
+        'AND "Timestamp" >= :since ORDER BY "Timestamp"'
+    ),
+    "visitor logs of a branch": (
+        'SELECT * FROM visitor_logs WHERE "BranchId" = :branch_id '
+        'ORDER BY "CheckInTime" DESC LIMIT 100'
+    ),
+    "predictions of a branch": (
+        'SELECT * FROM wait_time_predictions WHERE "BranchId" = :branch_id '
+        'ORDER BY "PredictedAt" DESC LIMIT 100'
+    ),
+    "predictions of a visitor": (
+        'SELECT * FROM wait_time_predictions WHERE "VisitorId" = :visitor_id '
+        'ORDER BY "PredictedAt" DESC LIMIT 100'
+    ),
+}
+
+
+def seed(engine, rows: int, branches: int, chunk_size: int) -> dict:
+    """Insert `rows` crowd readings plus proportional logs and predictions."""
+    start = datetime.now() - timedelta(days=365)
+    branch_ids = [str(uuid.uuid4()) for _ in range(branches)]
+    visitor_ids = [str(uuid.uuid4()) for _ in range(max(branches, 1) * 10)]
+
+    with engine.begin() as conn:
+        institution_id = str(uuid.uuid4())
+        conn.execute(Institution.__table__.insert(), [{"InstitutionId": institution_id, "Name": "Benchmark"}])
+        conn.execute(
+            Branch.__table__.insert(),
+            [
+                {"BranchId": branch_id, "InstitutionId": institution_id, "Name": f"Branch {i}", "Capacity": 50}
+                for i, branch_id in enumerate(branch_ids)
+            ],
+        )
+
+    def insert(table, total, make_row):
+        for offset in range(0, total, chunk_size):
+            batch = [make_row() for _ in range(min(chunk_size, total - offset))]
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+
+    def random_time():
+        return start + timedelta(seconds=random.randrange(365 * 24 * 3600))
+
+    insert(
+        CrowdData.__table__,
+        rows,
+        lambda: {
+            "CrowdDataId": str(uuid.uuid4()),
+            "BranchId": random.choice(branch_ids),
+            "Timestamp": random_time(),
+            "CurrentCrowdCount": random.randrange(100),
+        },
+    )
+
+    def visitor_log():
+        check_in = random_time()
+        wait = random.randrange(60)
+        return {
+            "VisitorLogId": str(uuid.uuid4()),
+            "VisitorName": "Visitor",
+            "BranchId": random.choice(branch_ids),
+            "CheckInTime": check_in,
+            "ServiceStartTime": check_in + timedelta(minutes=wait),
+            "WaitTimeInMinutes": wait,
+        }
+
+    insert(VisitorLog.__table__, rows // 4, visitor_log)
+    insert(
+        WaitTimePrediction.__table__,
+        rows // 20,
+        lambda: {
+            "WaitTimePredictionId": str(uuid.uuid4()),
+            "VisitorId": random.choice(visitor_ids),
+            "BranchId": random.choice(branch_ids),
+            "VisitDate": random_time(),
+            "PredictedAt": random_time(),
+            "PredictedWaitTime": float(random.randrange(60)),
+            "ActualWaitTime": float(random.randrange(60)),
+            "Accuracy": 75.0,
+        },
+    )
+
+    return {
+        "branch_id": branch_ids[0],
+        "visitor_id": visitor_ids[0],
+        "since": datetime.now() - timedelta(days=30),
+    }
+
+
+def explain(engine, params: dict) -> None:
+    """Print the plan and best-of-three timing of each hot query."""
+    is_postgres = engine.dialect.name == "postgresql"
+    prefix = "EXPLAIN" if is_postgres else "EXPLAIN QUERY PLAN"
+
+    with engine.connect() as conn:
+        # Refresh planner statistics so both runs see the seeded data
+        conn.execute(text("ANALYZE"))
+
+        for name, sql in HOT_QUERIES.items():
+            plan = conn.execute(text(f"{prefix} {sql}"), params).all()
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                timings.append(time.perf_counter() - started)
+
+            print(f"  {name}: {min(timings) * 1000:.2f} ms")
+            for row in plan:
+                print(f"      {row[-1]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-series index query-plan benchmark")
+    parser.add_argument("--database-url", default="sqlite:///index_benchmark.db")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="crowd_data rows to seed")
+    parser.add_argument("--branches", type=int, default=2_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    indexes = [
+        index
+        for table_name in Base.metadata.tables
+        for index in Base.metadata.tables[table_name].indexes
+    ]
+    for index in indexes:
+        index.drop(engine)
+
+    started = time.perf_counter()
+    params = seed(engine, args.rows, args.branches, args.chunk_size)
+    print(f"Seeded {args.rows} crowd_data rows in {time.perf_counter() - started:.1f} s")
+
+    print("\nWithout indexes:")
+    explain(engine, params)
+
+    started = time.perf_counter()
+    for index in indexes:
+        index.create(engine)
+    print(f"\nCreated {len(indexes)} indexes in {time.perf_counter() - started:.1f} s")
+
+    print("\nWith indexes:")
+    explain(engine, params)
+
+
+if __name__ == "__main__":
+    main()
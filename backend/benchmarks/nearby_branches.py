@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the in-memory nearby branch index.
+
+Indexes random branches spread over a country-sized area and times radius
+searches plus the k least crowded selection, printing latency percentiles.
+The database lookups of the endpoint (crowd counts and the k branch rows)
+are not included.
+
+Usage (from the backend directory):
+    python -m benchmarks.nearby_branches --branches 100000 --radius 5
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+import numpy as np
+
+from app.services.branch_locator import BranchSpatialIndex
+
+# Roughly the bounding box of Sri Lanka
+LATITUDES = (5.9, 9.9)
+LONGITUDES = (79.6, 81.9)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nearby branch index benchmark")
+    parser.add_argument("--branches", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--radius", type=float, default=5.0, help="search radius in km")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = BranchSpatialIndex()
+    crowd_counts = {}
+    started = time.perf_counter()
+    for i in range(args.branches):
+        branch_id = f"branch-{i}"
+        index.upsert_branch(branch_id, rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES))
+        crowd_counts[branch_id] = rng.randrange(100)
+    print(f"Indexed {args.branches} branches in {time.perf_counter() - started:.2f} s")
+
+    # Nothing to load from the database: every branch is already indexed
+    index._loaded = True
+
+    timings = []
+    matches = 0
+    for _ in range(args.queries):
+        latitude, longitude = rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+        started = time.perf_counter()
+        found = index.search(None, latitude, longitude, args.radius)
+        heapq.nsmallest(args.limit, found, key=lambda match: (crowd_counts[match[0]], match[1]))
+        timings.append(time.perf_counter() - started)
+        matches += len(found)
+
+    timings_ms = np.array(timings) * 1000
+    print(
+        f"{args.queries} searches within {args.radius} km "
+        f"({matches / args.queries:.0f} matches on average)\n"
+        f"  p50 {np.percentile(timings_ms, 50):.3f} ms  "
+        f"p95 {np.percentile(timings_ms, 95):.3f} ms  "
+        f"p99 {np.percentile(timings_ms, 99):.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
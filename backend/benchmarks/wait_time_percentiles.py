@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Accuracy, memory and latency benchmark for the wait time quantile sketches.
+
+Simulates a year of visitor logs for one branch (busier and slower around
+midday, long-tailed waits), builds the hourly and daily sketches the way
+WaitTimeStatsRecorder does, then:
+
+- compares p50/p90/p99 of random date ranges, merged from the sketches,
+  against the exact nearest-rank percentiles of the raw wait times,
+- reports the stored size of the sketches against the raw values,
+- times merging the sketches a range needs,
+- checks that sketches built by separate workers merge to the same bins.
+
+Usage (from the backend directory):
+    python -m benchmarks.wait_time_percentiles --days 365 --visits-per-day 400
+"""
+
+import argparse
+import bisect
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.db.crowd_rollup_crud import DAY, HOUR
+from app.services.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+from app.services.wait_time_stats import range_buckets
+
+START = datetime(2025, 1, 1)
+QUANTILES = (50, 90, 99)
+
+
+def _simulate(rng: np.random.Generator, days: int, visits_per_day: int):
+    """Check-in hours since START and wait times (whole minutes)"""
+    count = days * visits_per_day
+    day = rng.integers(0, days, count)
+    hour = np.clip(rng.normal(12.5, 3.0, count), 8, 19.99)
+    hours = day * 24 + hour
+    # Longer waits around midday
+    median = 8 + 10 * np.exp(-((hour - 12.5) ** 2) / 8)
+    wait_times = np.floor(rng.lognormal(np.log(median), 0.7))
+    order = np.argsort(hours)
+    return hours[order], wait_times[order]
+
+
+def _build(hours: np.ndarray, wait_times: np.ndarray):
+    """Hour and day sketches keyed by bucket start, in bucket order"""
+    sketches = {HOUR: {}, DAY: {}}
+    for granularity, size in ((HOUR, 1), (DAY, 24)):
+        buckets = (hours // size).astype(np.int64)
+        boundaries = np.flatnonzero(np.diff(buckets)) + 1
+        for chunk_buckets, chunk_values in zip(
+            np.split(buckets, boundaries), np.split(wait_times, boundaries)
+        ):
+            bucket = START + timedelta(hours=int(chunk_buckets[0]) * size)
+            sketches[granularity][bucket] = QuantileSketch().add(chunk_values)
+    return sketches
+
+
+def _range_sketch(sketches, starts, start: datetime, end: datetime) -> QuantileSketch:
+    """Merge the sketches of a range, found by bisection like an index scan"""
+    parts = []
+    for granularity, first, last in range_buckets(start, end):
+        buckets = starts[granularity]
+        for bucket in buckets[bisect.bisect_left(buckets, first):bisect.bisect_left(buckets, last)]:
+            parts.append(sketches[granularity][bucket])
+    return QuantileSketch.merged(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Wait time quantile sketch benchmark")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--visits-per-day", type=int, default=400)
+    parser.add_argument("--ranges", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    hours, wait_times = _simulate(rng, args.days, args.visits_per_day)
+    print(f"Simulated {len(wait_times)} visitor logs over {args.days} days")
+
+    started = time.perf_counter()
+    sketches = _build(hours, wait_times)
+    starts = {granularity: list(group) for granularity, group in sketches.items()}
+    print(f"Built {len(sketches[HOUR])} hour and {len(sketches[DAY])} day sketches "
+          f"in {time.perf_counter() - started:.2f} s")
+
+    # Memory: stored sketch sizes against 8 bytes per raw value
+    for granularity in (HOUR, DAY):
+        sizes = np.array([len(sketch.to_bytes()) for sketch in sketches[granularity].values()])
+        print(f"  {granularity} sketches: mean {sizes.mean():.0f} B, max {sizes.max()} B, "
+              f"total {sizes.sum() / 1024:.0f} KiB")
+    total = sum(len(sketch.to_bytes()) for group in sketches.values() for sketch in group.values())
+    print(f"  raw float64 values: {len(wait_times) * 8 / 1024:.0f} KiB "
+          f"({len(wait_times) * 8 / total:.1f}x the sketches)")
+
+    # Accuracy and latency over random ranges (an hour up to the whole period)
+    errors = {q: [] for q in QUANTILES}
+    timings = []
+    for _ in range(args.ranges):
+        length = float(np.exp(rng.uniform(0, np.log(args.days * 24))))
+        first = rng.uniform(0, args.days * 24 - length)
+        start = START + timedelta(hours=int(first))
+        end = start + timedelta(hours=max(1, int(length)))
+
+        begin = time.perf_counter()
+        sketch = _range_sketch(sketches, starts, start, end)
+        estimates = {q: sketch.percentile(q) for q in QUANTILES}
+        timings.append(time.perf_counter() - begin)
+
+        low, high = (start - START) / timedelta(hours=1), (end - START) / timedelta(hours=1)
+        exact_values = np.sort(wait_times[(hours >= low) & (hours < high)])
+        assert sketch.count == len(exact_values)
+        if not len(exact_values):
+            continue
+        for q in QUANTILES:
+            exact = exact_values[max(1, int(np.ceil(q / 100 * len(exact_values)))) - 1]
+            if exact > 0:
+                errors[q].append(abs(estimates[q] - exact) / exact)
+
+    print(f"Relative error over {args.ranges} ranges (bound {RELATIVE_ACCURACY:.0%}):")
+    for q in QUANTILES:
+        print(f"  p{q}: mean {np.mean(errors[q]):.4%}, max {np.max(errors[q]):.4%}")
+    print(f"Range merge + percentiles: p50 {np.percentile(timings, 50) * 1000:.2f} ms, "
+          f"p99 {np.percentile(timings, 99) * 1000:.2f} ms")
+
+    # Sketches built by separate workers merge to the single-process sketch
+    worker = rng.integers(0, args.workers, len(wait_times))
+    merged = QuantileSketch.merged(
+        [QuantileSketch().add(wait_times[worker == i]) for i in range(args.workers)]
+    )
+    single = QuantileSketch().add(wait_times)
+    identical = merged.to_bytes() == single.to_bytes()
+    print(f"{args.workers} worker sketches merge to the single sketch: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,56 @@ class Settings(BaseSettings):
 
     # DB
     SQLALCHEMY_DATABASE_URI: Optional[str] = os.environ["SQLALCHEMY_DATABASE_URI"]
+    # comma separated read replicas; request sessions read from one of them
+    # until they write, then stay on the primary
+    SQLALCHEMY_REPLICA_DATABASE_URIS: Optional[str] = os.getenv("SQLALCHEMY_REPLICA_DATABASE_URIS")
+    # serve the hot crowd data routes (create, latest reading, live status) through
+    # an AsyncEngine (asyncpg / aiosqlite); the other routes stay sync. The async URL defaults to SQLALCHEMY_DATABASE_URI with the asyncio driver
+    DB_ASYNC: bool = False
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = os.getenv("ASYNC_SQLALCHEMY_DATABASE_URI")
 
     # openai
-    OPENAI_API_KEY: Optional[str] = os.environ["OPENAI_API_KEY"]
+    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+
+    # wait time predictions: "local" (statistical model) or "openai" (local
+    # estimate refined by OpenAI, falling back to the local estimate)
+    PREDICTION_ENGINE: str = "local"
+    # in-flight OpenAI calls and how long to wait before using the local estimate
+    OPENAI_MAX_CONCURRENCY: int = 8
+    OPENAI_TIMEOUT_SECONDS: float = 10.0
+    # cached predictions per (branch, 15 minute visit bucket); 0 disables the cache
+    PREDICTION_CACHE_TTL_SECONDS: int = 300
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+    # (branch, visit time) pairs accepted by POST /wait-time-predictions/batch
+    PREDICTION_BATCH_MAX_ITEMS: int = 500
+    # items accepted by POST /crowd-data/bulk and POST /visitor-logs/bulk;
+    # larger imports go in several requests (or `manage.py import-visitor-logs`)
+    CROWD_DATA_BULK_MAX_ITEMS: int = 5000
+    VISITOR_LOG_BULK_MAX_ITEMS: int = 5000
+    # serialized institution/branch listings, dropped on catalog writes; the
+    # TTL bounds staleness after edits made outside the API; 0 disables
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+
+    # raw crowd data older than this is deleted by `manage.py apply-crowd-retention`;
+    # its hourly/daily rollups are kept
+    CROWD_DATA_RETENTION_DAYS: int = 90
+    # monthly partitions of crowd_data/visitor_logs (PostgreSQL) that
+    # `manage.py create-partitions` keeps created ahead of the current month
+    PARTITION_MONTHS_AHEAD: int = 3
+    # alert thresholds are indexed per process; a branch's preferences are
+    # reloaded after this long to pick up changes made through other workers
+    ALERT_INDEX_REFRESH_SECONDS: float = 60.0
+    # the nearby branch search indexes coordinates per process; the index is
+    # reloaded after this long to pick up changes made through other workers
+    BRANCH_LOCATOR_REFRESH_SECONDS: float = 60.0
+    # branch heatmaps older than this are recomputed when read, in case the
+    # `manage.py compute-heatmaps` job stops running
+    HEATMAP_MAX_AGE_HOURS: int = 24
+    # running per-branch wait time statistics are buffered per process and
+    # written to branch_wait_time_stats this often
+    WAIT_TIME_STATS_FLUSH_SECONDS: float = 5.0
+    # half-life of the exponentially decayed (recent) average wait time
+    WAIT_TIME_EWMA_HALF_LIFE_HOURS: float = 72.0
 
 
 settings = Settings()
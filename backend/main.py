@@ -1,9 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.db.session import session_local
 from app.routes import router as api_router
+from app.services.wait_time_stats import wait_time_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Store buffered wait time statistics even when no further logs arrive
+    periodic_flush = asyncio.create_task(wait_time_stats.flush_periodically(session_local))
+    yield
+    periodic_flush.cancel()
+    with suppress(asyncio.CancelledError):
+        await periodic_flush
+    # Persist wait time statistics still buffered in this process
+    wait_time_stats.flush_with_session(session_local)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -15,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 
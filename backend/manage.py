@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the SmartQueue backend.
+
+Usage:
+    python manage.py backfill-live-status [--batch-size N]
+    python manage.py import-visitor-logs FILE [--chunk-size N]
+    python manage.py backfill-crowd-rollups
+    python manage.py apply-crowd-retention [--days N] [--archive FILE]
+    python manage.py create-partitions [--months-ahead N]
+    python manage.py detach-partitions TABLE --before YYYY-MM [--drop]
+    python manage.py compute-heatmaps
+    python manage.py rebuild-wait-time-stats
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List
+
+from fastapi import HTTPException
+
+from app.db.crowd_rollup_crud import crowd_rollup_crud
+from app.db.partitions import PARTITIONED_TABLES, partition_crud
+from app.db.session import session_local
+from app.services.branch_heatmap_service import branch_heatmap_service
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.bulk_payload import parse_bulk_body
+from app.services.crowd_data_service import EXPORT_FIELDS
+from app.services.crowd_retention_service import crowd_retention_service
+from app.services.visitor_log_service import visitor_log_service
+from app.services.wait_time_stats import wait_time_stats
+from core.config import settings
+
+
+def backfill_live_status(args: argparse.Namespace) -> int:
+    """Rebuild the branch_live_status table from the crowd data table."""
+    db = session_local()
+    try:
+        count = branch_live_status_service.backfill(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Backfilled live status for {count} branches")
+    return 0
+
+
+def _read_visitor_log_dump(path: Path) -> List[Any]:
+    """Read a CSV, NDJSON (.ndjson/.jsonl) or JSON array visitor log dump."""
+    if path.suffix == ".csv":
+        with path.open(newline="") as f:
+            # Empty cells mean "not provided", e.g. a wait time to compute
+            return [
+                {key: value for key, value in row.items() if value != ""}
+                for row in csv.DictReader(f)
+            ]
+    content_type = "application/x-ndjson" if path.suffix in (".ndjson", ".jsonl") else "application/json"
+    return parse_bulk_body(path.read_bytes(), content_type)
+
+
+def import_visitor_logs(args: argparse.Namespace) -> int:
+    """Import an end-of-day visitor log dump."""
+    try:
+        items = _read_visitor_log_dump(Path(args.file))
+    except HTTPException as e:
+        print(f"Could not read {args.file}: {e.detail}", file=sys.stderr)
+        return 1
+
+    db = session_local()
+    try:
+        result = visitor_log_service.bulk_create_visitor_logs(
+            db, items, chunk_size=args.chunk_size
+        )
+        # Write the wait time statistics buffered by the import before exiting
+        wait_time_stats.flush(db)
+    finally:
+        db.close()
+
+    for item in result.items:
+        if item.status == "error":
+            print(f"  item {item.index}: {item.detail}", file=sys.stderr)
+    print(
+        f"Imported {result.created}/{result.total} visitor logs in "
+        f"{result.elapsedSeconds:.2f} s ({result.rowsPerSecond:.0f} rows/sec)"
+    )
+    return 0 if result.failed == 0 else 1
+
+
+def backfill_crowd_rollups(args: argparse.Namespace) -> int:
+    """Rebuild the hourly and daily crowd data rollups from the raw rows."""
+    db = session_local()
+    try:
+        count = crowd_rollup_crud.rebuild(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Wrote {count} crowd data rollups")
+    return 0
+
+
+def apply_crowd_retention(args: argparse.Namespace) -> int:
+    """Delete raw crowd data past the retention horizon, keeping its rollups."""
+    archive = None
+    archive_file = open(args.archive, "a") if args.archive else None
+    if archive_file is not None:
+        def archive(rows):
+            for row in rows:
+                record = dict(zip(EXPORT_FIELDS, row))
+                record["timestamp"] = record["timestamp"].isoformat()
+                archive_file.write(json.dumps(record) + "\n")
+
+    db = session_local()
+    try:
+        deleted = crowd_retention_service.apply_retention(db, args.days, archive=archive)
+    finally:
+        db.close()
+        if archive_file is not None:
+            archive_file.close()
+    print(f"Deleted {deleted} crowd data rows older than {args.days} days")
+    return 0
+
+
+def create_partitions(args: argparse.Namespace) -> int:
+    """Create the upcoming monthly partitions; meant to run daily from cron."""
+    db = session_local()
+    try:
+        created = partition_crud.ensure_partitions(db, args.months_ahead)
+        db.commit()
+    finally:
+        db.close()
+    for name in created:
+        print(f"  created {name}")
+    print(f"Created {len(created)} partitions")
+    return 0
+
+
+def detach_partitions(args: argparse.Namespace) -> int:
+    """Detach (or drop) the monthly partitions of a table before a month."""
+    try:
+        before = datetime.strptime(args.before, "%Y-%m")
+    except ValueError:
+        print(f"Invalid month {args.before!r}, expected YYYY-MM", file=sys.stderr)
+        return 1
+
+    db = session_local()
+    try:
+        detached = partition_crud.detach_partitions_before(db, args.table, before, drop=args.drop)
+        db.commit()
+    finally:
+        db.close()
+    for name in detached:
+        print(f"  {'dropped' if args.drop else 'detached'} {name}")
+    print(f"{'Dropped' if args.drop else 'Detached'} {len(detached)} partitions")
+    return 0
+
+
+def compute_heatmaps(args: argparse.Namespace) -> int:
+    """Recompute every branch's best-time heatmap; meant to run hourly from cron."""
+    db = session_local()
+    try:
+        count = branch_heatmap_service.compute_heatmaps(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Computed heatmaps for {count} branches")
+    return 0
+
+
+def rebuild_wait_time_stats(args: argparse.Namespace) -> int:
+    """Recompute the running wait time statistics of every branch from its visitor logs."""
+    db = session_local()
+    try:
+        count = wait_time_stats.rebuild(db)
+    finally:
+        db.close()
+    print(f"Rebuilt wait time statistics for {count} branches")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = subparsers.add_parser(
+        "backfill-live-status", help="Rebuild branch live status from crowd data"
+    )
+    backfill_parser.add_argument("--batch-size", type=int, default=500)
+    backfill_parser.set_defaults(func=backfill_live_status)
+
+    import_parser = subparsers.add_parser(
+        "import-visitor-logs", help="Import a CSV, NDJSON or JSON visitor log dump"
+    )
+    import_parser.add_argument("file")
+    import_parser.add_argument("--chunk-size", type=int, default=1000)
+    import_parser.set_defaults(func=import_visitor_logs)
+
+    rollup_parser = subparsers.add_parser(
+        "backfill-crowd-rollups", help="Rebuild hourly/daily crowd data rollups"
+    )
+    rollup_parser.set_defaults(func=backfill_crowd_rollups)
+
+    retention_parser = subparsers.add_parser(
+        "apply-crowd-retention", help="Delete raw crowd data past the retention horizon"
+    )
+    retention_parser.add_argument("--days", type=int, default=settings.CROWD_DATA_RETENTION_DAYS)
+    retention_parser.add_argument("--archive", help="append deleted rows to this NDJSON file")
+    retention_parser.set_defaults(func=apply_crowd_retention)
+
+    create_partitions_parser = subparsers.add_parser(
+        "create-partitions", help="Create upcoming monthly partitions (PostgreSQL)"
+    )
+    create_partitions_parser.add_argument(
+        "--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD
+    )
+    create_partitions_parser.set_defaults(func=create_partitions)
+
+    detach_parser = subparsers.add_parser(
+        "detach-partitions", help="Detach monthly partitions older than a month (PostgreSQL)"
+    )
+    detach_parser.add_argument("table", choices=sorted(PARTITIONED_TABLES))
+    detach_parser.add_argument("--before", required=True, help="first month to keep, as YYYY-MM")
+    detach_parser.add_argument("--drop", action="store_true", help="drop the partitions too")
+    detach_parser.set_defaults(func=detach_partitions)
+
+    heatmap_parser = subparsers.add_parser(
+        "compute-heatmaps", help="Recompute best-time heatmaps of every branch"
+    )
+    heatmap_parser.set_defaults(func=compute_heatmaps)
+
+    wait_stats_parser = subparsers.add_parser(
+        "rebuild-wait-time-stats", help="Recompute running wait time statistics from visitor logs"
+    )
+    wait_stats_parser.set_defaults(func=rebuild_wait_time_stats)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -5,7 +7,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.db.session import get_db
-from app.models import Base
+from app.models import Base, Branch, Institution
+from app.services.branch_locator import branch_locator
+from app.services.catalog_cache import catalog_cache
+from app.services.wait_time_stats import wait_time_stats
 from main import app
 
 # Create in-memory SQLite database for testing
@@ -22,6 +27,11 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_session():
     """Create a fresh database session for each test."""
     Base.metadata.create_all(bind=engine)
+    # Catalog responses and branch locations cached by an earlier test
+    # describe another database
+    catalog_cache.clear()
+    branch_locator.clear()
+    wait_time_stats.clear()
     session = TestingSessionLocal()
     try:
         yield session
@@ -29,6 +39,33 @@ def db_session():
         session.close()
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def make_branch(db_session):
+    """Factory of committed branches, each under a new institution unless one is given."""
+    def make(institution_id=None, **columns):
+        if institution_id is None:
+            institution = Institution(InstitutionId=str(uuid.uuid4()), Name="Test Bank")
+            db_session.add(institution)
+            institution_id = institution.InstitutionId
+        branch = Branch(
+            BranchId=str(uuid.uuid4()),
+            InstitutionId=institution_id,
+            **{"Name": "Main Branch", "Capacity": 40, **columns},
+        )
+        db_session.add(branch)
+        db_session.commit()
+        return branch
+    return make
+
+@pytest.fixture
+def branch(make_branch):
+    """A branch to attach crowd data and visitor logs to."""
+    return make_branch()
+
+@pytest.fixture
+def branch_id(branch):
+    return branch.BranchId
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with a fresh database session."""
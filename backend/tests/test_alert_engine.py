@@ -0,0 +1,200 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models import AlertPreference, User, Visitor
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.schemas.user_schema import AlertPreferenceCreate, AlertPreferenceUpdate
+from app.services.alert_engine import AlertNotifier, alert_engine
+from app.services.crowd_data_service import crowd_data_service
+from app.services.user_service import user_service
+
+
+@pytest.fixture(autouse=True)
+def reset_alert_engine():
+    alert_engine.clear()
+    alert_engine.notifier.clear()
+    yield
+    alert_engine.clear()
+    alert_engine.notifier.clear()
+
+
+@pytest.fixture
+def branch_ids(make_branch):
+    first = make_branch(Name="Branch 0", Capacity=50)
+    second = make_branch(first.InstitutionId, Name="Branch 1", Capacity=50)
+    return [first.BranchId, second.BranchId]
+
+
+@pytest.fixture
+def visitor_ids(db_session):
+    now = datetime.now()
+    users = [
+        User(
+            UserId=str(uuid.uuid4()),
+            Name=f"Visitor {i}",
+            Email=f"visitor{i}@example.com",
+            Role="visitor",
+            Password="hashed",
+            CreatedAt=now,
+            UpdatedAt=now,
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    db_session.add_all([Visitor(UserId=user.UserId) for user in users])
+    db_session.commit()
+    return [user.UserId for user in users]
+
+
+def _add_reading(db_session, branch_id, count, minutes=0):
+    crowd_data_service.create_crowd_data(
+        db_session,
+        CrowdDataCreate(
+            branchId=branch_id,
+            timestamp=datetime(2025, 1, 6, 9, 0) + timedelta(minutes=minutes),
+            currentCrowdCount=count,
+        ),
+        str(uuid.uuid4()),
+    )
+
+
+def _add_preference(db_session, visitor_id, branch_id, threshold):
+    return user_service.create_alert_preference(
+        db_session,
+        AlertPreferenceCreate(visitorId=visitor_id, branchId=branch_id, crowdThreshold=threshold),
+    )
+
+
+class TestAlertEvaluationEngine:
+    """Test cases for crowd threshold alert evaluation."""
+
+    @pytest.mark.unit
+    def test_notifies_only_when_the_threshold_is_crossed(self, db_session, branch_ids, visitor_ids):
+        branch_id = branch_ids[0]
+        preference = _add_preference(db_session, visitor_ids[0], branch_id, 10)
+
+        for minutes, count in enumerate([5, 12, 15, 8, 9, 10]):
+            _add_reading(db_session, branch_id, count, minutes)
+
+        notifications = alert_engine.notifier.recent()
+        assert [(n.direction, n.previousCrowdCount, n.crowdCount) for n in notifications] == [
+            ("above", 5, 12),
+            ("below", 15, 8),
+            ("above", 9, 10),
+        ]
+        assert all(n.alertId == preference.alertId for n in notifications)
+
+    @pytest.mark.unit
+    def test_only_crossed_thresholds_of_the_branch_notify(self, db_session, branch_ids, visitor_ids):
+        _add_preference(db_session, visitor_ids[0], branch_ids[0], 5)
+        _add_preference(db_session, visitor_ids[1], branch_ids[0], 20)
+        _add_preference(db_session, visitor_ids[2], branch_ids[1], 5)
+
+        _add_reading(db_session, branch_ids[0], 10)
+
+        notifications = alert_engine.notifier.recent()
+        assert [(n.visitorId, n.branchId) for n in notifications] == [(visitor_ids[0], branch_ids[0])]
+
+    @pytest.mark.unit
+    def test_preference_changes_refresh_the_index(self, db_session, branch_ids, visitor_ids):
+        branch_id = branch_ids[0]
+        _add_reading(db_session, branch_id, 5)
+        preference = _add_preference(db_session, visitor_ids[0], branch_id, 30)
+
+        user_service.update_alert_preference(
+            db_session, preference.alertId, AlertPreferenceUpdate(crowdThreshold=8)
+        )
+        _add_reading(db_session, branch_id, 10, 1)
+        assert [n.crowdThreshold for n in alert_engine.notifier.recent()] == [8]
+
+        user_service.delete_alert_preference(db_session, preference.alertId)
+        _add_reading(db_session, branch_id, 0, 2)
+        assert len(alert_engine.notifier.recent()) == 1
+
+    @pytest.mark.unit
+    def test_bulk_ingest_evaluates_each_branch_once_with_one_preference_query(
+        self, db_session, branch_ids, visitor_ids
+    ):
+        _add_preference(db_session, visitor_ids[0], branch_ids[0], 10)
+        _add_preference(db_session, visitor_ids[1], branch_ids[1], 10)
+        alert_engine.clear()
+
+        items = [
+            {
+                "branchId": branch_id,
+                "timestamp": (datetime(2025, 1, 6, 9, 0) + timedelta(minutes=i)).isoformat(),
+                "currentCrowdCount": 5 + i,
+            }
+            for branch_id in branch_ids
+            for i in range(10)
+        ]
+
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            crowd_data_service.bulk_create_crowd_data(db_session, items)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        notifications = alert_engine.notifier.recent()
+        assert sorted((n.branchId, n.previousCrowdCount, n.crowdCount) for n in notifications) == sorted(
+            (branch_id, 0, 14) for branch_id in branch_ids
+        )
+        assert sum("FROM alert_preferences" in statement for statement in statements) == 1
+
+    @pytest.mark.unit
+    def test_preferences_changed_by_another_worker_are_picked_up(
+        self, db_session, branch_ids, visitor_ids
+    ):
+        branch_id = branch_ids[0]
+        _add_reading(db_session, branch_id, 5)
+        # Written without this process's CRUD, as another worker would
+        db_session.add(AlertPreference(
+            AlertId=str(uuid.uuid4()),
+            VisitorId=visitor_ids[0],
+            BranchId=branch_id,
+            CrowdThreshold=8,
+            CreatedAt=datetime.now(),
+        ))
+        db_session.commit()
+
+        _add_reading(db_session, branch_id, 10, 1)
+        assert alert_engine.notifier.recent() == []
+
+        later = alert_engine.refresh_interval + 1
+        with patch("app.services.alert_engine.time.monotonic", side_effect=lambda: 1e9 + later):
+            _add_reading(db_session, branch_id, 5, 2)
+        assert [n.direction for n in alert_engine.notifier.recent()] == ["below"]
+
+    @pytest.mark.unit
+    def test_preferences_without_a_threshold_are_ignored(self, db_session, branch_ids, visitor_ids):
+        branch_id = branch_ids[0]
+        _add_reading(db_session, branch_id, 5)
+        preference = _add_preference(db_session, visitor_ids[0], branch_id, 8)
+        db_session.add(AlertPreference(
+            AlertId=str(uuid.uuid4()), VisitorId=visitor_ids[1], BranchId=branch_id
+        ))
+        db_session.commit()
+        alert_engine.clear()
+
+        with pytest.raises(HTTPException) as error:
+            user_service.update_alert_preference(
+                db_session, preference.alertId, AlertPreferenceUpdate(crowdThreshold=None)
+            )
+        assert error.value.status_code == 400
+        alert_engine.upsert_preference("alert-without-threshold", visitor_ids[2], branch_id, None)
+
+        _add_reading(db_session, branch_id, 10, 1)
+        assert [n.alertId for n in alert_engine.notifier.recent()] == [preference.alertId]
+
+    @pytest.mark.unit
+    def test_notifiers_must_implement_notify(self):
+        with pytest.raises(TypeError):
+            AlertNotifier()
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.async_session import async_database_uri
+from app.models import Base, Branch, CrowdDataRollup, Institution
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.services.async_crowd_data_service import AsyncCrowdDataService
+
+
+@pytest_asyncio.fixture
+async def async_db_session():
+    """A fresh in-memory aiosqlite database for each test."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def branch(async_db_session):
+    institution = Institution(InstitutionId=str(uuid.uuid4()), Name="Test Bank")
+    branch = Branch(
+        BranchId=str(uuid.uuid4()),
+        InstitutionId=institution.InstitutionId,
+        Name="Main Branch",
+        Capacity=20,
+    )
+    async_db_session.add_all([institution, branch])
+    await async_db_session.commit()
+    return branch
+
+
+class TestAsyncCrowdDataService:
+    """Test cases for the AsyncSession crowd data service."""
+
+    @pytest.mark.unit
+    def test_async_database_uri(self):
+        assert async_database_uri("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+        assert async_database_uri("postgresql+psycopg2://u@db/app") == "postgresql+asyncpg://u@db/app"
+        assert async_database_uri("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_create_refreshes_live_status(self, async_db_session, branch):
+        service = AsyncCrowdDataService()
+        for count in (5, 10):
+            await service.create_crowd_data(
+                async_db_session,
+                CrowdDataCreate(branchId=branch.BranchId, timestamp=datetime.now(), currentCrowdCount=count),
+                str(uuid.uuid4()),
+            )
+
+        live_status = await service.get_live_status(async_db_session, branch.BranchId)
+
+        assert live_status.LatestCrowdCount == 10
+        assert live_status.OccupancyRatio == 0.5
+        # Shares the sync staging, rollups included
+        rollups = (await async_db_session.execute(select(CrowdDataRollup))).scalars().all()
+        for granularity in ("hour", "day"):
+            assert sum(
+                rollup.SampleCount for rollup in rollups if rollup.Granularity == granularity
+            ) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_latest_crowd_data_loads_branch(self, async_db_session, branch):
+        service = AsyncCrowdDataService()
+        crowd_data_id = str(uuid.uuid4())
+        await service.create_crowd_data(
+            async_db_session,
+            CrowdDataCreate(branchId=branch.BranchId, timestamp=datetime.now(), currentCrowdCount=7),
+            crowd_data_id,
+        )
+        async_db_session.expunge_all()
+
+        latest = await service.get_latest_crowd_data_by_branch(async_db_session, branch.BranchId)
+
+        assert latest.CrowdDataId == crowd_data_id
+        assert latest.branch.Name == "Main Branch"
+        assert await service.get_latest_crowd_data_by_branch(async_db_session, "missing") is None
@@ -0,0 +1,133 @@
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi import status
+
+from app.models import Branch, BranchHeatmap, CrowdData, VisitorLog
+from app.services.branch_heatmap_service import branch_heatmap_service
+from app.services.wait_time_prediction_service import wait_time_prediction_service
+from app.services.wait_time_predictor import local_wait_time_predictor
+
+# Midnight of the Monday a week before the current one, inside the history window
+LAST_MONDAY = datetime.combine(
+    datetime.now().date() - timedelta(days=datetime.now().weekday() + 7), datetime.min.time()
+)
+
+
+def _visits(db_session, branch_id, day, hour, wait_times):
+    for wait_time in wait_times:
+        check_in = LAST_MONDAY + timedelta(days=day, hours=hour, minutes=5)
+        db_session.add(VisitorLog(
+            VisitorLogId=str(uuid.uuid4()), VisitorName="Visitor", BranchId=branch_id,
+            CheckInTime=check_in, ServiceStartTime=check_in + timedelta(minutes=wait_time),
+            WaitTimeInMinutes=wait_time,
+        ))
+    db_session.commit()
+
+
+def _crowd(db_session, branch_id, day, hour, counts):
+    for count in counts:
+        db_session.add(CrowdData(
+            CrowdDataId=str(uuid.uuid4()), BranchId=branch_id,
+            Timestamp=LAST_MONDAY + timedelta(days=day, hours=hour, minutes=10), CurrentCrowdCount=count,
+        ))
+    db_session.commit()
+
+
+@pytest.fixture
+def branch_id(db_session, make_branch):
+    branch_id = make_branch(Capacity=10).BranchId
+    _visits(db_session, branch_id, 0, 9, [30, 40, 35])   # Monday 09:00
+    _visits(db_session, branch_id, 0, 14, [5, 8])        # Monday 14:00
+    _visits(db_session, branch_id, 2, 11, [12])          # Wednesday 11:00
+    _crowd(db_session, branch_id, 0, 9, [25, 30])
+    _crowd(db_session, branch_id, 0, 14, [4])
+    _crowd(db_session, branch_id, 4, 16, [2])            # Friday 16:00, no visits
+    return branch_id
+
+
+class TestBranchHeatmap:
+    """Test cases for the precomputed best-time heatmaps."""
+
+    @pytest.mark.unit
+    def test_heatmap_matches_the_local_predictor(self, db_session, branch_id):
+        branch_heatmap_service.compute_heatmaps(db_session)
+        db_session.commit()
+
+        branch = db_session.query(Branch).filter(Branch.BranchId == branch_id).one()
+        wait_times, crowd_counts = wait_time_prediction_service._get_history(db_session, branch_id)
+        expected = local_wait_time_predictor.expected_wait_times(branch.Name, 10, wait_times, crowd_counts)
+
+        heatmap = db_session.query(BranchHeatmap).filter(BranchHeatmap.BranchId == branch_id).one()
+        waits, crowds, samples = branch_heatmap_service._matrices(heatmap)
+        np.testing.assert_allclose(waits, expected, rtol=1e-6)
+        assert crowds[9] == 27.5 and np.isnan(crowds[10])
+        assert samples[9] == 5 and samples[4 * 24 + 16] == 1 and samples.sum() == 10
+
+        # Each cell is the prediction for a visit in that hour
+        for hour in (9, 14, 2 * 24 + 11, 100):
+            visit = LAST_MONDAY + timedelta(hours=hour, minutes=30)
+            predicted = local_wait_time_predictor.predict(branch.Name, 10, visit, wait_times, crowd_counts)
+            assert predicted["predictedWaitTime"] == round(waits[hour])
+
+    @pytest.mark.unit
+    def test_recompute_replaces_every_branch(self, db_session, make_branch, branch_id):
+        empty_branch = make_branch(Name="Empty Park", Capacity=10).BranchId
+
+        assert branch_heatmap_service.compute_heatmaps(db_session) == 2
+        _visits(db_session, branch_id, 0, 9, [90])
+        assert branch_heatmap_service.compute_heatmaps(db_session) == 2
+        db_session.commit()
+
+        assert db_session.query(BranchHeatmap).count() == 2
+        heatmap = db_session.query(BranchHeatmap).filter(BranchHeatmap.BranchId == branch_id).one()
+        assert branch_heatmap_service._matrices(heatmap)[2][9] == 6
+        # Without history every hour falls back to the institution-type default
+        empty = db_session.query(BranchHeatmap).filter(BranchHeatmap.BranchId == empty_branch).one()
+        waits, _, samples = branch_heatmap_service._matrices(empty)
+        assert set(waits.tolist()) == {5.0} and samples.sum() == 0
+
+    @pytest.mark.api
+    def test_heatmap_endpoint_computes_missing_heatmaps(self, client, db_session, branch_id):
+        response = client.get(f"/api/v1/branches/{branch_id}/heatmap")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["days"][0] == "Monday"
+        assert len(data["expectedWaitTime"]) == 7 and len(data["expectedWaitTime"][0]) == 24
+        assert data["expectedCrowdCount"][0][9] == 27.5
+        assert data["expectedCrowdCount"][0][10] is None
+        assert data["sampleCount"][4][16] == 1
+        assert data["expectedWaitTime"][0][9] > data["expectedWaitTime"][0][14]
+        assert db_session.query(BranchHeatmap).count() == 1
+
+        missing = client.get("/api/v1/branches/missing/heatmap")
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.api
+    def test_best_times_rank_observed_hours(self, client, branch_id):
+        best = client.get(f"/api/v1/branches/{branch_id}/best-times").json()
+
+        assert [(slot["day"], slot["hour"]) for slot in best] == [
+            ("Monday", 14), ("Friday", 16), ("Wednesday", 11), ("Monday", 9)
+        ]
+        assert best[0]["dayOfWeek"] == 0 and best[0]["sampleCount"] == 3
+        assert best[0]["expectedCrowdCount"] == 4.0
+        assert best[2]["expectedCrowdCount"] is None
+
+        monday_morning = client.get(
+            f"/api/v1/branches/{branch_id}/best-times",
+            params={"day": 0, "startHour": 8, "endHour": 12, "limit": 3},
+        ).json()
+        assert [(slot["day"], slot["hour"]) for slot in monday_morning] == [("Monday", 9)]
+
+    @pytest.mark.api
+    def test_best_times_without_history(self, client, make_branch):
+        branch_id = make_branch(Capacity=10).BranchId
+
+        response = client.get(f"/api/v1/branches/{branch_id}/best-times")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
@@ -0,0 +1,137 @@
+import random
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import status
+
+from app.models import Branch, Institution
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.services.branch_locator import BranchSpatialIndex, haversine_km
+from app.services.crowd_data_service import crowd_data_service
+
+
+@pytest.fixture
+def institution_id(db_session):
+    institution = Institution(InstitutionId=str(uuid.uuid4()), Name="Test Bank")
+    db_session.add(institution)
+    db_session.commit()
+    return institution.InstitutionId
+
+
+def _branch(db_session, institution_id, name, latitude, longitude, crowd_count=None):
+    branch = Branch(
+        BranchId=str(uuid.uuid4()),
+        InstitutionId=institution_id,
+        Name=name,
+        Latitude=latitude,
+        Longitude=longitude,
+    )
+    db_session.add(branch)
+    db_session.commit()
+    if crowd_count is not None:
+        crowd_data_service.create_crowd_data(
+            db_session,
+            CrowdDataCreate(branchId=branch.BranchId, timestamp=datetime(2025, 1, 6, 9), currentCrowdCount=crowd_count),
+            str(uuid.uuid4()),
+        )
+    return branch.BranchId
+
+
+class TestBranchLocator:
+    """Test cases for the nearby branch search."""
+
+    @pytest.mark.unit
+    def test_search_matches_a_brute_force_scan(self, db_session):
+        rng = random.Random(7)
+        index = BranchSpatialIndex()
+        points = {}
+        for i in range(2000):
+            # Dense around the antimeridian and the north pole, sparse elsewhere
+            latitude, longitude = rng.choice([
+                (rng.uniform(-90, 90), rng.uniform(-180, 180)),
+                (rng.uniform(-5, 5), rng.choice([rng.uniform(179, 180), rng.uniform(-180, -179)])),
+                (rng.uniform(89, 90), rng.uniform(-180, 180)),
+            ])
+            points[str(i)] = (latitude, longitude)
+            index.upsert_branch(str(i), latitude, longitude)
+
+        for latitude, longitude, radius in [(0, 180, 50), (0, -179.9, 120), (89.9, 0, 30), (45, 7, 5000), (-30, 20, 20000)]:
+            expected = sorted(
+                branch_id
+                for branch_id, (lat, lon) in points.items()
+                if haversine_km(latitude, longitude, lat, lon) <= radius
+            )
+            found = index.search(db_session, latitude, longitude, radius)
+            assert sorted(branch_id for branch_id, _ in found) == expected
+            assert [distance for _, distance in found] == sorted(distance for _, distance in found)
+
+    @pytest.mark.api
+    def test_nearby_returns_least_crowded_branches_in_radius(self, client, db_session, institution_id):
+        _branch(db_session, institution_id, "Busy", 6.9271, 79.8612, crowd_count=30)
+        quiet = _branch(db_session, institution_id, "Quiet", 6.9350, 79.8500, crowd_count=2)
+        _branch(db_session, institution_id, "Unknown", 6.9000, 79.8700)
+        _branch(db_session, institution_id, "Far", 7.2906, 80.6337, crowd_count=0)
+        _branch(db_session, institution_id, "Nowhere", None, None)
+
+        response = client.get(
+            "/api/v1/branches/nearby", params={"lat": 6.93, "lon": 79.86, "radius": 10, "limit": 2}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [branch["name"] for branch in data] == ["Unknown", "Quiet"]
+        assert data[1]["branchId"] == quiet
+        assert data[1]["totalCrowdCount"] == 2
+        assert 0 < data[1]["distanceKm"] < 2
+
+        names = [branch["name"] for branch in client.get(
+            "/api/v1/branches/nearby", params={"lat": 6.93, "lon": 79.86, "radius": 10}
+        ).json()]
+        assert names == ["Unknown", "Quiet", "Busy"]
+
+    @pytest.mark.api
+    def test_branch_crud_keeps_the_index_current(self, client, institution_id):
+        params = {"lat": 51.5, "lon": -0.12, "radius": 5}
+        assert client.get("/api/v1/branches/nearby", params=params).json() == []
+
+        branch_id = client.post(
+            "/api/v1/branches",
+            json={"institutionId": institution_id, "name": "City", "latitude": 51.51, "longitude": -0.13},
+        ).json()["branchId"]
+        assert [branch["name"] for branch in client.get("/api/v1/branches/nearby", params=params).json()] == ["City"]
+
+        client.put(f"/api/v1/branches/{branch_id}", json={"latitude": 53.48, "longitude": -2.24})
+        assert client.get("/api/v1/branches/nearby", params=params).json() == []
+        moved = client.get("/api/v1/branches/nearby", params={"lat": 53.48, "lon": -2.24}).json()
+        assert [branch["branchId"] for branch in moved] == [branch_id]
+
+        client.delete(f"/api/v1/branches/{branch_id}")
+        assert client.get("/api/v1/branches/nearby", params={"lat": 53.48, "lon": -2.24}).json() == []
+
+    @pytest.mark.unit
+    def test_reload_picks_up_changes_made_through_other_workers(self, db_session, institution_id):
+        index = BranchSpatialIndex(refresh_interval=0)
+        moved = _branch(db_session, institution_id, "Moved", 51.51, -0.13)
+        assert [branch_id for branch_id, _ in index.search(db_session, 51.5, -0.12, 5)] == [moved]
+
+        # Written by another worker, so this index is not told
+        other = _branch(db_session, institution_id, "Other", 51.50, -0.12)
+        db_session.get(Branch, moved).Latitude = 53.48
+        db_session.commit()
+        # A change made through this process wins over the rows it races with
+        index.upsert_branch("local", 51.49, -0.12)
+
+        found = index.search(db_session, 51.5, -0.12, 5)
+        assert sorted(branch_id for branch_id, _ in found) == sorted([other, "local"])
+
+        stale = BranchSpatialIndex(refresh_interval=3600)
+        stale.search(db_session, 51.5, -0.12, 5)
+        db_session.delete(db_session.get(Branch, other))
+        db_session.commit()
+        assert [branch_id for branch_id, _ in stale.search(db_session, 51.5, -0.12, 5)] == [other]
+
+    @pytest.mark.api
+    def test_out_of_range_coordinates_are_rejected(self, client):
+        response = client.get("/api/v1/branches/nearby", params={"lat": 91, "lon": 0})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import status
+
+from app.models import Administrator, Institution, InstitutionType, User
+from app.services.catalog_cache import CatalogCache, catalog_cache
+
+
+@pytest.fixture
+def institution_id(db_session):
+    now = datetime(2025, 1, 1)
+    user = User(
+        UserId="admin-1", Name="Ada Admin", Email="ada@example.com", Role="administrator",
+        Password="secret", CreatedAt=now, UpdatedAt=now,
+    )
+    institution_type = InstitutionType(InstitutionTypeId="type-1", InstitutionType="Bank")
+    institution = Institution(
+        InstitutionId=str(uuid.uuid4()), InstitutionTypeId="type-1", AdministratorId="admin-1", Name="Test Bank"
+    )
+    db_session.add_all([user, Administrator(UserId="admin-1"), institution_type, institution])
+    db_session.commit()
+    return institution.InstitutionId
+
+
+class TestCatalogCache:
+    """Test cases for the cached institution and branch catalog responses."""
+
+    @pytest.mark.api
+    def test_repeated_reads_are_served_from_cache(self, client, institution_id):
+        first = client.get("/api/v1/institutions")
+        second = client.get("/api/v1/institutions")
+
+        assert first.status_code == second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+        assert [institution["name"] for institution in first.json()] == ["Test Bank"]
+        assert second.headers["etag"] == first.headers["etag"]
+        assert catalog_cache.stats()["hits"] == 1
+
+    @pytest.mark.api
+    def test_if_none_match_returns_not_modified(self, client, institution_id):
+        etag = client.get("/api/v1/branches").headers["etag"]
+
+        response = client.get("/api/v1/branches", headers={"If-None-Match": f'"other", W/{etag}'})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    @pytest.mark.api
+    def test_catalog_writes_invalidate_cached_responses(self, client, institution_id):
+        etag = client.get("/api/v1/branches").headers["etag"]
+
+        client.post("/api/v1/branches", json={"institutionId": institution_id, "name": "Main Branch"})
+        response = client.get("/api/v1/branches", headers={"If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        assert [branch["name"] for branch in response.json()] == ["Main Branch"]
+
+        client.put(f"/api/v1/institutions/{institution_id}", json={"name": "Renamed Bank"})
+        assert client.get("/api/v1/institutions").json()[0]["name"] == "Renamed Bank"
+
+        # Administrators are embedded in institutions
+        client.put("/api/v1/users/admin-1", json={"name": "Ada Lovelace"})
+        assert client.get("/api/v1/institutions").json()[0]["administrator"]["name"] == "Ada Lovelace"
+
+    @pytest.mark.api
+    def test_live_crowd_counts_are_filled_into_cached_listings(self, client, institution_id):
+        branch_id = client.post(
+            "/api/v1/branches", json={"institutionId": institution_id, "name": "Main Branch"}
+        ).json()["branchId"]
+        listing = client.get("/api/v1/branches")
+        assert listing.json()[0]["totalCrowdCount"] == 0
+
+        client.post(
+            "/api/v1/crowd-data",
+            json={"branchId": branch_id, "timestamp": datetime(2025, 1, 6, 9).isoformat(), "currentCrowdCount": 7},
+        )
+
+        # The catalog itself is still cached, but the new count changes the body
+        hits = catalog_cache.stats()["hits"]
+        response = client.get("/api/v1/branches", headers={"If-None-Match": listing.headers["etag"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["totalCrowdCount"] == 7
+        assert catalog_cache.stats()["hits"] == hits + 1
+        assert client.get("/api/v1/institutions").json()[0]["branches"][0]["totalCrowdCount"] == 7
+        assert client.get("/api/v1/institutions/all").json()[0]["branches"][0]["totalCrowdCount"] == 7
+        assert client.get("/api/v1/branches/crowd-counts").json() == [
+            {"branchId": branch_id, "totalCrowdCount": 7}
+        ]
+
+        unchanged = client.get("/api/v1/branches", headers={"If-None-Match": response.headers["etag"]})
+        assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.api
+    def test_writes_invalidate_the_caches_of_other_workers(self, client, db_session, institution_id):
+        other_worker = CatalogCache(ttl=300)
+        version = other_worker.current_version(db_session)
+        other_worker.set("branches", version, [])
+        assert other_worker.get("branches", version) is not None
+
+        client.post("/api/v1/branches", json={"institutionId": institution_id, "name": "Main Branch"})
+
+        assert other_worker.current_version(db_session) == version + 1
+        assert other_worker.get("branches", other_worker.current_version(db_session)) is None
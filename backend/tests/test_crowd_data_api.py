@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from fastapi import status
+
+from app.db.crowd_rollup_crud import crowd_rollup_crud
+from app.models import CrowdData
+from app.services.crowd_data_service import crowd_data_service
+from core.config import settings
+
+
+class TestCrowdDataBulkAPI:
+    """Test cases for bulk crowd data ingestion."""
+
+    @pytest.mark.api
+    def test_bulk_json_array(self, client, db_session, branch):
+        payload = [
+            {"branchId": branch.BranchId, "timestamp": "2025-01-01T09:00:00", "currentCrowdCount": 10},
+            {"branchId": branch.BranchId, "timestamp": "2025-01-01T09:05:00", "currentCrowdCount": 12},
+            {"branchId": "missing", "timestamp": "2025-01-01T09:05:00", "currentCrowdCount": 3},
+            {"branchId": branch.BranchId, "timestamp": "not a date", "currentCrowdCount": 3},
+        ]
+
+        response = client.post("/api/v1/crowd-data/bulk", json=payload)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["total"] == 4
+        assert data["created"] == 2
+        assert data["failed"] == 2
+        assert [item["status"] for item in data["items"]] == ["created", "created", "error", "error"]
+        assert data["items"][2]["detail"] == "Branch not found"
+        assert db_session.query(CrowdData).count() == 2
+
+        latest = client.get(f"/api/v1/crowd-data/branch/{branch.BranchId}/latest").json()
+        assert latest["currentCrowdCount"] == 12
+
+    @pytest.mark.api
+    def test_bulk_ndjson(self, client, db_session, branch):
+        lines = [
+            json.dumps({"branchId": branch.BranchId, "timestamp": "2025-01-01T09:00:00", "currentCrowdCount": 5}),
+            "{not json",
+            json.dumps({"branchId": branch.BranchId, "timestamp": "2025-01-01T09:01:00", "currentCrowdCount": 6}),
+        ]
+
+        response = client.post(
+            "/api/v1/crowd-data/bulk",
+            content="\n".join(lines),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["created"] == 2
+        assert data["items"][1]["status"] == "error"
+        assert db_session.query(CrowdData).count() == 2
+
+    @pytest.mark.api
+    def test_bulk_rejects_non_array(self, client):
+        response = client.post("/api/v1/crowd-data/bulk", json={"branchId": "x"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.api
+    def test_bulk_rejects_more_items_than_allowed(self, client, db_session, branch, monkeypatch):
+        monkeypatch.setattr(settings, "CROWD_DATA_BULK_MAX_ITEMS", 2)
+        payload = [
+            {"branchId": branch.BranchId, "timestamp": f"2025-01-01T09:0{i}:00", "currentCrowdCount": i}
+            for i in range(3)
+        ]
+
+        response = client.post("/api/v1/crowd-data/bulk", json=payload)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert db_session.query(CrowdData).count() == 0
+        assert client.post("/api/v1/crowd-data/bulk", json=payload[:2]).status_code == status.HTTP_201_CREATED
+
+    @pytest.mark.unit
+    def test_bulk_reports_committed_and_rolled_back_chunks(self, db_session, branch, monkeypatch):
+        add_readings = crowd_rollup_crud.add_readings
+        calls = []
+
+        def fail_second_chunk(db, readings):
+            calls.append(readings)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return add_readings(db, readings)
+
+        monkeypatch.setattr(crowd_rollup_crud, "add_readings", fail_second_chunk)
+        items = [
+            {"branchId": branch.BranchId, "timestamp": f"2025-01-01T09:0{i}:00", "currentCrowdCount": i}
+            for i in range(5)
+        ]
+        items.insert(1, {"branchId": "missing", "timestamp": "2025-01-01T09:00:00", "currentCrowdCount": 1})
+
+        result = crowd_data_service.bulk_create_crowd_data(db_session, items, chunk_size=2)
+
+        assert [(chunk.status, chunk.itemIndexes) for chunk in result.chunks] == [
+            ("committed", [0, 2]),
+            ("rolled_back", [3, 4]),
+            ("committed", [5]),
+        ]
+        assert result.chunks[1].detail == "connection lost"
+        assert result.created == 3
+        assert db_session.query(CrowdData).count() == 3
@@ -0,0 +1,187 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import BranchLiveStatus, CrowdData
+from app.schemas.crowd_data_schema import CrowdDataCreate, CrowdDataUpdate
+from app.services.branch_live_status_service import branch_live_status_service
+from app.services.crowd_data_service import crowd_data_service
+from app.services.institution_service import institution_service
+
+
+def _create_branches(make_branch, count):
+    """Create an institution with `count` branches and return the branches."""
+    branches = [make_branch(Name="Branch 0", Capacity=50)]
+    for i in range(1, count):
+        branches.append(make_branch(branches[0].InstitutionId, Name=f"Branch {i}", Capacity=50))
+    return branches
+
+
+def _add_crowd_data(db_session, branch_id, counts, start=None, minutes_apart=1):
+    """Add one crowd reading per count through the service."""
+    start = start or datetime(2025, 1, 1, 9, 0)
+    return [
+        crowd_data_service.create_crowd_data(
+            db_session,
+            CrowdDataCreate(
+                branchId=branch_id,
+                timestamp=start + timedelta(minutes=i * minutes_apart),
+                currentCrowdCount=count,
+            ),
+            str(uuid.uuid4()),
+        )
+        for i, count in enumerate(counts)
+    ]
+
+
+class TestLatestCrowdCounts:
+    """Test cases for the batched latest crowd count resolver."""
+
+    @pytest.mark.unit
+    def test_returns_latest_count_per_branch(self, db_session, make_branch):
+        branches = _create_branches(make_branch, 3)
+        _add_crowd_data(db_session, branches[0].BranchId, [5, 10, 7])
+        _add_crowd_data(db_session, branches[1].BranchId, [30, 20])
+
+        counts = crowd_data_service.get_latest_crowd_counts(db_session)
+
+        assert counts == {branches[0].BranchId: 7, branches[1].BranchId: 20}
+
+    @pytest.mark.unit
+    def test_filters_by_branch_ids(self, db_session, make_branch):
+        branches = _create_branches(make_branch, 2)
+        _add_crowd_data(db_session, branches[0].BranchId, [1, 2])
+        _add_crowd_data(db_session, branches[1].BranchId, [3, 4])
+
+        counts = crowd_data_service.get_latest_crowd_counts(
+            db_session, [branches[1].BranchId]
+        )
+
+        assert counts == {branches[1].BranchId: 4}
+        assert crowd_data_service.get_latest_crowd_counts(db_session, []) == {}
+
+    @pytest.mark.unit
+    def test_branch_listing_query_count_is_constant(self, db_session, make_branch):
+        branches = _create_branches(make_branch, 25)
+        for branch in branches:
+            _add_crowd_data(db_session, branch.BranchId, [1, 2, 3])
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            result = institution_service.get_all_branches(db_session)
+            institutions = institution_service.get_all_institutions(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert len(result) == 25
+        assert all(branch.totalCrowdCount == 3 for branch in result)
+        assert len(institutions[0].branches) == 25
+        assert len(statements) == 4
+
+
+class TestBranchLiveStatus:
+    """Test cases for the materialized branch live status."""
+
+    @pytest.mark.unit
+    def test_create_maintains_live_status(self, db_session, make_branch):
+        branch = _create_branches(make_branch, 1)[0]
+        # Readings every 10 minutes: only the last two fall in the 15 minute window
+        created = _add_crowd_data(
+            db_session, branch.BranchId, [10, 20, 40], minutes_apart=10
+        )
+
+        live_status = branch_live_status_service.get_live_status(db_session, branch.BranchId)
+
+        assert live_status.LatestCrowdDataId == created[-1].CrowdDataId
+        assert live_status.LatestCrowdCount == 40
+        assert live_status.RollingAverageCrowdCount == 30
+        assert live_status.OccupancyRatio == 40 / 50
+        latest = crowd_data_service.get_latest_crowd_data_by_branch(db_session, branch.BranchId)
+        assert latest.CrowdDataId == created[-1].CrowdDataId
+
+    @pytest.mark.unit
+    def test_older_reading_applied_late_keeps_the_newer_state(self, db_session, make_branch):
+        branch = _create_branches(make_branch, 1)[0]
+        newer, older = datetime(2025, 1, 1, 9, 5), datetime(2025, 1, 1, 9, 0)
+
+        # Two inserts racing: the newer reading's transaction commits first
+        branch_live_status_service._apply(
+            db_session, branch.BranchId, "newer", newer, 30, 50, newer_only=True
+        )
+        db_session.commit()
+        live_status = branch_live_status_service._apply(
+            db_session, branch.BranchId, "older", older, 10, 50, newer_only=True
+        )
+        db_session.commit()
+
+        assert live_status.LatestCrowdDataId == "newer"
+        stored = db_session.query(BranchLiveStatus).one()
+        assert (stored.LatestCrowdDataId, stored.LatestTimestamp, stored.LatestCrowdCount) == (
+            "newer", newer, 30
+        )
+
+        # Recomputing after a delete may move the state back in time
+        branch_live_status_service._apply(db_session, branch.BranchId, "older", older, 10, 50)
+        db_session.commit()
+        assert db_session.query(BranchLiveStatus).one().LatestCrowdDataId == "older"
+
+    @pytest.mark.unit
+    def test_update_and_delete_maintain_live_status(self, db_session, make_branch):
+        branch = _create_branches(make_branch, 1)[0]
+        created = _add_crowd_data(db_session, branch.BranchId, [10, 20])
+
+        crowd_data_service.update_crowd_data(
+            db_session, created[1].CrowdDataId, CrowdDataUpdate(currentCrowdCount=25)
+        )
+        assert branch_live_status_service.get_live_status(
+            db_session, branch.BranchId
+        ).LatestCrowdCount == 25
+
+        crowd_data_service.delete_crowd_data(db_session, created[1].CrowdDataId)
+        assert branch_live_status_service.get_live_status(
+            db_session, branch.BranchId
+        ).LatestCrowdCount == 10
+
+        crowd_data_service.delete_crowd_data(db_session, created[0].CrowdDataId)
+        assert branch_live_status_service.get_live_status(db_session, branch.BranchId) is None
+
+    @pytest.mark.unit
+    def test_deleting_a_branch_with_crowd_data(self, db_session, make_branch):
+        branch = _create_branches(make_branch, 1)[0]
+        _add_crowd_data(db_session, branch.BranchId, [10, 20])
+
+        assert institution_service.delete_branch(db_session, branch.BranchId) is True
+        assert branch_live_status_service.get_live_status(db_session, branch.BranchId) is None
+        assert db_session.query(BranchLiveStatus).count() == 0
+
+    @pytest.mark.unit
+    def test_backfill_rebuilds_live_status(self, db_session, make_branch):
+        branches = _create_branches(make_branch, 2)
+        _add_crowd_data(db_session, branches[0].BranchId, [5, 15])
+        # Rows written directly bypass the service and need a backfill
+        db_session.add(
+            CrowdData(
+                CrowdDataId=str(uuid.uuid4()),
+                BranchId=branches[1].BranchId,
+                Timestamp=datetime(2025, 1, 1, 9, 0),
+                CurrentCrowdCount=8,
+            )
+        )
+        db_session.query(BranchLiveStatus).delete()
+        db_session.commit()
+
+        count = branch_live_status_service.backfill(db_session, batch_size=1)
+
+        assert count == 2
+        assert crowd_data_service.get_latest_crowd_counts(db_session) == {
+            branches[0].BranchId: 15,
+            branches[1].BranchId: 8,
+        }
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocket
+
+from app.api.crowd_data_api import stream_live_status
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.services.crowd_data_service import crowd_data_service
+from app.services.crowd_events import CrowdEventBroker, crowd_event_broker
+
+
+@pytest.fixture
+def branch_id(make_branch):
+    return make_branch(Capacity=10).BranchId
+
+
+def _post_crowd_data(client, branch_id, count):
+    response = client.post(
+        "/api/v1/crowd-data",
+        json={"branchId": branch_id, "timestamp": datetime.now().isoformat(), "currentCrowdCount": count},
+    )
+    assert response.status_code == 201
+
+
+class TestCrowdEventBroker:
+    """Test cases for the in-process live status pub/sub."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_one_event_fans_out_to_every_subscriber_of_the_branch(self):
+        broker = CrowdEventBroker()
+        followers = [broker.subscribe(["branch-1"]) for _ in range(1000)]
+        other = broker.subscribe(["branch-2"])
+
+        # Published from a worker thread, like the sync routes do
+        await asyncio.get_running_loop().run_in_executor(
+            None, broker.publish, "branch-1", '{"latestCrowdCount": 3}'
+        )
+        await asyncio.sleep(0)
+
+        assert all(f.queue.get_nowait() == '{"latestCrowdCount": 3}' for f in followers)
+        assert other.queue.empty()
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slow_subscribers_keep_the_newest_events(self):
+        broker = CrowdEventBroker(queue_size=2)
+        subscription = broker.subscribe(["branch-1"])
+
+        for count in range(5):
+            broker.publish("branch-1", str(count))
+        await asyncio.sleep(0)
+
+        assert [subscription.queue.get_nowait() for _ in range(2)] == ["3", "4"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unsubscribe_removes_the_topic(self):
+        broker = CrowdEventBroker()
+        subscription = broker.subscribe(["branch-1", "branch-2"])
+
+        broker.unsubscribe(subscription)
+
+        assert broker.subscriber_count("branch-1") == 0
+        assert broker._subscriptions == {}
+
+
+class TestLiveStatusPush:
+    """Test cases for the WebSocket and SSE live status endpoints."""
+
+    @pytest.mark.integration
+    def test_websocket_receives_snapshot_and_updates(self, client, branch_id):
+        _post_crowd_data(client, branch_id, 2)
+
+        with client.websocket_connect(
+            f"/api/v1/crowd-data/live-status/ws?branchId={branch_id}"
+        ) as websocket:
+            assert json.loads(websocket.receive_text())["latestCrowdCount"] == 2
+
+            _post_crowd_data(client, branch_id, 5)
+            event = json.loads(websocket.receive_text())
+
+        assert event["branchId"] == branch_id
+        assert event["latestCrowdCount"] == 5
+        assert event["occupancyRatio"] == 0.5
+
+    @pytest.mark.integration
+    def test_websocket_closes_with_an_error_when_forwarding_fails(self, client, branch_id, monkeypatch):
+        send_text = WebSocket.send_text
+
+        async def failing_send_text(websocket, data):
+            if data == "unsendable":
+                raise RuntimeError("send failed")
+            await send_text(websocket, data)
+
+        monkeypatch.setattr(WebSocket, "send_text", failing_send_text)
+        _post_crowd_data(client, branch_id, 2)
+
+        with client.websocket_connect(
+            f"/api/v1/crowd-data/live-status/ws?branchId={branch_id}"
+        ) as websocket:
+            websocket.receive_text()
+            crowd_event_broker.publish(branch_id, "unsendable")
+
+            message = websocket.receive()
+
+        assert message["type"] == "websocket.close"
+        assert message["code"] == status.WS_1011_INTERNAL_ERROR
+        assert crowd_event_broker.subscriber_count(branch_id) == 0
+
+    @pytest.mark.integration
+    def test_websocket_subscribe_message(self, client, branch_id):
+        with client.websocket_connect("/api/v1/crowd-data/live-status/ws") as websocket:
+            websocket.send_json({"action": "subscribe", "branchIds": [branch_id]})
+            # Wait until the subscription is registered
+            websocket.send_json({"action": "ping"})
+            assert websocket.receive_json() == {"error": "Unknown action"}
+
+            _post_crowd_data(client, branch_id, 7)
+
+            assert json.loads(websocket.receive_text())["latestCrowdCount"] == 7
+
+    @pytest.mark.integration
+    def test_websocket_survives_malformed_messages(self, client, branch_id):
+        with client.websocket_connect("/api/v1/crowd-data/live-status/ws") as websocket:
+            websocket.send_text("not json")
+            assert websocket.receive_json() == {"error": "Invalid JSON"}
+            websocket.send_json({"action": "subscribe", "branchIds": branch_id})
+            assert websocket.receive_json() == {"error": "branchIds must be a list"}
+
+            # Still connected and following
+            websocket.send_json({"action": "subscribe", "branchIds": [branch_id]})
+            websocket.send_json({"action": "ping"})
+            assert websocket.receive_json() == {"error": "Unknown action"}
+
+    @pytest.mark.integration
+    @pytest.mark.asyncio
+    async def test_sse_stream_sends_snapshot_then_updates(self, db_session, branch_id):
+        # The test client buffers whole responses, so read the endless stream directly
+        crowd_data_service.create_crowd_data(
+            db_session,
+            CrowdDataCreate(branchId=branch_id, timestamp=datetime.now(), currentCrowdCount=4),
+            str(uuid.uuid4()),
+        )
+
+        response = await stream_live_status(branch_ids=[branch_id], db=db_session)
+        events = response.body_iterator
+        try:
+            snapshot = await events.__anext__()
+            crowd_data_service.create_crowd_data(
+                db_session,
+                CrowdDataCreate(branchId=branch_id, timestamp=datetime.now(), currentCrowdCount=6),
+                str(uuid.uuid4()),
+            )
+            update = await asyncio.wait_for(events.__anext__(), 1)
+        finally:
+            await events.aclose()
+
+        assert response.media_type == "text/event-stream"
+        assert snapshot.startswith("event: live-status\ndata: ")
+        assert json.loads(snapshot.split("data: ")[1])["latestCrowdCount"] == 4
+        assert json.loads(update.split("data: ")[1])["latestCrowdCount"] == 6
+        assert crowd_event_broker.subscriber_count(branch_id) == 0
@@ -0,0 +1,150 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.db.crowd_rollup_crud import DAY, HOUR, crowd_rollup_crud
+from app.models import BranchLiveStatus, CrowdData, CrowdDataRollup
+from app.schemas.crowd_data_schema import CrowdDataCreate, CrowdDataUpdate
+from app.services.crowd_data_service import crowd_data_service
+from app.services.crowd_retention_service import crowd_retention_service
+from app.services.institution_service import institution_service
+
+
+def _rollups(db_session):
+    return {
+        (rollup.Granularity, rollup.BucketStart): (
+            rollup.MinCrowdCount,
+            rollup.MaxCrowdCount,
+            rollup.SumCrowdCount,
+            rollup.SampleCount,
+        )
+        for rollup in db_session.query(CrowdDataRollup).all()
+    }
+
+
+def _bulk(db_session, branch_id, start, counts, step=timedelta(minutes=20)):
+    crowd_data_service.bulk_create_crowd_data(db_session, [
+        {
+            "branchId": branch_id,
+            "timestamp": (start + step * i).isoformat(),
+            "currentCrowdCount": count,
+        }
+        for i, count in enumerate(counts)
+    ])
+
+
+class TestCrowdRollups:
+    """Test cases for the hourly/daily crowd data rollups and retention."""
+
+    @pytest.mark.unit
+    def test_writes_keep_rollups_in_step_with_raw_rows(self, db_session, branch_id):
+        _bulk(db_session, branch_id, datetime(2025, 1, 6, 9, 0), [4, 8, 6, 10, 2])
+        crowd_data_service.create_crowd_data(
+            db_session,
+            CrowdDataCreate(branchId=branch_id, timestamp=datetime(2025, 1, 6, 9, 50), currentCrowdCount=12),
+            str(uuid.uuid4()),
+        )
+
+        rollups = _rollups(db_session)
+        assert rollups[(HOUR, datetime(2025, 1, 6, 9))] == (4, 12, 30, 4)
+        assert rollups[(HOUR, datetime(2025, 1, 6, 10))] == (2, 10, 12, 2)
+        assert rollups[(DAY, datetime(2025, 1, 6))] == (2, 12, 42, 6)
+
+        crowd_rollup_crud.rebuild(db_session)
+        assert _rollups(db_session) == rollups
+
+    @pytest.mark.unit
+    def test_updates_and_deletes_rebuild_the_day(self, db_session, branch_id):
+        _bulk(db_session, branch_id, datetime(2025, 1, 6, 9, 0), [4, 8, 20])
+        largest = db_session.query(CrowdData).filter(CrowdData.CurrentCrowdCount == 20).one()
+        smallest = db_session.query(CrowdData).filter(CrowdData.CurrentCrowdCount == 4).one()
+
+        crowd_data_service.update_crowd_data(
+            db_session,
+            largest.CrowdDataId,
+            CrowdDataUpdate(timestamp=datetime(2025, 1, 7, 9, 0)),
+        )
+        crowd_data_service.delete_crowd_data(db_session, smallest.CrowdDataId)
+
+        assert _rollups(db_session) == {
+            (HOUR, datetime(2025, 1, 6, 9)): (8, 8, 8, 1),
+            (DAY, datetime(2025, 1, 6)): (8, 8, 8, 1),
+            (HOUR, datetime(2025, 1, 7, 9)): (20, 20, 20, 1),
+            (DAY, datetime(2025, 1, 7)): (20, 20, 20, 1),
+        }
+
+    @pytest.mark.unit
+    def test_retention_deletes_old_days_and_keeps_their_rollups(self, client, db_session, branch_id):
+        now = datetime(2025, 4, 1, 12, 0)
+        _bulk(db_session, branch_id, datetime(2025, 1, 1, 23, 0), [5, 7, 9, 11, 13, 15])
+        _bulk(db_session, branch_id, now - timedelta(hours=1), [3])
+        rollups = _rollups(db_session)
+
+        archived = []
+        deleted = crowd_retention_service.apply_retention(
+            db_session, 30, archive=lambda rows: archived.extend(rows), now=now
+        )
+
+        assert deleted == 6
+        assert [row.CurrentCrowdCount for row in archived] == [5, 7, 9, 11, 13, 15]
+        assert db_session.query(CrowdData).count() == 1
+        assert _rollups(db_session) == rollups
+
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/series",
+            params={"start_date": "2025-01-01T00:00:00", "end_date": "2025-01-03T00:00:00", "bucket": "1d", "agg": "max"},
+        )
+        assert [(point["bucketStart"], point["value"]) for point in response.json()["points"]] == [
+            ("2025-01-01T00:00:00", 9.0),
+            ("2025-01-02T00:00:00", 15.0),
+        ]
+
+    @pytest.mark.unit
+    def test_update_into_a_retained_day_is_rejected(self, db_session, branch_id):
+        now = datetime(2025, 4, 1, 12, 0)
+        _bulk(db_session, branch_id, datetime(2025, 1, 1, 9, 0), [5, 7, 9])
+        _bulk(db_session, branch_id, now - timedelta(hours=1), [3])
+        crowd_retention_service.apply_retention(db_session, 30, now=now)
+        rollups = _rollups(db_session)
+        recent = db_session.query(CrowdData).one()
+
+        with pytest.raises(HTTPException) as exc_info:
+            crowd_data_service.update_crowd_data(
+                db_session,
+                recent.CrowdDataId,
+                CrowdDataUpdate(timestamp=datetime(2025, 1, 1, 10, 0)),
+            )
+
+        assert exc_info.value.status_code == 400
+        db_session.expire_all()
+        assert _rollups(db_session) == rollups
+        assert db_session.get(CrowdData, recent.CrowdDataId).Timestamp == now - timedelta(hours=1)
+
+    @pytest.mark.unit
+    def test_retention_drops_live_status_of_branches_without_recent_data(self, db_session, branch_id):
+        _bulk(db_session, branch_id, datetime(2025, 1, 1, 9, 0), [5])
+        assert db_session.get(BranchLiveStatus, branch_id) is not None
+
+        crowd_retention_service.apply_retention(db_session, 30, now=datetime(2025, 4, 1))
+
+        db_session.expire_all()
+        assert db_session.get(BranchLiveStatus, branch_id) is None
+        assert (DAY, datetime(2025, 1, 1)) in _rollups(db_session)
+
+    @pytest.mark.unit
+    def test_deleting_a_branch_deletes_its_rollups(self, db_session, branch_id):
+        _bulk(db_session, branch_id, datetime(2025, 1, 6, 9, 0), [4, 8])
+        assert _rollups(db_session)
+
+        # Enforce foreign keys like PostgreSQL does
+        db_session.execute(text("PRAGMA foreign_keys=ON"))
+        try:
+            assert institution_service.delete_branch(db_session, branch_id) is True
+        finally:
+            db_session.rollback()
+            db_session.execute(text("PRAGMA foreign_keys=OFF"))
+
+        assert _rollups(db_session) == {}
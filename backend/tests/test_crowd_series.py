@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.db.crowd_rollup_crud import crowd_rollup_crud
+from app.models import CrowdData
+
+
+@pytest.fixture
+def branch_id(db_session, branch):
+    """A branch with one crowd reading per minute from 09:00 to 10:59."""
+    start = datetime(2025, 1, 6, 9, 0)
+    db_session.add_all([
+        CrowdData(
+            CrowdDataId=str(uuid.uuid4()),
+            BranchId=branch.BranchId,
+            Timestamp=start + timedelta(minutes=i),
+            CurrentCrowdCount=i % 60 + 1,
+        )
+        for i in range(120)
+    ])
+    db_session.flush()
+    # Rows written straight to the table, so backfill their rollups
+    crowd_rollup_crud.rebuild(db_session)
+    db_session.commit()
+    return branch.BranchId
+
+
+def _series(client, branch_id, **params):
+    return client.get(
+        f"/api/v1/crowd-data/branch/{branch_id}/series",
+        params={"start_date": "2025-01-06T00:00:00", "end_date": "2025-01-06T23:59:59", **params},
+    )
+
+
+class TestCrowdSeries:
+    """Test cases for the downsampled crowd count series."""
+
+    @pytest.mark.api
+    @pytest.mark.parametrize(
+        "agg, expected",
+        [("avg", 30.5), ("max", 60), ("p95", 57)],
+    )
+    def test_hourly_aggregates(self, client, branch_id, agg, expected):
+        response = _series(client, branch_id, bucket="1h", agg=agg)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["bucket"] == "1h"
+        assert [point["bucketStart"] for point in data["points"]] == [
+            "2025-01-06T09:00:00",
+            "2025-01-06T10:00:00",
+        ]
+        assert [point["value"] for point in data["points"]] == [expected, expected]
+        assert [point["samples"] for point in data["points"]] == [60, 60]
+
+    @pytest.mark.api
+    def test_five_minute_buckets(self, client, branch_id):
+        data = _series(client, branch_id, bucket="5m", agg="max").json()
+
+        assert len(data["points"]) == 24
+        assert data["points"][1] == {
+            "bucketStart": "2025-01-06T09:05:00",
+            "value": 10.0,
+            "samples": 5,
+        }
+
+    @pytest.mark.api
+    def test_daily_bucket_and_range_bounds(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/series",
+            params={
+                "start_date": "2025-01-06T10:30:00",
+                "end_date": "2025-01-06T12:00:00",
+                "bucket": "1d",
+                "agg": "avg",
+            },
+        )
+
+        assert response.json()["points"] == [
+            {"bucketStart": "2025-01-06T00:00:00", "value": 45.5, "samples": 30}
+        ]
+
+    @pytest.mark.api
+    def test_too_many_buckets_is_rejected(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/series",
+            params={"start_date": "2024-01-01T00:00:00", "end_date": "2025-01-01T00:00:00", "bucket": "5m"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.api
+    def test_unknown_bucket_is_rejected(self, client, branch_id):
+        assert _series(client, branch_id, bucket="2h").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
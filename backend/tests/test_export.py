@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.api import export
+from app.models import CrowdData, VisitorLog
+
+
+@pytest.fixture
+def branch_id(db_session, branch):
+    start = datetime(2025, 1, 6, 9, 0)
+    db_session.add_all([
+        CrowdData(
+            CrowdDataId=f"crowd-{i:02d}",
+            BranchId=branch.BranchId,
+            Timestamp=start + timedelta(hours=i),
+            CurrentCrowdCount=i,
+        )
+        for i in range(12)
+    ])
+    db_session.add_all([
+        VisitorLog(
+            VisitorLogId=f"log-{i:02d}",
+            VisitorName=f"Visitor, {i}",
+            BranchId=branch.BranchId,
+            CheckInTime=start + timedelta(hours=i),
+            ServiceStartTime=start + timedelta(hours=i, minutes=5),
+            WaitTimeInMinutes=5,
+        )
+        for i in range(12)
+    ])
+    db_session.commit()
+    return branch.BranchId
+
+
+class TestExport:
+    """Test cases for the streaming NDJSON/CSV exports."""
+
+    @pytest.mark.api
+    def test_crowd_data_ndjson(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/export",
+            params={"start_date": "2025-01-06T10:00:00", "end_date": "2025-01-06T19:00:00"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["crowdDataId"] for row in rows] == [f"crowd-{i:02d}" for i in range(1, 11)]
+        assert rows[0] == {
+            "crowdDataId": "crowd-01",
+            "branchId": branch_id,
+            "timestamp": "2025-01-06T10:00:00",
+            "currentCrowdCount": 1,
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_rows_are_encoded_a_chunk_at_a_time(self, db_session, monkeypatch):
+        monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 5)
+        pulled = []
+
+        def rows():
+            for i in range(12):
+                pulled.append(i)
+                yield (f"id-{i}", i)
+
+        response = export.export_response(db_session, rows(), ("id", "count"), "ndjson", "rows")
+        chunks = []
+        async for chunk in response.body_iterator:
+            # Rows are pulled lazily, never more than one chunk ahead
+            assert len(pulled) <= 5 * (len(chunks) + 1)
+            chunks.append(chunk)
+
+        assert [chunk.count("\n") for chunk in chunks] == [5, 5, 2]
+
+    @pytest.mark.api
+    def test_visitor_logs_csv(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/visitor-logs/branch/{branch_id}/export",
+            params={
+                "start_date": "2025-01-06T00:00:00",
+                "end_date": "2025-01-07T00:00:00",
+                "format": "csv",
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "visitor-logs-" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 12
+        assert rows[3]["visitorName"] == "Visitor, 3"
+        assert rows[3]["checkInTime"] == "2025-01-06T12:00:00"
+
+    @pytest.mark.api
+    def test_csv_of_empty_range_has_only_the_header(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/export",
+            params={"start_date": "2024-01-01T00:00:00", "end_date": "2024-02-01T00:00:00", "format": "csv"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == "crowdDataId,branchId,timestamp,currentCrowdCount\n"
+
+    @pytest.mark.api
+    def test_unknown_format_is_rejected(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/crowd-data/branch/{branch_id}/export",
+            params={"start_date": "2025-01-06T00:00:00", "end_date": "2025-01-07T00:00:00", "format": "xml"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.db.pagination import decode_cursor, encode_cursor, next_cursor
+from app.db.wait_time_prediction_crud import wait_time_prediction_crud
+from app.models import CrowdData, WaitTimePrediction
+
+
+def _walk(client, url, limit):
+    """Follow X-Next-Cursor until the last page, returning every page"""
+    pages = []
+    response = client.get(url, params={"limit": limit})
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        response = client.get(url, params={"limit": limit, "cursor": cursor})
+
+
+class TestKeysetPagination:
+    """Test cases for cursor pagination of the listing routes."""
+
+    @pytest.mark.unit
+    def test_cursor_round_trip(self):
+        timestamp = datetime(2025, 1, 6, 9, 30, 15, 250)
+        assert decode_cursor(encode_cursor(timestamp, "id-1")) == (timestamp, "id-1")
+        assert decode_cursor(encode_cursor(None, "id-2")) == (None, "id-2")
+
+    @pytest.mark.api
+    def test_invalid_cursor_is_rejected(self, client):
+        response = client.get("/api/v1/crowd-data", params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.api
+    def test_cursor_pages_match_offset_pages(self, client, db_session, branch_id):
+        start = datetime(2025, 1, 6, 9, 0)
+        # Pairs of rows share a timestamp, so the id has to break ties
+        db_session.add_all([
+            CrowdData(
+                CrowdDataId=str(uuid.uuid4()),
+                BranchId=branch_id,
+                Timestamp=start + timedelta(minutes=i // 2),
+                CurrentCrowdCount=i,
+            )
+            for i in range(11)
+        ])
+        db_session.commit()
+
+        url = f"/api/v1/crowd-data/branch/{branch_id}"
+        pages = _walk(client, url, 3)
+        offset_pages = [
+            client.get(url, params={"skip": skip, "limit": 3}).json() for skip in range(0, 11, 3)
+        ]
+
+        assert [len(page) for page in pages] == [3, 3, 3, 2]
+        assert pages == offset_pages
+        timestamps = [item["timestamp"] for page in pages for item in page]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    @pytest.mark.unit
+    def test_rows_without_sort_value_are_paged_first(self, db_session, branch_id):
+        db_session.add_all([
+            WaitTimePrediction(
+                WaitTimePredictionId=f"prediction-{i}",
+                BranchId=branch_id,
+                PredictedAt=None if i < 3 else datetime(2025, 1, 6, 9, i),
+                PredictedWaitTime=i,
+            )
+            for i in range(6)
+        ])
+        db_session.commit()
+
+        pages = []
+        cursor = None
+        while True:
+            page = wait_time_prediction_crud.get_wait_time_predictions_by_branch(
+                db_session, branch_id, limit=2, cursor=cursor
+            )
+            pages.append([prediction.WaitTimePredictionId for prediction in page])
+            token = next_cursor(page, 2, "PredictedAt", "WaitTimePredictionId")
+            if token is None:
+                break
+            cursor = decode_cursor(token)
+
+        assert pages == [
+            ["prediction-2", "prediction-1"],
+            ["prediction-0", "prediction-5"],
+            ["prediction-4", "prediction-3"],
+            [],
+        ]
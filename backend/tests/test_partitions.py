@@ -0,0 +1,93 @@
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.db.partitions import add_months, month_start, partition_crud, partition_name
+from app.models import CrowdData, VisitorLog
+from app.schemas.crowd_data_schema import CrowdDataUpdate
+from app.schemas.visitor_log_schema import VisitorLogUpdate
+from app.services.crowd_data_service import crowd_data_service
+from app.services.crowd_retention_service import crowd_retention_service
+from app.services.visitor_log_service import visitor_log_service
+
+
+class TestPartitions:
+    """Test cases for the monthly partitioning of the time-series tables."""
+
+    @pytest.mark.unit
+    def test_month_arithmetic(self):
+        assert month_start(datetime(2025, 2, 14, 9, 30)) == datetime(2025, 2, 1)
+        assert add_months(datetime(2025, 11, 1), 1) == datetime(2025, 12, 1)
+        assert add_months(datetime(2025, 11, 1), 3) == datetime(2026, 2, 1)
+        assert add_months(datetime(2025, 1, 1), -1) == datetime(2024, 12, 1)
+        assert partition_name("crowd_data", datetime(2025, 3, 1)) == "crowd_data_p202503"
+
+    @pytest.mark.unit
+    def test_partition_maintenance_is_a_no_op_without_postgresql(self, db_session):
+        assert not partition_crud.is_partitioned(db_session, "crowd_data")
+        assert partition_crud.get_partitions(db_session, "crowd_data") == []
+        assert partition_crud.ensure_partitions(db_session, 3) == []
+        assert partition_crud.detach_partitions_before(db_session, "visitor_logs", datetime(2030, 1, 1)) == []
+
+    @pytest.mark.unit
+    def test_rows_are_still_identified_by_their_id(self, db_session, branch):
+        crowd_data = CrowdData(
+            CrowdDataId="crowd-1", BranchId=branch.BranchId, Timestamp=datetime(2025, 1, 31, 23, 0), CurrentCrowdCount=3
+        )
+        visitor_log = VisitorLog(VisitorLogId="log-1", BranchId=branch.BranchId, CheckInTime=datetime(2025, 1, 31))
+        db_session.add_all([crowd_data, visitor_log])
+        db_session.commit()
+        db_session.expunge_all()
+
+        assert db_session.get(VisitorLog, "log-1").CheckInTime == datetime(2025, 1, 31)
+        # Moving a row to another month changes its partition key
+        crowd_data_service.update_crowd_data(
+            db_session, "crowd-1", CrowdDataUpdate(timestamp=datetime(2025, 2, 1, 9, 0))
+        )
+        db_session.expunge_all()
+        assert db_session.get(CrowdData, "crowd-1").Timestamp == datetime(2025, 2, 1, 9, 0)
+
+        assert crowd_retention_service.apply_retention(db_session, 30, now=datetime(2025, 4, 1)) == 1
+        assert db_session.get(CrowdData, "crowd-1") is None
+
+    @pytest.mark.unit
+    def test_ids_stay_unique_without_partitioning(self, db_session, branch):
+        db_session.add(VisitorLog(VisitorLogId="log-1", BranchId=branch.BranchId, CheckInTime=datetime(2025, 1, 1)))
+        db_session.commit()
+        with pytest.raises(IntegrityError):
+            db_session.execute(
+                insert(VisitorLog).values(
+                    VisitorLogId="log-1", BranchId=branch.BranchId, CheckInTime=datetime(2025, 2, 1)
+                )
+            )
+        db_session.rollback()
+
+    @pytest.mark.unit
+    def test_partition_keys_cannot_be_cleared(self, db_session):
+        with pytest.raises(HTTPException) as exc_info:
+            visitor_log_service.update_visitor_log(db_session, "log-1", VisitorLogUpdate(checkInTime=None))
+        assert exc_info.value.status_code == 400
+
+        with pytest.raises(HTTPException) as exc_info:
+            crowd_data_service.update_crowd_data(db_session, "crowd-1", CrowdDataUpdate(timestamp=None))
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.unit
+    def test_partitioning_migration_is_skipped_without_postgresql(self, db_session):
+        path = next((Path(__file__).parents[1] / "alembic" / "versions").glob("79815c2e15d0_*.py"))
+        spec = importlib.util.spec_from_file_location("partition_migration", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        with db_session.get_bind().connect() as connection:
+            with Operations.context(MigrationContext.configure(connection)):
+                migration.upgrade()
+                migration.downgrade()
+        assert not partition_crud.is_partitioned(db_session, "visitor_logs")
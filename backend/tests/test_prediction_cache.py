@@ -0,0 +1,86 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.services.prediction_cache import (
+    InMemoryPredictionCacheBackend,
+    PredictionCache,
+    PredictionCacheBackend,
+    visit_bucket,
+)
+
+VISIT = datetime(2025, 1, 6, 9, 7, 30)
+
+
+class TestPredictionCache:
+    """Test cases for the prediction result cache."""
+
+    @pytest.mark.unit
+    def test_visit_bucket_rounds_down_to_15_minutes(self):
+        assert visit_bucket(VISIT) == datetime(2025, 1, 6, 9, 0)
+        assert visit_bucket(datetime(2025, 1, 6, 9, 59, 59)) == datetime(2025, 1, 6, 9, 45)
+
+    @pytest.mark.unit
+    def test_hits_within_bucket_and_counts_misses(self):
+        cache = PredictionCache(InMemoryPredictionCacheBackend(), ttl=60)
+
+        assert cache.get("branch-1", VISIT) is None
+        cache.set("branch-1", VISIT, {"predictedWaitTime": 12})
+
+        assert cache.get("branch-1", datetime(2025, 1, 6, 9, 14)) == {"predictedWaitTime": 12}
+        assert cache.get("branch-1", datetime(2025, 1, 6, 9, 15)) is None
+        assert cache.stats() == {"hits": 1, "misses": 2, "hitRatio": 0.3333, "size": 1}
+
+    @pytest.mark.unit
+    def test_invalidate_branch_only_drops_that_branch(self):
+        cache = PredictionCache(InMemoryPredictionCacheBackend(), ttl=60)
+        cache.set("branch-1", VISIT, {"predictedWaitTime": 12})
+        cache.set("branch-2", VISIT, {"predictedWaitTime": 30})
+
+        cache.invalidate_branch("branch-1")
+
+        assert cache.get("branch-1", VISIT) is None
+        assert cache.get("branch-2", VISIT) == {"predictedWaitTime": 30}
+
+    @pytest.mark.unit
+    def test_prediction_computed_before_an_invalidation_is_not_stored(self):
+        cache = PredictionCache(InMemoryPredictionCacheBackend(), ttl=60)
+        generation = cache.generation("branch-1")
+
+        # New data arrives while the prediction is being computed
+        cache.invalidate_branch("branch-1")
+        cache.set("branch-1", VISIT, {"predictedWaitTime": 12}, generation)
+        assert cache.get("branch-1", VISIT) is None
+
+        cache.set("branch-1", VISIT, {"predictedWaitTime": 14}, cache.generation("branch-1"))
+        assert cache.get("branch-1", VISIT) == {"predictedWaitTime": 14}
+
+    @pytest.mark.unit
+    def test_backends_must_implement_the_interface(self):
+        class PartialBackend(PredictionCacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            PartialBackend()
+
+    @pytest.mark.unit
+    def test_entries_expire_after_ttl(self):
+        cache = PredictionCache(InMemoryPredictionCacheBackend(), ttl=60)
+        with patch("app.services.prediction_cache.time.monotonic", return_value=1000.0):
+            cache.set("branch-1", VISIT, {"predictedWaitTime": 12})
+        with patch("app.services.prediction_cache.time.monotonic", return_value=1061.0):
+            assert cache.get("branch-1", VISIT) is None
+
+    @pytest.mark.unit
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PredictionCache(InMemoryPredictionCacheBackend(max_entries=2), ttl=60)
+        cache.set("branch-1", VISIT, {"predictedWaitTime": 1})
+        cache.set("branch-2", VISIT, {"predictedWaitTime": 2})
+        cache.get("branch-1", VISIT)
+        cache.set("branch-3", VISIT, {"predictedWaitTime": 3})
+
+        assert cache.get("branch-2", VISIT) is None
+        assert cache.get("branch-1", VISIT) == {"predictedWaitTime": 1}
+        assert cache.stats()["size"] == 2
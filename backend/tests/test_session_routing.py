@@ -0,0 +1,103 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import HTTPConnection
+
+from app.db.session import RoutingSession, get_db, use_primary
+from app.models import Base, Institution
+
+
+def _engine():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def engines():
+    primary, replica = _engine(), _engine()
+    # Rows only the replica has tell us where a read went
+    with replica.begin() as conn:
+        conn.execute(insert(Institution), [{"InstitutionId": "replica-only", "Name": "Replica"}])
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _names(db):
+    return {institution.Name for institution in db.query(Institution)}
+
+
+class TestRoutingSession:
+    """Test cases for read replica routing."""
+
+    @pytest.mark.unit
+    def test_reads_use_the_replica_until_the_session_writes(self, engines):
+        primary, replica = engines
+        factory = sessionmaker(class_=RoutingSession, bind=primary, replicas=[replica])
+        db = factory()
+
+        assert _names(db) == {"Replica"}
+
+        db.add(Institution(InstitutionId=str(uuid.uuid4()), Name="Primary"))
+        db.commit()
+
+        # Read-your-writes: the rest of the session stays on the primary
+        assert _names(db) == {"Primary"}
+        db.close()
+
+        # A new request starts on the replica again
+        with factory() as db:
+            assert _names(db) == {"Replica"}
+
+    @pytest.mark.unit
+    def test_write_statements_pin_the_primary(self, engines):
+        primary, replica = engines
+        db = RoutingSession(bind=primary, replicas=[replica])
+
+        db.execute(insert(Institution), [{"InstitutionId": str(uuid.uuid4()), "Name": "Bulk"}])
+
+        assert db.pinned
+        assert _names(db) == {"Bulk"}
+        db.close()
+
+    @pytest.mark.unit
+    def test_reads_of_a_write_path_use_the_primary(self, engines):
+        primary, replica = engines
+        db = RoutingSession(bind=primary, replicas=[replica])
+
+        # e.g. the previous value a write is about to compare against
+        use_primary(db)
+
+        assert _names(db) == set()
+        db.close()
+
+    @pytest.mark.unit
+    def test_write_requests_are_pinned_from_the_start(self, engines):
+        primary, replica = engines
+        factory = sessionmaker(class_=RoutingSession, bind=primary, replicas=[replica])
+        sessions = {}
+        for method in ("GET", "POST", "DELETE"):
+            with patch("app.db.session.routing_session_local", factory):
+                dependency = get_db(HTTPConnection({"type": "http", "method": method}))
+                sessions[method] = next(dependency)
+                dependency.close()
+
+        assert not sessions["GET"].pinned
+        assert sessions["POST"].pinned and sessions["DELETE"].pinned
+
+    @pytest.mark.unit
+    def test_without_replicas_everything_uses_the_primary(self, engines):
+        primary, _ = engines
+        db = RoutingSession(bind=primary)
+
+        assert _names(db) == set()
+        db.close()
@@ -0,0 +1,90 @@
+import pytest
+from fastapi import status
+
+from app.models import VisitorLog
+from core.config import settings
+
+
+class TestVisitorLogBulkAPI:
+    """Test cases for bulk visitor log import."""
+
+    @pytest.mark.api
+    def test_bulk_computes_wait_times(self, client, db_session, branch):
+        payload = [
+            {
+                "visitorName": "Alice",
+                "branchId": branch.BranchId,
+                "checkInTime": "2025-01-01T09:00:00",
+                "serviceStartTime": "2025-01-01T09:12:59",
+            },
+            {
+                "visitorName": "Bob",
+                "branchId": branch.BranchId,
+                "checkInTime": "2025-01-01T09:00:00",
+                "serviceStartTime": "2025-01-01T09:30:00",
+                "waitTimeInMinutes": 7,
+            },
+            {
+                "visitorName": "Carol",
+                "branchId": "missing",
+                "checkInTime": "2025-01-01T09:00:00",
+                "serviceStartTime": "2025-01-01T09:30:00",
+            },
+        ]
+
+        response = client.post("/api/v1/visitor-logs/bulk", json=payload)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["created"] == 2
+        assert data["failed"] == 1
+        assert data["items"][2]["detail"] == "Branch not found"
+        assert data["rowsPerSecond"] > 0
+
+        wait_times = {
+            log.VisitorName: log.WaitTimeInMinutes for log in db_session.query(VisitorLog)
+        }
+        assert wait_times == {"Alice": 12, "Bob": 7}
+
+    @pytest.mark.api
+    def test_bulk_reports_invalid_items(self, client, db_session, branch):
+        payload = [{"visitorName": "Dan", "branchId": branch.BranchId}, "not an object"]
+
+        response = client.post("/api/v1/visitor-logs/bulk", json=payload)
+
+        data = response.json()
+        assert data["created"] == 0
+        assert [item["status"] for item in data["items"]] == ["error", "error"]
+        assert db_session.query(VisitorLog).count() == 0
+
+    @pytest.mark.api
+    def test_bulk_rejects_mixed_timezones(self, client, db_session, branch):
+        log = {"visitorName": "Erin", "branchId": branch.BranchId}
+        payload = [
+            {**log, "checkInTime": "2025-01-01T09:00:00+02:00", "serviceStartTime": "2025-01-01T09:10:00"},
+            {**log, "checkInTime": "2025-01-01T09:00:00+02:00", "serviceStartTime": "2025-01-01T07:10:00Z"},
+        ]
+
+        data = client.post("/api/v1/visitor-logs/bulk", json=payload).json()
+
+        assert [item["status"] for item in data["items"]] == ["error", "created"]
+        assert "timezone" in data["items"][0]["detail"]
+        assert db_session.query(VisitorLog).one().WaitTimeInMinutes == 10
+
+        response = client.post("/api/v1/visitor-logs", json=payload[0])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    @pytest.mark.api
+    def test_bulk_rejects_more_items_than_allowed(self, client, db_session, branch, monkeypatch):
+        monkeypatch.setattr(settings, "VISITOR_LOG_BULK_MAX_ITEMS", 1)
+        log = {
+            "visitorName": "Frank",
+            "branchId": branch.BranchId,
+            "checkInTime": "2025-01-01T09:00:00",
+            "serviceStartTime": "2025-01-01T09:10:00",
+        }
+
+        response = client.post("/api/v1/visitor-logs/bulk", json=[log, log])
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert db_session.query(VisitorLog).count() == 0
@@ -0,0 +1,347 @@
+import uuid
+from datetime import datetime, timedelta
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Branch, CrowdData, VisitorLog, WaitTimePrediction
+from app.schemas.crowd_data_schema import CrowdDataCreate
+from app.schemas.wait_time_prediction_schema import (
+    WaitTimePredictionBatchItem,
+    WaitTimePredictionBatchRequest,
+    WaitTimePredictionRequest,
+)
+from app.services.crowd_data_service import crowd_data_service
+from app.services.prediction_cache import prediction_cache
+from app.services.wait_time_prediction_service import WaitTimePredictionService
+from app.services.wait_time_predictor import BucketHistogram
+
+
+@pytest.fixture(autouse=True)
+def clear_prediction_cache():
+    prediction_cache.clear()
+    yield
+    prediction_cache.clear()
+
+
+@pytest.fixture
+def branch_with_history(db_session, branch):
+    """A branch with a week of visitor logs that all waited 18 minutes."""
+    now = datetime.now()
+    for day in range(1, 8):
+        check_in = now - timedelta(days=day)
+        db_session.add(
+            VisitorLog(
+                VisitorLogId=str(uuid.uuid4()),
+                VisitorName="Visitor",
+                BranchId=branch.BranchId,
+                CheckInTime=check_in,
+                ServiceStartTime=check_in + timedelta(minutes=18),
+                WaitTimeInMinutes=18,
+            )
+        )
+    db_session.commit()
+    return branch
+
+
+@pytest.fixture
+def service(db_session):
+    """A service whose shared predictions open sessions on the test database."""
+    return WaitTimePredictionService(session_factory=sessionmaker(bind=db_session.get_bind()))
+
+
+LOCAL_PREDICTION = {"predictedWaitTime": 18, "actualWaitTime": 18.0, "accuracy": 80.0}
+
+
+def _request(branch):
+    return WaitTimePredictionRequest(
+        visitorId="visitor-1", branchId=branch.BranchId, visitDate=datetime.now()
+    )
+
+
+class TestWaitTimePredictionService:
+    """Test cases for the wait time prediction service."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_local_engine(self, service, db_session, branch_with_history):
+        result = await service.create_wait_time_prediction(db_session, _request(branch_with_history))
+
+        assert result.predictedWaitTime == 18
+        assert result.actualWaitTime == 18
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_failure_falls_back_to_local_estimate(
+        self, service, db_session, branch_with_history
+    ):
+        service.openai_client = Mock()
+        service.openai_client.chat.completions.create = AsyncMock(side_effect=RuntimeError("offline"))
+
+        with patch("app.services.wait_time_prediction_service.settings.PREDICTION_ENGINE", "openai"):
+            result = await service.create_wait_time_prediction(db_session, _request(branch_with_history))
+
+        assert service.openai_client.chat.completions.create.called
+        assert result.predictedWaitTime == 18
+
+    @pytest.mark.unit
+    def test_history_is_aggregated_in_a_single_query(
+        self, service, db_session, branch_with_history
+    ):
+        branch_id = branch_with_history.BranchId
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            wait_times, crowd_counts = service._get_history(db_session, branch_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert len(statements) == 1
+        assert wait_times.count == 7
+        assert wait_times.percentile(90) == 18
+        assert crowd_counts.count == 0
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_repeated_requests_use_the_cache_until_new_data_arrives(
+        self, service, db_session, branch_with_history
+    ):
+        branch_id = branch_with_history.BranchId
+        request = _request(branch_with_history)
+
+        with patch.object(service, "_get_history", wraps=service._get_history) as get_history:
+            await service.create_wait_time_prediction(db_session, request)
+            await service.create_wait_time_prediction(db_session, request)
+            assert get_history.call_count == 1
+
+            crowd_data_service.create_crowd_data(
+                db_session,
+                CrowdDataCreate(branchId=branch_id, timestamp=datetime.now(), currentCrowdCount=10),
+                str(uuid.uuid4()),
+            )
+            await service.create_wait_time_prediction(db_session, request)
+            assert get_history.call_count == 2
+
+        assert prediction_cache.stats()["hits"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_shared_prediction_uses_its_own_session(
+        self, service, db_session, branch_with_history
+    ):
+        with patch.object(service, "_get_history", wraps=service._get_history) as get_history:
+            result = await service.create_wait_time_prediction(
+                db_session, _request(branch_with_history)
+            )
+
+        # The request's session may be closed while other callers still wait
+        assert get_history.call_args.args[0] is not db_session
+        assert result.predictedWaitTime == 18
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        service = WaitTimePredictionService()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return LOCAL_PREDICTION
+
+        results = await asyncio.gather(
+            *(service._single_flight(("branch-1", "09:00"), compute) for _ in range(5))
+        )
+
+        assert len(calls) == 1
+        assert results == [LOCAL_PREDICTION] * 5
+        assert service._in_flight == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_calls_are_bounded_by_the_semaphore(self):
+        service = WaitTimePredictionService()
+        service.openai_client = Mock()
+        in_flight = []
+        peak = []
+
+        async def create(**kwargs):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            raise RuntimeError("offline")
+
+        service.openai_client.chat.completions.create = create
+        empty = BucketHistogram()
+        with patch("app.services.wait_time_prediction_service.settings.OPENAI_MAX_CONCURRENCY", 2):
+            results = await asyncio.gather(
+                *(
+                    service._call_openai_for_prediction("Branch", 50, empty, empty, LOCAL_PREDICTION)
+                    for _ in range(6)
+                )
+            )
+
+        assert len(peak) == 6
+        assert max(peak) == 2
+        assert results == [LOCAL_PREDICTION] * 6
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_openai_timeout_falls_back_to_local_estimate(self):
+        service = WaitTimePredictionService()
+        service.openai_client = Mock()
+
+        async def create(**kwargs):
+            await asyncio.sleep(1)
+
+        service.openai_client.chat.completions.create = create
+        empty = BucketHistogram()
+        with patch("app.services.wait_time_prediction_service.settings.OPENAI_TIMEOUT_SECONDS", 0.01):
+            result = await service._call_openai_for_prediction(
+                "Branch", 50, empty, empty, LOCAL_PREDICTION
+            )
+
+        assert result == LOCAL_PREDICTION
+
+
+@pytest.fixture
+def busy_park(db_session, branch_with_history):
+    """A second branch with varied waits and crowd readings over two weeks."""
+    branch = Branch(
+        BranchId=str(uuid.uuid4()),
+        InstitutionId=branch_with_history.InstitutionId,
+        Name="City Park",
+        Capacity=20,
+    )
+    db_session.add(branch)
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    for hour in range(0, 14 * 24, 5):
+        check_in = now - timedelta(hours=hour + 1)
+        db_session.add_all([
+            VisitorLog(
+                VisitorLogId=str(uuid.uuid4()),
+                VisitorName="Visitor",
+                BranchId=branch.BranchId,
+                CheckInTime=check_in,
+                ServiceStartTime=check_in,
+                WaitTimeInMinutes=hour % 23,
+            ),
+            CrowdData(
+                CrowdDataId=str(uuid.uuid4()),
+                BranchId=branch.BranchId,
+                Timestamp=check_in,
+                CurrentCrowdCount=hour % 31,
+            ),
+        ])
+    db_session.commit()
+    return branch
+
+
+class TestBatchPredictions:
+    """Test cases for batch wait time predictions."""
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_predictions(
+        self, service, db_session, branch_with_history, busy_park
+    ):
+        now = datetime.now()
+        pairs = [
+            (branch.BranchId, now + timedelta(hours=hours))
+            for branch in (branch_with_history, busy_park)
+            for hours in (1, 6, 30, 100)
+        ]
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            results = service.create_wait_time_predictions(
+                db_session,
+                WaitTimePredictionBatchRequest(
+                    visitorId="visitor-1",
+                    predictions=[
+                        WaitTimePredictionBatchItem(branchId=branch_id, visitDate=visit_date)
+                        for branch_id, visit_date in pairs
+                    ],
+                ),
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        # Branch lookup, grouped history and one multi-row INSERT
+        assert len(statements) == 3
+        assert db_session.query(WaitTimePrediction).count() == len(pairs)
+        assert [(result.branchId, result.visitDate) for result in results] == pairs
+
+        prediction_cache.clear()
+        for (branch_id, visit_date), result in zip(pairs, results):
+            single = await service.create_wait_time_prediction(
+                db_session,
+                WaitTimePredictionRequest(visitorId="visitor-1", branchId=branch_id, visitDate=visit_date),
+            )
+            prediction_cache.clear()
+            assert result.predictedWaitTime == single.predictedWaitTime
+            assert result.accuracy == single.accuracy
+            assert result.actualWaitTime == pytest.approx(single.actualWaitTime)
+
+    @pytest.mark.unit
+    def test_batch_reuses_cached_predictions(self, service, db_session, branch_with_history):
+        request = WaitTimePredictionBatchRequest(
+            visitorId="visitor-1",
+            predictions=[
+                WaitTimePredictionBatchItem(
+                    branchId=branch_with_history.BranchId, visitDate=datetime.now()
+                )
+            ],
+        )
+
+        with patch.object(service, "_get_histories", wraps=service._get_histories) as get_histories:
+            first = service.create_wait_time_predictions(db_session, request)
+            second = service.create_wait_time_predictions(db_session, request)
+
+        assert get_histories.call_count == 1
+        assert first[0].predictedWaitTime == second[0].predictedWaitTime == 18
+        assert first[0].waitTimePredictionId != second[0].waitTimePredictionId
+
+    @pytest.mark.unit
+    def test_batch_endpoint_rejects_unknown_branches(self, client, db_session, branch_with_history):
+        visit_date = datetime.now().isoformat()
+        response = client.post(
+            "/api/v1/wait-time-predictions/batch",
+            json={
+                "visitorId": "visitor-1",
+                "predictions": [
+                    {"branchId": branch_with_history.BranchId, "visitDate": visit_date},
+                    {"branchId": "missing-branch", "visitDate": visit_date},
+                ],
+            },
+        )
+
+        assert response.status_code == 404
+        assert "missing-branch" in response.json()["detail"]
+        assert db_session.query(WaitTimePrediction).count() == 0
+
+        with patch("app.services.wait_time_prediction_service.settings.PREDICTION_BATCH_MAX_ITEMS", 1):
+            response = client.post(
+                "/api/v1/wait-time-predictions/batch",
+                json={
+                    "visitorId": "visitor-1",
+                    "predictions": [
+                        {"branchId": branch_with_history.BranchId, "visitDate": visit_date}
+                    ] * 2,
+                },
+            )
+        assert response.status_code == 400
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.wait_time_predictor import (
+    BucketHistogram,
+    LocalWaitTimePredictor,
+    hour_of_week,
+)
+
+# 2025-01-06 was a Monday
+MONDAY_9AM = datetime(2025, 1, 6, 9, 0)
+
+
+class TestLocalWaitTimePredictor:
+    """Test cases for the local statistical wait time model."""
+
+    @pytest.mark.unit
+    def test_hour_of_week(self):
+        buckets = hour_of_week([MONDAY_9AM, MONDAY_9AM + timedelta(days=6, hours=14)])
+
+        assert buckets.tolist() == [9, 167]
+
+    @pytest.mark.unit
+    def test_defaults_without_history(self):
+        predictor = LocalWaitTimePredictor()
+
+        result = predictor.predict(
+            "City Bank", 50, MONDAY_9AM, BucketHistogram(), BucketHistogram()
+        )
+
+        assert result["predictedWaitTime"] == 20
+        assert result["accuracy"] == 65.0
+
+    @pytest.mark.unit
+    def test_busy_bucket_dominates_with_enough_samples(self):
+        predictor = LocalWaitTimePredictor(prior_weight=5.0)
+        # 20 Monday 9am visits waiting 30 minutes, 20 Monday 2pm visits waiting 10
+        check_ins = [MONDAY_9AM - timedelta(weeks=i % 4) for i in range(20)]
+        check_ins += [MONDAY_9AM + timedelta(hours=5) - timedelta(weeks=i % 4) for i in range(20)]
+        waits = BucketHistogram.from_observations(check_ins, [30] * 20 + [10] * 20)
+
+        morning = predictor.predict("Branch", 50, MONDAY_9AM, waits, BucketHistogram())
+        afternoon = predictor.predict(
+            "Branch", 50, MONDAY_9AM + timedelta(hours=5), waits, BucketHistogram()
+        )
+
+        # (20 * 30 + 5 * 20) / 25 and (20 * 10 + 5 * 20) / 25
+        assert morning["predictedWaitTime"] == 28
+        assert afternoon["predictedWaitTime"] == 12
+        assert morning["actualWaitTime"] == 20
+
+    @pytest.mark.unit
+    def test_crowd_adjusts_sparse_buckets(self):
+        predictor = LocalWaitTimePredictor()
+        check_ins = [MONDAY_9AM + timedelta(hours=h) for h in range(1, 5)]
+        waits = BucketHistogram.from_observations(check_ins, [10, 10, 10, 10])
+        # The requested hour is usually twice as crowded as the branch average
+        crowd_times = [MONDAY_9AM, MONDAY_9AM + timedelta(hours=1), MONDAY_9AM + timedelta(hours=2)]
+        crowd = BucketHistogram.from_observations(crowd_times, [40, 10, 10])
+
+        result = predictor.predict("Branch", 100, MONDAY_9AM, waits, crowd)
+
+        assert result["predictedWaitTime"] == 20
+        assert result["accuracy"] == 75.0
+
+
+class TestBucketHistogram:
+    """Test cases for aggregated history histograms."""
+
+    @pytest.mark.unit
+    def test_statistics_from_grouped_rows(self):
+        # Bucket 9 saw a 10 minute wait three times and a 40 minute wait once
+        histogram = BucketHistogram([9, 9, 33], [10, 40, 20], [3, 1, 1])
+
+        assert histogram.count == 5
+        assert histogram.mean == 18.0
+        assert histogram.percentile(50) == 10.0
+        assert histogram.percentile(90) == 40.0
+        assert histogram.bucket_counts()[9] == 4
+        assert histogram.hour_of_day_counts()[9] == 5
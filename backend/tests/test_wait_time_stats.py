@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi import status
+from sqlalchemy.orm import sessionmaker
+
+import manage
+
+from app.db.crowd_rollup_crud import DAY, HOUR
+from app.models import BranchWaitTimeStats, VisitorLogWaitSketch
+from app.services.quantile_sketch import RELATIVE_ACCURACY, QuantileSketch
+from app.services.wait_time_stats import (
+    WaitTimeStats,
+    WaitTimeStatsRecorder,
+    range_buckets,
+    wait_time_stats,
+)
+
+START = datetime(2025, 1, 6, 9)
+
+
+def _log(branch_id, wait_time, check_in=START):
+    return {
+        "visitorName": "Visitor",
+        "branchId": branch_id,
+        "checkInTime": check_in.isoformat(),
+        "serviceStartTime": (check_in + timedelta(minutes=wait_time)).isoformat(),
+    }
+
+
+class TestQuantileSketch:
+    """Test cases for the mergeable quantile sketch."""
+
+    @pytest.mark.unit
+    def test_percentiles_within_relative_accuracy(self):
+        values = np.random.default_rng(3).lognormal(2.5, 0.8, 20000)
+        first, second = QuantileSketch().add(values[:5000]), QuantileSketch().add(values[5000:])
+
+        merged = QuantileSketch.from_bytes(first.merge(second).to_bytes())
+
+        assert merged.count == len(values)
+        ordered = np.sort(values)
+        for q in (1, 50, 90, 99, 100):
+            exact = ordered[max(1, int(np.ceil(q / 100 * len(values)))) - 1]
+            assert abs(merged.percentile(q) - exact) <= RELATIVE_ACCURACY * exact
+
+    @pytest.mark.unit
+    def test_zeros_and_removals(self):
+        sketch = QuantileSketch().add([0, 0, 10, 20, 30])
+        sketch.merge(QuantileSketch().add([30], [-1]))
+
+        assert sketch.count == 4
+        assert sketch.percentile(50) == 0.0
+        # Few values over many bins are stored sparsely
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+        assert len(sketch.to_bytes()) < 40
+        assert restored.count == 4 and restored.percentile(75) == sketch.percentile(75)
+        assert sketch.percentile(100) == pytest.approx(20, rel=RELATIVE_ACCURACY)
+        assert QuantileSketch().percentile(50) is None
+
+
+    @pytest.mark.unit
+    def test_negative_counts_round_trip(self):
+        # A delta flushed before the inserts it removes from
+        sketch = QuantileSketch().add([0, 10, 30, 40])
+        sketch.merge(QuantileSketch().add([20, 0], [-300, -2]))
+
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+
+        assert restored.zero_count == -1
+        assert restored.count == sketch.count == -298
+        assert np.array_equal(restored.bins[restored.bins != 0], sketch.bins[sketch.bins != 0])
+        # Once the removed values arrive the cumulative counts no longer dip
+        restored.merge(QuantileSketch().add([20, 0], [301, 2]))
+        assert restored.count == 5
+        assert restored.percentile(50) == pytest.approx(20, rel=RELATIVE_ACCURACY)
+
+    @pytest.mark.unit
+    def test_percentile_with_negative_bins(self):
+        sketch = QuantileSketch().add([10, 30, 40]).merge(QuantileSketch().add([20], [-1]))
+
+        # Cumulative counts 1, 0, 1, 2 reach the lowest rank at the first bin
+        assert sketch.percentile(50) == pytest.approx(10, rel=RELATIVE_ACCURACY)
+        assert sketch.percentile(100) == pytest.approx(40, rel=RELATIVE_ACCURACY)
+
+
+class TestWaitTimeStats:
+    """Test cases for the running per-branch wait time statistics."""
+
+    @pytest.mark.unit
+    def test_merged_batches_and_removals_match_exact_statistics(self):
+        rng = np.random.default_rng(5)
+        values = rng.integers(0, 60, 300)
+        times = [START + timedelta(minutes=int(m)) for m in rng.integers(0, 10000, 300)]
+
+        stats = WaitTimeStats().add(values[:100], times[:100])
+        stats.merge(WaitTimeStats().add(values[100:], times[100:]))
+        stats.subtract(WaitTimeStats().add(values[:50], times[:50]))
+
+        kept = values[50:]
+        assert stats.count == len(kept)
+        assert stats.mean == pytest.approx(kept.mean())
+        assert stats.standard_deviation == pytest.approx(kept.std(ddof=1))
+
+    @pytest.mark.unit
+    def test_recent_mean_favours_recent_check_ins(self):
+        stats = WaitTimeStats().add([60], [START - timedelta(days=30)])
+        stats.add([10, 10], [START, START + timedelta(hours=1)])
+
+        assert stats.mean == pytest.approx(80 / 3)
+        assert 10 < stats.recent_mean < 10.5
+
+    @pytest.mark.api
+    def test_ingest_keeps_statistics_current(self, client, db_session, branch_id):
+        client.post("/api/v1/visitor-logs", json=_log(branch_id, 10))
+        client.post("/api/v1/visitor-logs/bulk", json=[_log(branch_id, m) for m in (20, 30, 40)])
+        log_id = client.post("/api/v1/visitor-logs", json=_log(branch_id, 100)).json()["visitorLogId"]
+
+        stats = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/wait-time-stats").json()
+        assert stats["sampleCount"] == 5
+        assert stats["averageWaitTime"] == pytest.approx(40)
+        assert stats["p50"] == pytest.approx(30, rel=RELATIVE_ACCURACY)
+        assert stats["p99"] == pytest.approx(100, rel=RELATIVE_ACCURACY)
+
+        client.put(f"/api/v1/visitor-logs/{log_id}", json={"waitTimeInMinutes": 50})
+        average = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/average-wait-time").json()
+        assert average["averageWaitTime"] == pytest.approx(30)
+
+        client.delete(f"/api/v1/visitor-logs/{log_id}")
+        stats = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/wait-time-stats").json()
+        assert stats["sampleCount"] == 4
+        assert stats["standardDeviation"] == pytest.approx(np.std([10, 20, 30, 40], ddof=1))
+
+    @pytest.mark.unit
+    def test_flush_persists_and_rebuild_recomputes(self, client, db_session, branch_id):
+        client.post("/api/v1/visitor-logs/bulk", json=[_log(branch_id, m) for m in (5, 15, 25)])
+
+        assert wait_time_stats.flush(db_session) == 1
+        row = db_session.query(BranchWaitTimeStats).one()
+        assert row.SampleCount == 3 and row.WaitTimeSum == pytest.approx(45)
+
+        client.post("/api/v1/visitor-logs", json=_log(branch_id, 35))
+        # The stored row plus this process's pending delta
+        assert wait_time_stats.get(db_session, branch_id).count == 4
+
+        assert wait_time_stats.rebuild(db_session) == 1
+        rebuilt = wait_time_stats.get(db_session, branch_id)
+        assert rebuilt.count == 4 and rebuilt.mean == pytest.approx(20)
+        assert rebuilt.percentile(100) == pytest.approx(35, rel=RELATIVE_ACCURACY)
+
+    @pytest.mark.unit
+    def test_removal_flushed_before_its_insert(self, db_session, branch_id):
+        inserting, removing = WaitTimeStatsRecorder(3600), WaitTimeStatsRecorder(3600)
+        inserting.record(db_session, added=[(branch_id, m, START) for m in (10, 20, 30)])
+        # Another worker updates the last log before the first one flushes
+        removing.record(db_session, removed=[(branch_id, 30, START)])
+
+        assert removing.flush(db_session) == 1
+        assert inserting.flush(db_session) == 1
+
+        db_session.expire_all()
+        stats = WaitTimeStats.from_row(db_session.get(BranchWaitTimeStats, branch_id))
+        assert stats.count == 2
+        assert stats.mean == pytest.approx(15)
+        assert stats.standard_deviation == pytest.approx(np.std([10, 20], ddof=1))
+        assert stats.recent_mean == pytest.approx(15)
+        assert stats.percentile(100) == pytest.approx(20, rel=RELATIVE_ACCURACY)
+
+    @pytest.mark.unit
+    def test_buffered_writes_are_flushed_without_further_logs(self, client, db_session, branch_id):
+        client.post("/api/v1/visitor-logs/bulk", json=[_log(branch_id, m) for m in (5, 15)])
+        assert db_session.query(BranchWaitTimeStats).count() == 0
+
+        async def run_briefly():
+            task = asyncio.create_task(
+                wait_time_stats.flush_periodically(sessionmaker(bind=db_session.get_bind()))
+            )
+            await asyncio.sleep(0.2)
+            task.cancel()
+
+        flush_interval, wait_time_stats.flush_interval = wait_time_stats.flush_interval, 0.05
+        try:
+            asyncio.run(run_briefly())
+        finally:
+            wait_time_stats.flush_interval = flush_interval
+        db_session.expire_all()
+        assert db_session.query(BranchWaitTimeStats).one().SampleCount == 2
+
+    @pytest.mark.unit
+    def test_import_command_flushes_before_exiting(self, db_session, branch_id, tmp_path, monkeypatch):
+        dump = tmp_path / "logs.json"
+        dump.write_text(json.dumps([
+            {**_log(branch_id, m), "waitTimeInMinutes": m} for m in (10, 20, 30)
+        ]))
+        monkeypatch.setattr(manage, "session_local", sessionmaker(bind=db_session.get_bind()))
+
+        assert manage.import_visitor_logs(argparse.Namespace(file=str(dump), chunk_size=100)) == 0
+
+        db_session.expire_all()
+        row = db_session.query(BranchWaitTimeStats).one()
+        assert row.SampleCount == 3 and row.WaitTimeSum == pytest.approx(60)
+
+    @pytest.mark.api
+    def test_branch_without_logs(self, client, branch_id):
+        stats = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/wait-time-stats").json()
+        assert stats["sampleCount"] == 0 and stats["p90"] is None
+
+        average = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/average-wait-time")
+        assert average.status_code == status.HTTP_200_OK
+        assert average.json()["averageWaitTime"] == 0.0
+
+
+class TestWaitTimePercentiles:
+    """Test cases for the hourly/daily wait time sketches."""
+
+    @pytest.mark.unit
+    def test_range_buckets_use_days_inside_the_range(self):
+        spans = range_buckets(datetime(2025, 1, 6, 21, 30), datetime(2025, 1, 9, 2, 15))
+
+        assert spans == [
+            (HOUR, datetime(2025, 1, 6, 21), datetime(2025, 1, 7)),
+            (DAY, datetime(2025, 1, 7), datetime(2025, 1, 9)),
+            (HOUR, datetime(2025, 1, 9), datetime(2025, 1, 9, 2, 15)),
+        ]
+        assert range_buckets(datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 17)) == [
+            (HOUR, datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 17))
+        ]
+
+    @pytest.mark.api
+    def test_percentiles_match_the_logs_in_range(self, client, db_session, branch_id):
+        rng = np.random.default_rng(11)
+        logs = [
+            (START + timedelta(hours=int(hour)), int(wait_time))
+            for hour, wait_time in zip(rng.integers(0, 24 * 10, 600), rng.integers(1, 90, 600))
+        ]
+        client.post("/api/v1/visitor-logs/bulk", json=[_log(branch_id, w, t) for t, w in logs[:400]])
+        # Some flushed to the database, some still pending in this process
+        wait_time_stats.flush(db_session)
+        client.post("/api/v1/visitor-logs/bulk", json=[_log(branch_id, w, t) for t, w in logs[400:]])
+
+        start, end = START + timedelta(hours=5), START + timedelta(days=7, hours=3)
+        response = client.get(
+            f"/api/v1/visitor-logs/branch/{branch_id}/percentiles",
+            params={"from": start.isoformat(), "to": end.isoformat()},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        in_range = np.sort([w for t, w in logs if start <= t < end])
+        assert data["sampleCount"] == len(in_range)
+        assert data["hourly"] is None
+        for q in (50, 90, 99):
+            exact = in_range[int(np.ceil(q / 100 * len(in_range))) - 1]
+            assert data[f"p{q}"] == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+        hourly = client.get(
+            f"/api/v1/visitor-logs/branch/{branch_id}/percentiles",
+            params={"from": start.isoformat(), "to": end.isoformat(), "hourly": True},
+        ).json()["hourly"]
+        nine = np.sort([w for t, w in logs if start <= t < end and t.hour == 9])
+        assert sum(hour["sampleCount"] for hour in hourly) == len(in_range)
+        assert [hour for hour in hourly if hour["hour"] == 9][0]["p50"] == pytest.approx(
+            nine[int(np.ceil(len(nine) / 2)) - 1], rel=RELATIVE_ACCURACY
+        )
+
+    @pytest.mark.api
+    def test_deleted_logs_leave_the_sketches(self, client, db_session, branch_id):
+        log_id = client.post("/api/v1/visitor-logs", json=_log(branch_id, 30)).json()["visitorLogId"]
+        wait_time_stats.flush(db_session)
+        assert db_session.query(VisitorLogWaitSketch).count() == 2
+
+        client.delete(f"/api/v1/visitor-logs/{log_id}")
+        wait_time_stats.flush(db_session)
+
+        assert db_session.query(VisitorLogWaitSketch).count() == 0
+        params = {"from": START.isoformat(), "to": (START + timedelta(days=1)).isoformat()}
+        data = client.get(f"/api/v1/visitor-logs/branch/{branch_id}/percentiles", params=params).json()
+        assert data["sampleCount"] == 0 and data["p50"] is None
+
+    @pytest.mark.api
+    def test_inverted_range_is_rejected(self, client, branch_id):
+        response = client.get(
+            f"/api/v1/visitor-logs/branch/{branch_id}/percentiles",
+            params={"from": "2025-01-07T00:00:00", "to": "2025-01-06T00:00:00"},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
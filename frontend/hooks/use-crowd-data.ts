@@ -142,6 +142,22 @@ export function useLatestCrowdData(branchId: string): UseLatestCrowdDataReturn {
     fetchLatestCrowdData()
   }, [branchId])
 
+  // Keep the latest reading current from pushed live status updates
+  useEffect(() => {
+    if (!branchId) {
+      return
+    }
+    return crowdDataApi.subscribeLiveStatus([branchId], (status) => {
+      setCrowdData((previous) => ({
+        ...previous,
+        crowdDataId: status.latestCrowdDataId,
+        branchId: status.branchId,
+        timestamp: status.latestTimestamp,
+        currentCrowdCount: status.latestCrowdCount,
+      }))
+    })
+  }, [branchId])
+
   return {
     crowdData,
     loading,
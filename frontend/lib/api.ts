@@ -33,6 +33,10 @@ export interface Branch {
   totalCrowdCount?: number
 }
 
+export interface NearbyBranch extends Branch {
+  distanceKm: number
+}
+
 export interface Institution {
   institutionId: string
   institutionTypeId?: string
@@ -227,6 +231,10 @@ export const branchApi = {
   getAll: (): Promise<Branch[]> => 
     apiRequest<Branch[]>('/branches'),
 
+  // Get the least crowded branches within `radius` km, nearest first on ties
+  getNearby: (lat: number, lon: number, radius = 5, limit = 10): Promise<NearbyBranch[]> =>
+    apiRequest<NearbyBranch[]>(`/branches/nearby?lat=${lat}&lon=${lon}&radius=${radius}&limit=${limit}`),
+
   // Get branch by ID
   getById: (id: string): Promise<Branch> => 
     apiRequest<Branch>(`/branches/${id}`),
@@ -555,6 +563,23 @@ export interface CrowdDataRequest {
   currentCrowdCount: number
 }
 
+export interface BranchLiveStatus {
+  branchId: string
+  latestCrowdDataId: string
+  latestCrowdCount: number
+  latestTimestamp: string
+  rollingAverageCrowdCount?: number
+  occupancyRatio?: number
+  updatedAt: string
+}
+
+export interface CrowdSeries {
+  branchId: string
+  bucket: '5m' | '1h' | '1d'
+  agg: 'avg' | 'max' | 'p95'
+  points: { bucketStart: string; value: number; samples: number }[]
+}
+
 // Crowd Data APIs
 export const crowdDataApi = {
   // Get all crowd data
@@ -580,10 +605,32 @@ export const crowdDataApi = {
   getLatestByBranch: (branchId: string): Promise<CrowdData> => 
     apiRequest<CrowdData>(`/crowd-data/branch/${branchId}/latest`),
 
+  // Subscribe to live status updates (Server-Sent Events)
+  subscribeLiveStatus: (branchIds: string[], onStatus: (status: BranchLiveStatus) => void): (() => void) => {
+    const query = branchIds.map((id) => `branchId=${encodeURIComponent(id)}`).join('&')
+    const source = new EventSource(`${API_BASE_URL}/crowd-data/live-status/stream?${query}`)
+    source.addEventListener('live-status', (event) => {
+      onStatus(JSON.parse((event as MessageEvent).data))
+    })
+    return () => source.close()
+  },
+
   // Get crowd data by date range
   getByDateRange: (branchId: string, startDate: string, endDate: string): Promise<CrowdData[]> => 
     apiRequest<CrowdData[]>(`/crowd-data/branch/${branchId}/date-range?start_date=${startDate}&end_date=${endDate}`),
 
+  // Get crowd counts by date range, aggregated per time bucket (for charts)
+  getSeries: (
+    branchId: string,
+    startDate: string,
+    endDate: string,
+    bucket: CrowdSeries['bucket'] = '1h',
+    agg: CrowdSeries['agg'] = 'avg'
+  ): Promise<CrowdSeries> =>
+    apiRequest<CrowdSeries>(
+      `/crowd-data/branch/${branchId}/series?start_date=${startDate}&end_date=${endDate}&bucket=${bucket}&agg=${agg}`
+    ),
+
   // Update crowd data
   update: (id: string, data: Partial<CrowdDataRequest>): Promise<CrowdData> => 
     apiRequest<CrowdData>(`/crowd-data/${id}`, {